@@ -6,8 +6,10 @@ from typing import Optional, List, Dict, Any
 
 from ..llm.client import LLMClient
 from ..memory.short_term import ShortTermMemory
-from ..rag.index import RAGIndex
+from ..rag.index import RAGIndex, RetrievalResult
 from ..mcp.git_client import MCPGitClient
+from ..utils import config as settings
+from ..utils.tokens import count_tokens
 
 
 # --------------------------------------------------------------------------------------
@@ -75,14 +77,42 @@ class TestWeaverAgent:
     # Public API
     # ------------------------------------------------------------------
 
-    def chat(self, user_message: str, query_for_rag: Optional[str] = None) -> str:
+    @staticmethod
+    def test_rag_query(service_path: str, extra_instructions: str = "") -> str:
+        """
+        RAG query used for test generation (class name + instructions).
+        """
+        class_name = service_path.split("/")[-1].replace(".java", "")
+        return f"{class_name} {extra_instructions}".strip()
+
+    def _rag_context(self, retrieval: RetrievalResult, *prompt_parts: str) -> str:
+        """
+        RAG context packed into the PROMPT_TOKEN_BUDGET left after
+        `prompt_parts` (system prompt, SUT source, ...).
+        """
+        if settings.PROMPT_TOKEN_BUDGET <= 0:
+            return self.rag_index.build_context(retrieval)
+        used = sum(count_tokens(part) for part in prompt_parts)
+        return self.rag_index.build_context(retrieval, settings.PROMPT_TOKEN_BUDGET - used)
+
+    def chat(
+        self,
+        user_message: str,
+        query_for_rag: Optional[str] = None,
+        retrieval: Optional[RetrievalResult] = None,
+    ) -> str:
         """
         Simple conversational chat (used by /chat endpoint).
         Does NOT trigger test generation or compilation.
+
+        `retrieval` lets the caller pass hits it already fetched for
+        `query_for_rag`, so the request does not search twice.
         """
         task_context = ""
-        if query_for_rag:
-            task_context = self.rag_index.retrieve_context(query_for_rag, top_k=5)
+        if retrieval is None and query_for_rag:
+            retrieval = self.rag_index.retrieve(query_for_rag, top_k=5)
+        if retrieval is not None:
+            task_context = self._rag_context(retrieval, self.system_prompt, user_message)
 
         messages = [{"role": "system", "content": self.system_prompt}]
         if task_context:
@@ -103,16 +133,18 @@ class TestWeaverAgent:
         extra_instructions: str = "",
         compile_after: bool = True,
         max_attempts: int = 3,
+        retrieval: Optional[RetrievalResult] = None,
     ) -> Dict[str, Any]:
 
         java_source = self.git.get_file(service_path)
         class_name = service_path.split("/")[-1].replace(".java", "")
 
-        # RAG only on attempt 1 (keeps retries fast)
-        rag_query = f"{class_name} {extra_instructions}".strip()
-        rag_context = self.rag_index.retrieve_context(rag_query, top_k=5)
+        # RAG only on attempt 1 (keeps retries fast); reuse the caller's hits if given
+        if retrieval is None:
+            retrieval = self.rag_index.retrieve(self.test_rag_query(service_path, extra_instructions), top_k=5)
 
-        user_msg = f"""
+        def _user_msg(rag_context: str) -> str:
+            return f"""
 Generate JUnit 5 tests for this Java Spring Boot service.
 
 <source_path>{service_path}</source_path>
@@ -133,6 +165,10 @@ Rules:
 - Output ONLY Java code (no markdown, no explanation)
 """.strip()
 
+        # Context gets the prompt budget left after the prompts and the SUT source
+        rag_context = self._rag_context(retrieval, self.system_prompt, self.test_prompt, _user_msg(""))
+        user_msg = _user_msg(rag_context)
+
         base_messages = [
             {"role": "system", "content": self.system_prompt},
             {"role": "user", "content": self.test_prompt},
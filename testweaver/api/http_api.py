@@ -2,17 +2,29 @@
 from fastapi.middleware.cors import CORSMiddleware
 import json
 import asyncio
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 import os
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Form, Query
 from pydantic import BaseModel
-from ..memory.long_term import LongTermMemory
+from ..memory.long_term import LongTermMemory, ReindexInProgress
 from ..memory.short_term import ShortTermMemory
 from ..rag.index import RAGIndex
-from ..rag.loaders.pdf_loader import load_pdf_as_chunks
-from ..rag.loaders.swagger_loader import fetch_swagger_json, openapi_to_rag_chunks
+from ..rag.loaders.pdf_loader import iter_pdf_chunks
+from ..rag.loaders.swagger_loader import (
+    SwaggerStateStore,
+    fetch_swagger_spec,
+    openapi_to_rag_chunks,
+    swagger_doc_id,
+)
+from ..rag.jobs import IngestJob, IngestJobQueue, JobQueueFull
+from ..rag.code_index import CodeIndexer
+from ..rag.rerank import CrossEncoderReranker
+from ..mcp.git_client import MCPGitClient
 from ..agent.core import TestWeaverAgent
+from ..llm.client import llm_config_error
+from ..memory.embedding_service import EmbeddingServiceClient
+from ..utils.warmup import WarmUp
 from fastapi import HTTPException
 from testweaver.utils import config as settings
 
@@ -32,120 +44,127 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-lt_memory = LongTermMemory()
+lt_memory = LongTermMemory(
+    embedding_model_name=settings.EMBED_MODEL,
+    embed_batch_size=settings.EMBED_BATCH_SIZE,
+    upsert_batch_size=settings.UPSERT_BATCH_SIZE,
+    pipeline_depth=settings.INGEST_PIPELINE_DEPTH,
+    embedding_cache_dir=settings.EMBED_CACHE_DIR,
+    embedding_cache_size=settings.EMBED_CACHE_MAX_ENTRIES,
+    query_cache_size=settings.QUERY_EMBED_CACHE_SIZE,
+    hybrid=settings.HYBRID_SEARCH,
+    storage_profile=settings.QDRANT_STORAGE_PROFILE,
+    hnsw_ef=settings.QDRANT_HNSW_EF,
+    embedding_service_socket=settings.EMBEDDING_SERVICE_SOCKET,
+    microbatch_max=settings.EMBED_MICROBATCH_MAX,
+    microbatch_wait_ms=settings.EMBED_MICROBATCH_WAIT_MS,
+    bulk_workers=settings.EMBED_BULK_WORKERS,
+    bulk_min_texts=settings.EMBED_BULK_MIN_TEXTS,
+    bulk_chunk_size=settings.EMBED_BULK_CHUNK_SIZE,
+    embedding_backend=settings.EMBED_BACKEND,
+)
+code_memory = lt_memory.sibling(settings.CODE_COLLECTION)
+reranker = (
+    CrossEncoderReranker(
+        settings.RERANK_MODEL,
+        batch_size=settings.RERANK_BATCH_SIZE,
+        budget_ms=settings.RERANK_BUDGET_MS,
+        cache_size=settings.RERANK_CACHE_SIZE,
+    )
+    if settings.RERANK_ENABLED
+    else None
+)
 st_memory = ShortTermMemory()
-rag_index = RAGIndex(lt_memory)
+rag_index = RAGIndex(
+    lt_memory,
+    code_store=code_memory,
+    code_top_k=settings.CODE_TOP_K,
+    result_cache_size=settings.RETRIEVAL_CACHE_SIZE,
+    result_cache_ttl=settings.RETRIEVAL_CACHE_TTL_SECONDS,
+    hybrid=settings.HYBRID_SEARCH,
+    rrf_k=settings.RRF_K,
+    fusion_candidates=settings.HYBRID_CANDIDATES,
+    reranker=reranker,
+    rerank_candidates=settings.RERANK_CANDIDATES,
+    mmr_lambda=settings.CONTEXT_MMR_LAMBDA,
+    compress_max_tokens=settings.CONTEXT_COMPRESS_MAX_TOKENS,
+    compress_types=settings.CONTEXT_COMPRESS_TYPES,
+)
+swagger_state = SwaggerStateStore(settings.SWAGGER_STATE_PATH)
+
+# Nothing above touches the model or Qdrant; they are loaded in the
+# background after startup (or on first use) and reported by /readyz
+warmup_steps = {
+    "embedder": lt_memory.load_model,
+    "qdrant": lt_memory.connect,
+    "code_collection": code_memory.connect,
+}
+if reranker is not None:
+    warmup_steps["reranker"] = reranker.load
+warmup = WarmUp(
+    warmup_steps,
+    retry_interval=settings.WARMUP_RETRY_SECONDS,
+)
 
 SVC_REPO = os.getenv("GIT_REPO_SVC_ACCOUNTING", "moor-sun/svc-accounting")
 
-import inspect
-
-def _call_rag_method(fn, query: str, top_k: int):
-    """
-    Call a rag method with whatever parameter names it expects.
-    Supports common signatures like:
-      fn(query, top_k=5)
-      fn(query, k=5)
-      fn(text=query, limit=5)
-    """
-    sig = inspect.signature(fn)
-    kwargs = {}
-
-    # best-effort mapping
-    if "query" in sig.parameters:
-        kwargs["query"] = query
-    elif "text" in sig.parameters:
-        kwargs["text"] = query
-    elif len(sig.parameters) >= 1:
-        # if it only takes positional query, pass it positionally
-        return fn(query, **({ "top_k": top_k } if "top_k" in sig.parameters else {}))
-
-    if "top_k" in sig.parameters:
-        kwargs["top_k"] = top_k
-    elif "k" in sig.parameters:
-        kwargs["k"] = top_k
-    elif "limit" in sig.parameters:
-        kwargs["limit"] = top_k
-    elif "n" in sig.parameters:
-        kwargs["n"] = top_k
-
-    return fn(**kwargs)
-
-
-def get_rag_hits(query: str, top_k: int = 5):
-    """
-    Return retrieved chunks for UI display.
-    This auto-detects the retrieval method present on RAGIndex.
-    """
-    if not query:
-        return []
-
-    # Try common method names on RAGIndex
-    candidate_methods = [
-        "search",
-        "query",
-        "similarity_search",
-        "retrieve",
-        "get_relevant",
-        "find_similar",
-    ]
-
-    results = None
-    for name in candidate_methods:
-        fn = getattr(rag_index, name, None)
-        if callable(fn):
-            results = _call_rag_method(fn, query=query, top_k=top_k)
-            break
-
-    if results is None:
-        # No supported retrieval method found
-        return []
-
-    # Normalize results into UI-friendly list of dicts
-    hits = []
-    for r in (results or []):
-        # if result is not dict-like, string it
-        if not isinstance(r, dict):
-            hits.append({
-                "doc_id": "",
-                "score": None,
-                "meta": {},
-                "text_preview": str(r)[:400],
-            })
-            continue
-
-        hits.append({
-            "doc_id": r.get("doc_id") or r.get("id") or r.get("point_id") or "",
-            "score": r.get("score") or r.get("distance"),
-            "meta": r.get("meta") or r.get("payload", {}).get("meta", {}) or {},
-            "text_preview": (r.get("text") or r.get("payload", {}).get("text", "") or "")[:400],
-        })
 
-    return hits
+@app.get("/healthz")
+def healthz():
+    """
+    Liveness: the process is up and serving. Never touches the model or Qdrant.
+    """
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    """
+    Readiness: 200 once the embedding model is loaded and Qdrant collections
+    exist, 503 (with warm-up progress) until then.
+    """
+    memory = lt_memory.readiness()
+    # Also ready when warm-up is disabled and first use loaded everything
+    ready = warmup.ready or (all(memory.values()) and code_memory.readiness()["qdrant"])
+    body = {
+        "ready": ready,
+        "warmup": warmup.to_dict(),
+        "memory": memory,
+        "llm_configured": llm_config_error() is None,
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
 
 
 class ChatRequest(BaseModel):
     session_id: str
     message: str
     query_for_rag: str | None = None
+    # RAG filters on chunk meta, e.g. {"type": "operation", "service": "payments"}
+    rag_filters: dict[str, str | list[str]] | None = None
 
 class GenerateTestsRequest(BaseModel):
     session_id: str
     service_path: str
     extra_instructions: str | None = None
+    rag_filters: dict[str, str | list[str]] | None = None
 
 @app.post("/chat")
 def chat(req: ChatRequest):
     agent = TestWeaverAgent(req.session_id, rag_index, st_memory, SVC_REPO)
 
+    # One retrieval per request: the same hits feed the prompt and the UI
     rag_query = req.query_for_rag or req.message
-    rag_hits = get_rag_hits(rag_query, top_k=5) if rag_query else []
+    retrieval = rag_index.retrieve(rag_query, top_k=5, filters=req.rag_filters) if rag_query else None
 
-    answer = agent.chat(req.message, query_for_rag=req.query_for_rag)
+    answer = agent.chat(
+        req.message,
+        query_for_rag=req.query_for_rag,
+        retrieval=retrieval if req.query_for_rag else None,
+    )
 
     return {
         "reply": answer,
-        "rag_hits": rag_hits
+        "rag_hits": retrieval.ui_hits() if retrieval else []
     }
 
 
@@ -156,15 +175,16 @@ def generate_tests(req: GenerateTestsRequest):
     try:
         agent = TestWeaverAgent(req.session_id, rag_index, st_memory, SVC_REPO)
 
-        # ✅ Build a query to retrieve relevant chunks for test generation
-        rag_query = f"{req.service_path}\n{req.extra_instructions or ''}".strip()
-        rag_hits = get_rag_hits(rag_query, top_k=5) if rag_query else []
+        # ✅ Retrieve once; the agent builds its prompt context from the same hits
+        rag_query = agent.test_rag_query(req.service_path, req.extra_instructions or "")
+        retrieval = rag_index.retrieve(rag_query, top_k=5, filters=req.rag_filters)
 
         result = agent.generate_tests_for_file(
             req.service_path,
             extra_instructions=req.extra_instructions or "",
             compile_after=True,
-            max_attempts=3
+            max_attempts=3,
+            retrieval=retrieval,
         )
 
         # Ensure test_code is always a string (prevents [object Object])
@@ -173,7 +193,7 @@ def generate_tests(req: GenerateTestsRequest):
             result["test_code"] = str(tc)
 
         # ✅ Add rag_hits to keep response consistent with /chat
-        result["rag_hits"] = rag_hits
+        result["rag_hits"] = retrieval.ui_hits()
         result["rag_query"] = rag_query  # optional but helpful for debugging/UI
 
         return result
@@ -182,54 +202,193 @@ def generate_tests(req: GenerateTestsRequest):
         raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {e}")
 
 
-@app.post("/ingest/pdf")
-async def ingest_pdf(session_id: str = Form(...), file: UploadFile = File(...)):
-    os.makedirs(settings.DOC_STORE_PATH, exist_ok=True)
-    temp_path = os.path.join(settings.DOC_STORE_PATH, file.filename)
-    content = await file.read()
-    with open(temp_path, "wb") as f:
-        f.write(content)
-
-    chunks = load_pdf_as_chunks(temp_path, max_chars=1200, overlap_chars=200)
-
+def _pdf_chunk_docs(pdf_path: str, filename: str, session_id: str):
+    """
+    Lazily yield (doc_id, text, meta) for each PDF chunk as it is parsed.
+    `total_chunks` is only known at the end and is set afterwards.
+    """
+    chunks = iter_pdf_chunks(
+        pdf_path,
+        max_chars=1200,
+        overlap_chars=200,
+        workers=settings.PDF_EXTRACT_WORKERS,
+        cache_dir=settings.PDF_TEXT_CACHE_DIR,
+        max_tokens=settings.CHUNK_MAX_TOKENS or None,
+        overlap_tokens=settings.CHUNK_OVERLAP_TOKENS,
+    )
     for i, chunk in enumerate(chunks):
-        doc_id = f"pdf:{file.filename}:chunk:{i}"
-        rag_index.ingest_text(
-            doc_id,
+        yield (
+            f"pdf:{filename}:chunk:{i}",
             chunk,
-            meta={
+            {
                 "type": "pdf",
                 "session_id": session_id,
-                "filename": file.filename,
+                "filename": filename,
                 "chunk_index": i,
-                "total_chunks": len(chunks),
             },
         )
 
-    return {"status": "ok", "chunks": len(chunks)}
 
-@app.post("/ingest/swagger")
-def ingest_swagger(url: str):
-    openapi = fetch_swagger_json(url)
+def _run_pdf_job(job: IngestJob) -> dict:
+    p = job.params
+    source_id = f"pdf:{p['filename']}"
+    docs = _pdf_chunk_docs(p["path"], p["filename"], p["session_id"])
+
+    stats = rag_index.sync_source(source_id, docs, progress=job.report, stop=job.cancel_event)
+    lt_memory.update_source_meta(source_id, {"total_chunks": stats["total"]})
+    return {"chunks": stats["total"], **stats}
+
+
+def _run_swagger_job(job: IngestJob) -> dict:
+    """
+    Conditional fetch + content-hash sync against the manifest in Qdrant:
+    - 304 Not Modified, and Qdrant still holds the chunks of the last sync
+      -> nothing to do (one round trip + one count)
+    - otherwise -> only changed operations/schemas are embedded, removed
+      ones deleted (`sync_source`)
+
+    The local state only holds the HTTP validators. They are dropped when
+    the chunk count no longer matches, e.g. after a delete, a wipe or an
+    ingest on another replica, so Qdrant stays the source of truth.
+    """
+    url = job.params["url"]
+    source_id = f"swagger:{url}"
+    state = {} if job.params.get("force") else swagger_state.get(url)
+    if state and lt_memory.count_source(source_id) != state.get("chunks"):
+        state = {}
+
+    openapi, validators = fetch_swagger_spec(
+        url,
+        etag=state.get("etag"),
+        last_modified=state.get("last_modified"),
+    )
+    if openapi is None:
+        return {"not_modified": True, "chunks_ingested": 0, "changed": [], "removed": []}
 
     chunks = openapi_to_rag_chunks(
         openapi,
         source_url=url,
-        service_name="svc-accounting"
+        service_name="svc-accounting",
+        max_tokens=settings.CHUNK_MAX_TOKENS or None,
+    )
+    docs = [(swagger_doc_id(ch["meta"]), ch["text"], ch["meta"]) for ch in chunks]
+
+    changes: dict = {}
+    stats = rag_index.sync_source(source_id, docs, progress=job.report, stop=job.cancel_event, changes=changes)
+
+    swagger_state.put(url, {**validators, "chunks": lt_memory.count_source(source_id)})
+    return {"not_modified": False, "chunks_ingested": len(docs), **changes, **stats}
+
+
+def _run_code_job(job: IngestJob) -> dict:
+    p = job.params
+    indexer = CodeIndexer(
+        MCPGitClient(p["repo"]),
+        code_memory,
+        base_path=p["base_path"],
+        fetch_batch_size=settings.CODE_FETCH_BATCH_SIZE,
+        fetch_workers=settings.CODE_FETCH_WORKERS,
+        max_tokens=settings.CHUNK_MAX_TOKENS or None,
     )
+    return indexer.index(force=p.get("force", False), progress=job.report, stop=job.cancel_event)
+
+
+ingest_jobs = IngestJobQueue(
+    handlers={"pdf": _run_pdf_job, "swagger": _run_swagger_job, "code": _run_code_job},
+    max_workers=settings.INGEST_JOB_WORKERS,
+    max_pending=settings.INGEST_JOB_MAX_PENDING,
+    checkpoint_path=settings.INGEST_JOB_CHECKPOINT,
+)
+
+
+@app.on_event("startup")
+def resume_ingest_jobs():
+    if settings.WARMUP_ON_STARTUP:
+        warmup.start()
+    ingest_jobs.resume()
 
-    count = 0
-    for ch in chunks:
-        m = ch["meta"]
-        if m["type"] == "operation":
-            doc_id = f"swagger::op::{m['method']}::{m['path']}"
-        else:
-            doc_id = f"swagger::schema::{m['schema_name']}"
 
-        rag_index.ingest_text(doc_id, ch["text"], meta=m)
-        count += 1
+@app.on_event("shutdown")
+def stop_ingest_jobs():
+    warmup.stop()
+    ingest_jobs.shutdown()
+    lt_memory.close()
+
+
+def _submit_ingest_job(kind: str, params: dict) -> dict:
+    try:
+        job = ingest_jobs.submit(kind, params)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return job.to_dict()
 
-    return {"ok": True, "chunks_ingested": count}
+
+@app.post("/ingest/pdf", status_code=202)
+async def ingest_pdf(session_id: str = Form(...), file: UploadFile = File(...)):
+    """
+    Store the upload and queue it for background ingestion.
+    Poll `GET /ingest/jobs/{job_id}` for progress.
+    """
+    os.makedirs(settings.DOC_STORE_PATH, exist_ok=True)
+    temp_path = os.path.join(settings.DOC_STORE_PATH, file.filename)
+
+    # Stream the upload to disk block by block (never hold the whole PDF in memory)
+    with open(temp_path, "wb") as f:
+        while True:
+            block = await file.read(settings.UPLOAD_BLOCK_SIZE)
+            if not block:
+                break
+            f.write(block)
+
+    return _submit_ingest_job(
+        "pdf",
+        {"path": temp_path, "filename": file.filename, "session_id": session_id},
+    )
+
+@app.post("/ingest/swagger", status_code=202)
+def ingest_swagger(url: str, force: bool = False):
+    """
+    Queue a Swagger/OpenAPI spec (JSON or YAML) for background ingestion.
+    `force=true` ignores the cached ETag and re-syncs everything.
+    """
+    return _submit_ingest_job("swagger", {"url": url, "force": force})
+
+
+@app.post("/ingest/code", status_code=202)
+def ingest_code(repo: str | None = None, base_path: str = "src/main/java", force: bool = False):
+    """
+    Queue (re-)indexing of a repo's Java sources into the code collection.
+    Only files whose git blob SHA changed since the last run are fetched and
+    embedded; `force=true` re-indexes everything.
+    """
+    return _submit_ingest_job("code", {"repo": repo or SVC_REPO, "base_path": base_path, "force": force})
+
+
+@app.get("/ingest/jobs")
+def list_ingest_jobs():
+    jobs = [job.to_dict() for job in ingest_jobs.list()]
+    return {"count": len(jobs), "jobs": jobs}
+
+
+@app.get("/ingest/jobs/{job_id}")
+def get_ingest_job(job_id: str):
+    """
+    Job status and progress (chunks parsed, embedded, upserted).
+    """
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingest job not found: {job_id}")
+    return job.to_dict()
+
+
+@app.post("/ingest/jobs/{job_id}/cancel")
+def cancel_ingest_job(job_id: str):
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingest job not found: {job_id}")
+    if not ingest_jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Ingest job already finished: {job_id}")
+    return job.to_dict()
 
 
 @app.get("/rag/docs")
@@ -254,6 +413,29 @@ def list_rag_docs(limit: int = 100):
         "docs": docs,
     }
 
+@app.get("/rag/cache")
+def rag_cache_stats():
+    """
+    Cache counters: persistent embedding cache (entries, hits, misses,
+    evictions), query-embedding LRU and retrieval-result cache (hit rate,
+    latency saved), plus the collection generation.
+    """
+    cache = lt_memory.embedding_cache
+    service = None
+    if settings.EMBEDDING_SERVICE_SOCKET:
+        # Service mode: the embedding cache lives in the shared embedding process
+        try:
+            service = EmbeddingServiceClient(settings.EMBEDDING_SERVICE_SOCKET).stats()
+        except Exception as e:
+            service = {"error": f"{type(e).__name__}: {e}"}
+    return {
+        "embedding": cache.stats() if cache is not None else None,
+        "embedding_service": service,
+        **rag_index.cache_stats(),
+        "generation": lt_memory.generation,
+    }
+
+
 from fastapi import HTTPException
 
 @app.get("/rag/chunks")
@@ -290,6 +472,58 @@ def list_chunks(limit: int = 20):
         "chunks": out
     }
 
+@app.get("/rag/search")
+def rag_search(
+    q: str,
+    top_k: int = 5,
+    doc_type: str | None = Query(None, alias="type"),
+    service: str | None = None,
+    filename: str | None = None,
+    session_id: str | None = None,
+    source_id: str | None = None,
+):
+    """
+    Semantic search with optional filters, e.g.
+    /rag/search?q=refund&type=operation&service=payments
+    """
+    filters = {
+        "type": doc_type,
+        "service": service,
+        "filename": filename,
+        "session_id": session_id,
+        "source_id": source_id,
+    }
+    filters = {k: v for k, v in filters.items() if v is not None}
+    try:
+        hits = rag_index.search(q, top_k=top_k, filters=filters)
+    except Exception as e:
+        raise HTTPException(500, f"Error searching RAG: {e}")
+
+    return {
+        "query": q,
+        "filters": filters,
+        "count": len(hits),
+        "hits": [
+            {"doc_id": h["doc_id"], "score": h["score"], "meta": h["meta"], "text_preview": (h["text"] or "")[:400]}
+            for h in hits
+        ],
+    }
+
+def _forget_swagger_state(filters: dict) -> None:
+    """
+    Drop the cached validators of every spec a delete may have touched, so
+    its next ingest re-syncs instead of answering not_modified.
+    """
+    source_id = filters.get("source_id") or ""
+    if filters.get("source"):
+        swagger_state.delete(filters["source"])
+    elif source_id.startswith("swagger:"):
+        swagger_state.delete(source_id[len("swagger:"):])
+    elif not (source_id or filters.get("filename") or filters.get("session_id")):
+        # Not narrowed to a PDF or code source: any spec may be affected
+        swagger_state.clear()
+
+
 @app.delete("/rag/docs/{doc_id}")
 def delete_rag_doc(doc_id: str):
     """
@@ -300,35 +534,74 @@ def delete_rag_doc(doc_id: str):
     ok = lt_memory.delete_document(doc_id)
     if not ok:
         raise HTTPException(status_code=404, detail=f"Document not found: {doc_id}")
+    if doc_id.startswith("swagger::"):
+        _forget_swagger_state({})
 
     return {"deleted": True, "doc_id": doc_id}
 
 
 @app.delete("/rag/docs")
-def delete_rag_docs(doc_id: str | None = None):
+def delete_rag_docs(
+    doc_id: str | None = None,
+    filename: str | None = None,
+    source: str | None = None,
+    service: str | None = None,
+    doc_type: str | None = Query(None, alias="type"),
+    session_id: str | None = None,
+    source_id: str | None = None,
+    doc_id_prefix: str | None = None,
+):
     """
     Delete documents from RAG storage.
 
     - If `doc_id` is provided as a query parameter, delete that single document.
-    - If `doc_id` is omitted or empty, delete ALL RAG content.
+    - With any of `filename`, `source` (Swagger URL), `service`, `type`,
+      `session_id`, `source_id` or `doc_id_prefix`, delete every matching
+      chunk in one filtered delete and return the count.
+    - If nothing is given, delete ALL RAG content (the collection is recreated;
+      409 while a reindex of the collection is unfinished).
 
     Examples:
       DELETE /rag/docs?doc_id=pdf:foo.pdf:chunk:0
+      DELETE /rag/docs?filename=foo.pdf
+      DELETE /rag/docs?doc_id_prefix=swagger::
       DELETE /rag/docs  # deletes everything
     """
-    try:
-        ok = lt_memory.delete_document(doc_id)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error deleting RAG documents: {e}")
-
-    # When deleting a specific doc, preserve old behavior and return 404 if not found
     if doc_id:
+        ok = lt_memory.delete_document(doc_id)
+        # When deleting a specific doc, preserve old behavior and return 404 if not found
         if not ok:
             raise HTTPException(status_code=404, detail=f"Document not found: {doc_id}")
+        if doc_id.startswith("swagger::"):
+            _forget_swagger_state({})
         return {"deleted": True, "doc_id": doc_id}
 
+    filters = {
+        "filename": filename,
+        "source": source,
+        "service": service,
+        "type": doc_type,
+        "session_id": session_id,
+        "source_id": source_id,
+    }
+    filters = {k: v for k, v in filters.items() if v is not None}
+    try:
+        if filters or doc_id_prefix:
+            count = rag_index.delete_by_filter(filters, doc_id_prefix=doc_id_prefix)
+            if count:
+                _forget_swagger_state(filters)
+            return {"deleted": count, "filters": filters, "doc_id_prefix": doc_id_prefix}
+        count = lt_memory.delete_all()
+        swagger_state.clear()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ReindexInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting RAG documents: {e}")
+
     # Deleting all
-    return {"deleted_all": True, "ok": bool(ok)}
+    return {"deleted_all": True, "ok": True, "deleted": count}
 
 @app.get("/generate-tests/stream")
 def generate_tests_stream(service_path: str, extra_instructions: str = "", repo: str = "svc-accounting"):
@@ -3,13 +3,7 @@ import time
 import httpx
 from dotenv import load_dotenv
 
-# Load env file once
-load_dotenv()
-
-import os
-import time
-import httpx
-from dotenv import load_dotenv
+from ..utils.logging import logger
 
 # Load env file once
 load_dotenv()
@@ -18,23 +12,39 @@ BASE_URL = os.getenv("LLM_BASE_URL")
 MODEL_NAME = os.getenv("LLM_MODEL_NAME")
 API_KEY = os.getenv("OPENAI_API_KEY") or os.getenv("LLM_API_KEY")
 
-if not BASE_URL:
-    raise RuntimeError("LLM_BASE_URL is missing in .env")
+# Detect local LLM (so API key should be ignored)
+IS_LOCAL = bool(BASE_URL) and (BASE_URL.startswith("http://localhost") or BASE_URL.startswith("http://127.0.0.1"))
 
-if not MODEL_NAME:
-    raise RuntimeError("LLM_MODEL_NAME is missing in .env")
+_config_logged = False
 
-# Detect local LLM (so API key should be ignored)
-IS_LOCAL = BASE_URL.startswith("http://localhost") or BASE_URL.startswith("http://127.0.0.1")
 
-print("[LLM] BASE_URL =", BASE_URL)
-print("[LLM] MODEL_NAME =", MODEL_NAME)
-print("[LLM] API_KEY present =", bool(API_KEY))
-print("[LLM] IS_LOCAL =", IS_LOCAL)
+def llm_config_error() -> str | None:
+    """
+    Why the LLM client cannot be built, or None when the config is complete.
+    Checked when a client is created, not at import.
+    """
+    if not BASE_URL:
+        return "LLM_BASE_URL is missing in .env"
+    if not MODEL_NAME:
+        return "LLM_MODEL_NAME is missing in .env"
+    return None
 
 
 class LLMClient:
     def __init__(self):
+        global _config_logged
+
+        error = llm_config_error()
+        if error:
+            raise RuntimeError(error)
+
+        if not _config_logged:
+            logger.info(
+                "[LLM] BASE_URL=%s MODEL_NAME=%s API_KEY present=%s IS_LOCAL=%s",
+                BASE_URL, MODEL_NAME, bool(API_KEY), IS_LOCAL,
+            )
+            _config_logged = True
+
         headers = {"Content-Type": "application/json"}
 
         # ONLY send key if not local (Ollama ignores Bearer anyway)
@@ -88,11 +98,3 @@ class LLMClient:
 
         raise RuntimeError("Failed after retries")
 
-
-# Detect local LLM (so API key should be ignored)
-IS_LOCAL = BASE_URL.startswith("http://localhost") or BASE_URL.startswith("http://127.0.0.1")
-
-print("[LLM] BASE_URL =", BASE_URL)
-print("[LLM] MODEL_NAME =", MODEL_NAME)
-print("[LLM] API_KEY present =", bool(API_KEY))
-print("[LLM] IS_LOCAL =", IS_LOCAL)
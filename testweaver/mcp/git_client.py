@@ -2,6 +2,7 @@
 import os
 import base64
 import httpx
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Literal, Dict, Any
 
 GIT_MCP_ENDPOINT = os.getenv("GIT_MCP_ENDPOINT", "http://localhost:9000/git-mcp")
@@ -29,6 +30,8 @@ class MCPGitClient:
             headers={"Authorization": f"Bearer {GIT_TOKEN}"} if GIT_TOKEN else {},
             timeout=timeout
         )
+        # None = unknown until the first get_files() call probes POST /files
+        self._batch_files_supported: Optional[bool] = None
 
     def get_file(self, path: str) -> str:
         resp = self.client.post("/file", json={"repo": self.repo, "path": path})
@@ -94,6 +97,55 @@ class MCPGitClient:
         resp = self.client.post("/list", json={"repo": self.repo, "base_path": base_path, "ext": ".java"})
         resp.raise_for_status()
         return resp.json()["files"]
+
+    def list_files_with_sha(self, base_path: str = "src/main/java", ext: str = ".java") -> List[Dict[str, Optional[str]]]:
+        """
+        List files with their git blob SHA: [{"path": str, "sha": str | None}, ...].
+        Servers that ignore `with_sha` return plain paths; their sha is None and
+        callers have to hash the content themselves.
+        """
+        resp = self.client.post(
+            "/list",
+            json={"repo": self.repo, "base_path": base_path, "ext": ext, "with_sha": True},
+        )
+        resp.raise_for_status()
+        out = []
+        for entry in resp.json()["files"]:
+            if isinstance(entry, dict):
+                out.append({"path": entry.get("path"), "sha": entry.get("sha") or entry.get("blob_sha")})
+            else:
+                out.append({"path": entry, "sha": None})
+        return out
+
+    def get_files(self, paths: List[str], max_workers: int = 8) -> Dict[str, str]:
+        """
+        Fetch many files: one POST /files round trip when the server supports it,
+        otherwise concurrent /file calls (at most `max_workers` in flight).
+        Returns {path: content}.
+        """
+        if not paths:
+            return {}
+
+        if self._batch_files_supported is not False:
+            resp = self.client.post("/files", json={"repo": self.repo, "paths": paths})
+            if resp.status_code in (404, 405):
+                self._batch_files_supported = False
+            else:
+                resp.raise_for_status()
+                self._batch_files_supported = True
+                out = {}
+                for entry in resp.json().get("files", []):
+                    content = entry.get("content", "")
+                    if entry.get("encoding") == "base64":
+                        try:
+                            content = base64.b64decode(content).decode("utf-8")
+                        except Exception as e:
+                            raise RuntimeError(f"failed to decode base64 content from git-mcp for '{entry.get('path')}': {e}")
+                    out[entry["path"]] = content
+                return out
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(paths)))) as pool:
+            return dict(zip(paths, pool.map(self.get_file, paths)))
     
     def get_pr_diff(self, pr_number: int) -> str:
         resp = self.client.post("/pr-diff", json={"repo": self.repo, "pr_number": pr_number})
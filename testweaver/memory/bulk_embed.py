@@ -0,0 +1,95 @@
+# memory/bulk_embed.py
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.logging import logger
+
+# Per-process model, loaded once by the pool initializer
+_worker_model = None
+
+
+def _init_worker(backend: str, model_name: str, torch_threads: int) -> None:
+    global _worker_model
+    try:
+        import torch
+
+        # N processes x all cores each would oversubscribe the CPU
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    from .embedders import create_embedder
+
+    _worker_model = create_embedder(backend, model_name)
+
+
+def _encode_chunk(task: Tuple[List[str], int]) -> np.ndarray:
+    """
+    Top-level so it can be pickled by ProcessPoolExecutor.
+    """
+    texts, batch_size = task
+    vecs = _worker_model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+    return np.asarray(vecs, dtype=np.float32)
+
+
+class BulkEmbeddingPool:
+    """
+    Multi-process encoder for large ingestion batches.
+
+    Texts are cut into work items of `chunk_size`, encoded by `workers`
+    processes (each with its own model copy, started on first use with the
+    spawn context) and reassembled in input order.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        workers: int,
+        chunk_size: int = 128,
+        batch_size: int = 64,
+        backend: str = "sentence-transformers",
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+                logger.info(
+                    "Bulk embedding pool: %d worker(s), %d torch thread(s) each, chunk_size=%d",
+                    self.workers, torch_threads, self.chunk_size,
+                )
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.backend, self.model_name, torch_threads),
+                )
+            return self._executor
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts across the pool; returns float32 [len(texts), dim] in input order.
+        """
+        # Small inputs: spread evenly instead of leaving workers idle
+        size = max(1, min(self.chunk_size, math.ceil(len(texts) / self.workers)))
+        tasks = [(texts[i:i + size], self.batch_size) for i in range(0, len(texts), size)]
+        return np.vstack(list(self._pool().map(_encode_chunk, tasks)))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,88 @@
+# memory/embedders.py
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Type
+
+from ..utils.logging import logger
+
+
+class Embedder(ABC):
+    """
+    Interface of the embedding backends used by `LongTermMemory`.
+
+    Mirrors `SentenceTransformer.encode`: a str returns one vector, a list
+    returns a 2D array (one row per text, in order).
+    """
+
+    # Backend name, part of the embedding cache key (vectors of different
+    # backends for the same model are not interchangeable)
+    backend = ""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.model_name}:{self.backend}" if self.backend else self.model_name
+
+    @abstractmethod
+    def encode(self, texts, batch_size: Optional[int] = None, show_progress_bar: bool = False):
+        ...
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return len(self.encode("dim check"))
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """
+    Default backend: float32 SentenceTransformer on CPU/GPU.
+    """
+
+    backend = ""
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        # Imported here: torch + sentence-transformers take seconds to import
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts, batch_size: Optional[int] = None, show_progress_bar: bool = False):
+        return self.model.encode(texts, batch_size=batch_size or 32, show_progress_bar=show_progress_bar)
+
+
+class Int8Embedder(SentenceTransformerEmbedder):
+    """
+    Same model with its Linear layers dynamically quantized to int8
+    (torch.quantization.quantize_dynamic). CPU only; weights come from the
+    local Hugging Face cache like the float model, and quantization runs
+    once at load time.
+    """
+
+    backend = "int8"
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        import torch
+
+        self.model.to("cpu")
+        torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+EMBEDDER_BACKENDS: Dict[str, Type[Embedder]] = {
+    "sentence-transformers": SentenceTransformerEmbedder,
+    "int8": Int8Embedder,
+}
+
+
+def create_embedder(backend: str, model_name: str) -> Embedder:
+    """
+    Build the embedder for an EMBED_BACKEND name.
+    """
+    try:
+        cls = EMBEDDER_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown embedding backend {backend!r}; expected one of {sorted(EMBEDDER_BACKENDS)}"
+        )
+    logger.info("Loading embedder: backend=%s model=%s", backend, model_name)
+    return cls(model_name)
@@ -0,0 +1,266 @@
+# memory/embedding_cache.py
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from ..utils.logging import logger
+
+_KEY_BYTES = 16
+
+
+class EmbeddingCache:
+    """
+    Persistent, size-bounded LRU cache of embeddings.
+
+    Key: (model name, sha256 of the normalized text). Layout under
+    `<cache_dir>/<model>-<dim>/`:
+    - vectors.f32  memory-mapped float32 [capacity, dim]
+    - keys.bin     memory-mapped key digest per slot (guards against a stale
+                   index pointing at a slot that was reused before a crash)
+    - index.json   slot of every key, in LRU order
+    - lock         flock taken around slot allocation and index writes
+
+    The index is rewritten at most every `flush_interval` seconds (and on
+    `flush()`), so lookups and inserts never block on disk.
+
+    Several processes (API workers, the reindex script, bulk workers) may
+    open the same directory, each with its own LRU view. Every read checks
+    the slot's key in `keys.bin`, so a slot another process reused is a
+    miss, never a wrong vector. Allocation skips slots another process has
+    filled, and index writes merge the entries already on disk.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        model_name: str,
+        dim: int,
+        capacity: int = 100_000,
+        flush_interval: float = 5.0,
+    ):
+        self.model_name = model_name
+        self.dim = dim
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+
+        safe_model = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.path = os.path.join(cache_dir, f"{safe_model}-{dim}")
+        os.makedirs(self.path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[bytes, int]" = OrderedDict()
+        self._free: List[int] = []
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock_file = open(os.path.join(self.path, "lock"), "a+")
+        with self._file_lock():
+            self._vectors = self._open_memmap("vectors.f32", np.float32, (capacity, dim))
+            self._keys = self._open_memmap("keys.bin", np.uint8, (capacity, _KEY_BYTES))
+            self._load_index()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _open_memmap(self, name: str, dtype, shape) -> np.memmap:
+        file_path = os.path.join(self.path, name)
+        expected = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if not os.path.exists(file_path) or os.path.getsize(file_path) != expected:
+            # New cache or capacity changed: start empty
+            with open(file_path, "wb") as f:
+                f.truncate(expected)
+        return np.memmap(file_path, dtype=dtype, mode="r+", shape=shape)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """
+        Exclusive lock shared with other processes using this directory.
+        """
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read_index(self) -> list:
+        index_path = os.path.join(self.path, "index.json")
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("entries", [])
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.warning("Embedding cache index %s unreadable (%s); ignoring it", index_path, e)
+            return []
+
+    def _slot_holds(self, slot: int, key: bytes) -> bool:
+        return self._keys[slot].tobytes() == key
+
+    def _load_index(self) -> None:
+        used = set()
+        for key_hex, slot in self._read_index():
+            key = bytes.fromhex(key_hex)
+            if 0 <= slot < self.capacity and slot not in used and self._slot_holds(slot, key):
+                self._lru[key] = slot
+                used.add(slot)
+        self._free = [slot for slot in range(self.capacity - 1, -1, -1) if slot not in used]
+        logger.debug("Embedding cache %s: %d entries loaded", self.path, len(self._lru))
+
+    def _adopt(self, slot: int) -> bool:
+        """
+        Take over a slot another process filled (as least recently used).
+        Returns False if the slot is empty.
+        """
+        key = self._keys[slot].tobytes()
+        if not any(key) or key in self._lru:
+            return False
+        self._lru[key] = slot
+        self._lru.move_to_end(key, last=False)
+        return True
+
+    def _forget(self, key: bytes, slot: int) -> None:
+        """
+        Drop an entry whose slot another process reused.
+        """
+        del self._lru[key]
+        if not self._adopt(slot):
+            self._free.append(slot)
+
+    def _allocate(self) -> int:
+        """
+        A slot for a new key: a free one nobody else took meanwhile, else
+        the least recently used one. Call with the file lock held.
+        """
+        while self._free:
+            slot = self._free.pop()
+            if not self._adopt(slot):
+                return slot
+        _, slot = self._lru.popitem(last=False)
+        self.evictions += 1
+        return slot
+
+    def _key(self, text: str) -> bytes:
+        h = hashlib.sha256(self.model_name.encode("utf-8") + b"\0" + text.encode("utf-8"))
+        return h.digest()[:_KEY_BYTES]
+
+    def _maybe_flush(self) -> None:
+        if self._dirty and time.monotonic() - self._last_flush >= self.flush_interval:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        """
+        Write the index, merged with the entries other processes wrote.
+        Call with both locks held.
+        """
+        self._vectors.flush()
+        self._keys.flush()
+
+        # Drop our entries whose slot another process reused, then add theirs
+        for key, slot in list(self._lru.items()):
+            if not self._slot_holds(slot, key):
+                del self._lru[key]
+                self._free.append(slot)
+        used = set(self._lru.values())
+        for key_hex, slot in self._read_index():
+            key = bytes.fromhex(key_hex)
+            if 0 <= slot < self.capacity and slot not in used and key not in self._lru and self._slot_holds(slot, key):
+                self._lru[key] = slot
+                self._lru.move_to_end(key, last=False)
+                used.add(slot)
+        self._free = [slot for slot in self._free if slot not in used]
+
+        index_path = os.path.join(self.path, "index.json")
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "model": self.model_name,
+                    "dim": self.dim,
+                    "entries": [[key.hex(), slot] for key, slot in self._lru.items()],
+                },
+                f,
+            )
+        os.replace(tmp_path, index_path)
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Cached vector per text, or None on a miss (same order as `texts`).
+        """
+        out: List[Optional[List[float]]] = []
+        with self._lock:
+            for text in texts:
+                key = self._key(text)
+                slot = self._lru.get(key)
+                vector = None
+                if slot is not None:
+                    vector = self._vectors[slot].tolist()
+                    # Checked after the copy: a concurrent rewrite clears the key first
+                    if not self._slot_holds(slot, key):
+                        self._forget(key, slot)
+                        vector = None
+                if vector is None:
+                    self.misses += 1
+                    out.append(None)
+                    continue
+                self._lru.move_to_end(key)
+                self.hits += 1
+                out.append(vector)
+        return out
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """
+        Store vectors, evicting least recently used entries when full.
+        """
+        with self._lock, self._file_lock():
+            for text, vector in zip(texts, vectors):
+                if len(vector) != self.dim:
+                    continue
+                key = self._key(text)
+                slot = self._lru.get(key)
+                if slot is not None and not self._slot_holds(slot, key):
+                    self._forget(key, slot)
+                    slot = None
+                if slot is None:
+                    slot = self._allocate()
+                    self._lru[key] = slot
+                else:
+                    self._lru.move_to_end(key)
+                # Invalidate, write vector, then key: a torn write can only fail the key check
+                self._keys[slot] = 0
+                self._vectors[slot] = vector
+                self._keys[slot] = np.frombuffer(key, dtype=np.uint8)
+                self._dirty = True
+            self._maybe_flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._dirty:
+                with self._file_lock():
+                    self._flush_locked()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._lru),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
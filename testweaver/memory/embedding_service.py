@@ -0,0 +1,320 @@
+# memory/embedding_service.py
+"""
+Shared embedding process for multi-worker deployments.
+
+One process loads the model and serves encode requests from every uvicorn
+worker over a Unix socket. Requests are coalesced by a `MicroBatcher`
+(`--max-batch` texts / `--max-wait-ms` window), so concurrent query
+embeddings from different workers share one forward pass.
+
+Run it next to the API:
+
+    python -m testweaver.memory.embedding_service --socket /tmp/testweaver-embed.sock
+
+and point the workers at it with EMBEDDING_SERVICE_SOCKET.
+
+Wire format: every message is a frame (4-byte big-endian length + body).
+A request is one JSON frame. A reply is a JSON header frame, followed for
+"encode" by one frame of little-endian float32 vectors [n, dim].
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .embedders import create_embedder
+from .embedding_cache import EmbeddingCache
+from .micro_batcher import MicroBatcher
+from ..utils.logging import logger
+
+_LEN = struct.Struct(">I")
+
+
+def _send_frame(sock: socket.socket, body: bytes) -> None:
+    sock.sendall(_LEN.pack(len(body)) + body)
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        part = sock.recv(n - len(buf))
+        if not part:
+            raise ConnectionError("embedding service connection closed")
+        buf += part
+    return bytes(buf)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (n,) = _LEN.unpack(_recv_exact(sock, _LEN.size))
+    return _recv_exact(sock, n)
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    # Every worker thread holds its own connection; the default backlog (5)
+    # refuses bursts of new connections with EAGAIN
+    request_queue_size = 256
+
+
+class EmbeddingServer:
+    """
+    Owns the model (and the persistent embedding cache) for all workers.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        socket_path: str,
+        max_batch: int = 64,
+        max_wait_ms: float = 2.0,
+        cache_dir: Optional[str] = None,
+        cache_size: int = 100_000,
+        backend: str = "sentence-transformers",
+    ):
+        self.model_name = model_name
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.model = create_embedder(backend, model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.cache = (
+            EmbeddingCache(cache_dir, self.model.cache_key, self.dim, capacity=cache_size)
+            if cache_dir and cache_size > 0
+            else None
+        )
+
+        # Requests from all workers are coalesced here; "cache": false requests
+        # (throwaway texts) get their own batcher that bypasses the cache
+        self._batcher = MicroBatcher(self._encode, max_batch=max_batch, max_wait_ms=max_wait_ms, name="embed-service")
+        self._uncached_batcher = MicroBatcher(
+            self._encode_uncached,
+            max_batch=max_batch,
+            max_wait_ms=max_wait_ms,
+            name="embed-service-uncached",
+        )
+        self._encoded = 0
+        self._stats_lock = threading.Lock()
+        self._server: Optional[_UnixServer] = None
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        cached = self.cache.get_many(texts) if self.cache else [None] * len(texts)
+        misses = [i for i, vec in enumerate(cached) if vec is None]
+        for i, vec in enumerate(cached):
+            if vec is not None:
+                out[i] = vec
+
+        if misses:
+            unique = list(dict.fromkeys(texts[i] for i in misses))
+            encoded = np.asarray(
+                self.model.encode(unique, batch_size=self.max_batch, show_progress_bar=False),
+                dtype=np.float32,
+            )
+            row = {text: encoded[k] for k, text in enumerate(unique)}
+            for i in misses:
+                out[i] = row[texts[i]]
+            if self.cache:
+                self.cache.put_many(unique, encoded.tolist())
+            with self._stats_lock:
+                self._encoded += len(unique)
+        return out
+
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        unique = list(dict.fromkeys(texts))
+        encoded = np.asarray(
+            self.model.encode(unique, batch_size=self.max_batch, show_progress_bar=False),
+            dtype=np.float32,
+        )
+        row = {text: k for k, text in enumerate(unique)}
+        with self._stats_lock:
+            self._encoded += len(unique)
+        return encoded[[row[text] for text in texts]]
+
+    def submit(self, texts: List[str], cache: bool = True) -> np.ndarray:
+        batcher = self._batcher if cache else self._uncached_batcher
+        return batcher.submit_many(texts)
+
+    def stats(self) -> Dict[str, Any]:
+        out = self._batcher.stats()
+        with self._stats_lock:
+            out["encoded"] = self._encoded
+        out["cache"] = self.cache.stats() if self.cache else None
+        return out
+
+    # ------------------------------------------------------------------
+    # Socket server
+    # ------------------------------------------------------------------
+    def _handle(self, header: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        op = header.get("op")
+        if op == "encode":
+            vectors = self.submit([str(t) for t in header.get("texts", [])], cache=header.get("cache", True))
+            return {"ok": True, "n": len(vectors), "dim": self.dim}, vectors.astype("<f4").tobytes()
+        if op == "info":
+            return {"ok": True, "model": self.model_name, "backend": self.model.backend, "dim": self.dim}, None
+        if op == "stats":
+            return {"ok": True, "stats": self.stats()}, None
+        return {"ok": False, "error": f"unknown op {op!r}"}, None
+
+    def serve_forever(self) -> None:
+        server_ref = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        header = json.loads(_recv_frame(self.request))
+                    except (ConnectionError, OSError):
+                        return
+                    try:
+                        reply, payload = server_ref._handle(header)
+                    except Exception as e:
+                        reply, payload = {"ok": False, "error": f"{type(e).__name__}: {e}"}, None
+                    _send_frame(self.request, json.dumps(reply).encode("utf-8"))
+                    if payload is not None:
+                        _send_frame(self.request, payload)
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self._server = _UnixServer(self.socket_path, Handler)
+        logger.info("Embedding service: model=%s dim=%d socket=%s", self.model_name, self.dim, self.socket_path)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._batcher.close()
+            self._uncached_batcher.close()
+            if self.cache:
+                self.cache.flush()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def shutdown(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class EmbeddingServiceClient:
+    """
+    Thin client used by `LongTermMemory` instead of a local model.
+
+    Implements the `Embedder` interface (str -> one vector, list -> list of
+    vectors). One connection per thread; reconnects once on a broken socket.
+    A timed-out request is not resent: it may still be queued in the
+    service, and resending would encode it twice.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 60.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _close(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            finally:
+                self._local.sock = None
+
+    def _call(self, header: Dict[str, Any], with_payload: bool = False) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        body = json.dumps(header).encode("utf-8")
+        for attempt in (1, 2):
+            try:
+                sock = self._connect()
+                _send_frame(sock, body)
+                reply = json.loads(_recv_frame(sock))
+                payload = _recv_frame(sock) if with_payload and reply.get("ok") else None
+                break
+            except socket.timeout:
+                # The service is slow, not gone: the request may still be served
+                self._close()
+                raise
+            except (ConnectionError, OSError):
+                # Refused or stale connection (service restarted): safe to resend
+                self._close()
+                if attempt == 2:
+                    raise
+        if not reply.get("ok"):
+            raise RuntimeError(f"embedding service error: {reply.get('error')}")
+        return reply, payload
+
+    def info(self) -> Dict[str, Any]:
+        reply, _ = self._call({"op": "info"})
+        return reply
+
+    def stats(self) -> Dict[str, Any]:
+        reply, _ = self._call({"op": "stats"})
+        return reply["stats"]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.info()["dim"]
+
+    @property
+    def cache_key(self) -> str:
+        """
+        Same as `Embedder.cache_key` of the model the service runs.
+        """
+        info = self.info()
+        return f"{info['model']}:{info['backend']}" if info.get("backend") else info["model"]
+
+    def encode(
+        self,
+        texts,
+        batch_size: Optional[int] = None,
+        show_progress_bar: bool = False,
+        cache: bool = True,
+    ):
+        """
+        `cache=False` asks the service not to read or write its embedding
+        cache for these texts.
+        """
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        header: Dict[str, Any] = {"op": "encode", "texts": batch}
+        if not cache:
+            header["cache"] = False
+        reply, payload = self._call(header, with_payload=True)
+        vectors = np.frombuffer(payload, dtype="<f4").reshape(reply["n"], reply["dim"])
+        return vectors[0] if single else vectors
+
+
+def main() -> None:
+    from ..utils import config as settings
+
+    parser = argparse.ArgumentParser(description="TestWeaver shared embedding service")
+    parser.add_argument("--socket", default=settings.EMBEDDING_SERVICE_SOCKET or "/tmp/testweaver-embed.sock")
+    parser.add_argument("--model", default=settings.EMBED_MODEL)
+    parser.add_argument("--backend", default=settings.EMBED_BACKEND)
+    parser.add_argument("--max-batch", type=int, default=settings.EMBED_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=settings.EMBED_MICROBATCH_WAIT_MS)
+    parser.add_argument("--cache-dir", default=settings.EMBED_CACHE_DIR)
+    parser.add_argument("--cache-size", type=int, default=settings.EMBED_CACHE_MAX_ENTRIES)
+    args = parser.parse_args()
+
+    EmbeddingServer(
+        args.model,
+        args.socket,
+        max_batch=args.max_batch,
+        max_wait_ms=args.max_wait_ms,
+        cache_dir=args.cache_dir,
+        cache_size=args.cache_size,
+        backend=args.backend,
+    ).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
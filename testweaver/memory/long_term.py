@@ -1,13 +1,210 @@
 # memory/long_term.py
-from typing import List, Tuple, Dict, Any, Optional
+from typing import List, Tuple, Dict, Any, Optional, Callable
+import copy
 import pathlib
 import hashlib
 import json
-from collections.abc import Mapping, Iterable
+import os
+import re
+import threading
+import time
+from collections.abc import Mapping, Iterable, Iterator
 
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qmodels
-from sentence_transformers import SentenceTransformer
+
+from .bulk_embed import BulkEmbeddingPool
+from .embedders import create_embedder
+from .embedding_cache import EmbeddingCache
+from .embedding_service import EmbeddingServiceClient
+from .micro_batcher import MicroBatcher
+from .storage_profiles import StorageProfile, get_storage_profile
+from . import sparse
+from ..utils.logging import logger
+from ..utils.lru import LRUCache
+from ..utils.pipeline import PipelineCancelled, run_stages
+from ..utils.tokens import count_tokens
+
+# Bump when derived payload fields change (e.g. token_count, doc_id_prefixes
+# were added): the next sync rewrites payloads of unchanged chunks without
+# re-embedding.
+PAYLOAD_VERSION = 3
+
+# Meta keys search and bulk deletes can filter on (stored under payload["meta"];
+# "source" is the Swagger URL)
+FILTER_KEYS = ("type", "session_id", "filename", "service", "source")
+
+# Top-level payload fields matched by filters
+_TOP_LEVEL_FIELDS = ("source_id", "doc_id")
+
+# Every prefix of the doc_id ending at a ":" ("pdf:", "pdf:<file>:",
+# "pdf:<file>:chunk:", ...): keyword indexes have no prefix match, so prefix
+# deletes match this list instead of scanning doc_ids
+DOC_ID_PREFIXES = "doc_id_prefixes"
+
+# Keyword payload indexes kept on every collection, so filtered search and
+# per-source syncs/deletes don't scan the whole collection
+INDEXED_FIELDS = _TOP_LEVEL_FIELDS + (DOC_ID_PREFIXES,) + tuple(f"meta.{key}" for key in FILTER_KEYS)
+
+
+class ReindexInProgress(RuntimeError):
+    """Raised by `LongTermMemory.delete_all` while an unserved version is being built."""
+
+
+class EmbedderMismatch(RuntimeError):
+    """Raised when the served collection version was built with another embedder."""
+
+
+def doc_id_prefixes(doc_id: str) -> List[str]:
+    return [doc_id[:i + 1] for i, ch in enumerate(doc_id) if ch == ":"]
+
+# Named sparse vector holding the BM25 terms (the dense vector stays unnamed)
+SPARSE_VECTOR = "bm25"
+
+# Versions are named `<name>_v<N>_<tag>`, the tag being a hash of the
+# embedder cache_key (model + backend) that built them. Versions from before
+# the tag have none and are not checked.
+_VERSION_TAG = re.compile(r"_v\d+_([0-9a-f]{8})$")
+
+
+def embedder_tag(cache_key: str) -> str:
+    return hashlib.sha1(cache_key.encode("utf-8")).hexdigest()[:8]
+
+
+def version_tag(collection: Optional[str]) -> Optional[str]:
+    m = _VERSION_TAG.search(collection or "")
+    return m.group(1) if m else None
+
+
+def _load_checkpoint(path: Optional[pathlib.Path]) -> Optional[dict]:
+    if not path or not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception as e:
+        logger.warning("Ignoring unreadable reindex checkpoint %s: %s", path, e)
+        return None
+
+
+def _save_checkpoint(path: Optional[pathlib.Path], state: dict) -> None:
+    if not path:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+class _Backend:
+    """
+    Embedding model, embedding cache and Qdrant client, created on first use
+    (or by `warm_up`) and shared by sibling collections.
+    """
+
+    def __init__(
+        self,
+        embedding_model_name: str,
+        qdrant_url: str,
+        qdrant_api_key: Optional[str],
+        local_qdrant_path: Optional[str],
+        embedding_cache_dir: Optional[str],
+        embedding_cache_size: int,
+        embedding_service_socket: Optional[str] = None,
+        bulk_workers: int = 0,
+        bulk_chunk_size: int = 128,
+        embed_batch_size: int = 64,
+        embedding_backend: str = "sentence-transformers",
+    ):
+        self.embedding_model_name = embedding_model_name
+        self.embedding_backend = embedding_backend
+        self.embedding_service_socket = embedding_service_socket
+        self.qdrant_url = qdrant_url
+        self.qdrant_api_key = qdrant_api_key
+        self.local_qdrant_path = local_qdrant_path
+        self.embedding_cache_dir = embedding_cache_dir
+        self.embedding_cache_size = embedding_cache_size
+
+        self.embedder = None
+        self.vector_dim: Optional[int] = None
+        # embedder_tag of the loaded embedder (matched against version names)
+        self.embedder_tag: Optional[str] = None
+        self.embedding_cache: Optional[EmbeddingCache] = None
+        self.client: Optional[QdrantClient] = None
+        self._embedder_lock = threading.Lock()
+        self._client_lock = threading.Lock()
+
+        # Multi-process encoder for bulk ingestion (processes start on first use;
+        # not used in service mode, the embedding process owns the model)
+        self.bulk_pool: Optional[BulkEmbeddingPool] = None
+        if bulk_workers > 1 and not embedding_service_socket:
+            self.bulk_pool = BulkEmbeddingPool(
+                embedding_model_name,
+                backend=embedding_backend,
+                workers=bulk_workers,
+                chunk_size=bulk_chunk_size,
+                batch_size=embed_batch_size,
+            )
+
+    def load_embedder(self):
+        if self.embedder is not None:
+            return self.embedder
+        with self._embedder_lock:
+            if self.embedder is not None:
+                return self.embedder
+
+            if self.embedding_service_socket:
+                # Shared embedding process: no model (and no cache) in this worker
+                embedder = EmbeddingServiceClient(self.embedding_service_socket)
+            else:
+                embedder = create_embedder(self.embedding_backend, self.embedding_model_name)
+
+            # Checked against each collection's vector size in `check_dim`
+            dim = embedder.get_sentence_embedding_dimension()
+            logger.info("Embedder model: %s dim: %d", self.embedding_model_name, dim)
+
+            # Persistent embedding cache: repeated texts/queries skip the model
+            # (in service mode the embedding process owns it)
+            if self.embedding_cache_dir and self.embedding_cache_size > 0 and not self.embedding_service_socket:
+                self.embedding_cache = EmbeddingCache(
+                    self.embedding_cache_dir,
+                    embedder.cache_key,
+                    dim,
+                    capacity=self.embedding_cache_size,
+                )
+
+            self.vector_dim = dim
+            self.embedder_tag = embedder_tag(embedder.cache_key)
+            self.embedder = embedder
+            return embedder
+
+    def load_client(self) -> QdrantClient:
+        if self.client is not None:
+            return self.client
+        with self._client_lock:
+            if self.client is not None:
+                return self.client
+
+            # Qdrant client: embedded (file-based) or remote HTTP
+            if self.local_qdrant_path:
+                # Example: local_qdrant_path="./data/qdrant"
+                local_path = pathlib.Path(self.local_qdrant_path)
+                local_path.mkdir(parents=True, exist_ok=True)
+                self.client = QdrantClient(
+                    path=str(local_path),  # embedded Qdrant
+                )
+            else:
+                # Remote Qdrant (Docker / k8s)
+                self.client = QdrantClient(
+                    url=self.qdrant_url,
+                    api_key=self.qdrant_api_key,  # can be None if not secured
+                )
+            return self.client
+
+    def close(self) -> None:
+        if self.bulk_pool is not None:
+            self.bulk_pool.close()
+        if self.embedding_cache is not None:
+            self.embedding_cache.flush()
 
 
 class LongTermMemory:
@@ -15,9 +212,12 @@ class LongTermMemory:
     Long-term memory backed by Qdrant vector DB.
 
     - Stores each document as a vector + payload
-    - Uses SentenceTransformers for embeddings
+    - Uses a pluggable `Embedder` (SentenceTransformers by default, see embedders.py)
     - Search is semantic (vector similarity)
 
+    Construction does no I/O: the model is loaded and Qdrant contacted on
+    first use, or up front via `warm_up()`.
+
     Requirements:
         pip install qdrant-client sentence-transformers
     """
@@ -29,94 +229,530 @@ class LongTermMemory:
         qdrant_api_key: Optional[str] = None,
         embedding_model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
         local_qdrant_path: Optional[str] = None,
+        embed_batch_size: int = 64,
+        upsert_batch_size: int = 256,
+        pipeline_depth: int = 4,
+        embedding_cache_dir: Optional[str] = None,
+        embedding_cache_size: int = 100_000,
+        query_cache_size: int = 1024,
+        hybrid: bool = True,
+        storage_profile: str = "memory",
+        hnsw_ef: Optional[int] = None,
+        embedding_service_socket: Optional[str] = None,
+        microbatch_max: int = 32,
+        microbatch_wait_ms: float = 5.0,
+        bulk_workers: int = 0,
+        bulk_min_texts: int = 1024,
+        bulk_chunk_size: int = 128,
+        embedding_backend: str = "sentence-transformers",
+        alias_refresh_seconds: float = 10.0,
     ):
 
         self.collection_name = collection_name
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.pipeline_depth = pipeline_depth
+        self.embedding_model_name = embedding_model_name
+        self.bulk_min_texts = bulk_min_texts
+        self.hybrid = hybrid
+        # Vector/payload/HNSW storage of new collections (see storage_profiles.py)
+        # and the default HNSW search breadth (None: Qdrant's default)
+        self.storage_profile: StorageProfile = get_storage_profile(storage_profile)
+        self.hnsw_ef = hnsw_ef
+        # Set by _ensure_collection: the collection has the BM25 sparse vector
+        self.sparse_enabled = False
 
-        # Embedding model
-        self._embedder = SentenceTransformer(embedding_model_name)
-        self.vector_dim = self._embedder.get_sentence_embedding_dimension()
+        self._backend = _Backend(
+            embedding_model_name,
+            qdrant_url,
+            qdrant_api_key,
+            local_qdrant_path,
+            embedding_cache_dir,
+            embedding_cache_size,
+            embedding_service_socket,
+            bulk_workers=bulk_workers,
+            bulk_chunk_size=bulk_chunk_size,
+            embed_batch_size=embed_batch_size,
+            embedding_backend=embedding_backend,
+        )
+        self._collection_ready = False
+        self._collection_lock = threading.Lock()
+        # Version reads and writes go to (see `_served_collection`), and when
+        # the alias was last checked for a swap by another process
+        self.alias_refresh_seconds = alias_refresh_seconds
+        self._served: Optional[str] = None
+        self._served_checked = 0.0
 
-        # Validate embedding dimension once at startup
-        test_vec = self._embedder.encode("dim check")
-        dim = len(test_vec)
-        print("Embedder model:", embedding_model_name, "dim:", dim)
+        # In-memory LRU of query vectors (in front of the disk cache)
+        self.query_vectors = LRUCache(maxsize=query_cache_size)
 
-        if dim != 384:
-            raise RuntimeError(
-                f"Embedder dim is {dim}, but Qdrant collection expects 384. "
-                f"Use all-MiniLM-L6-v2 (384) or recreate the collection to match."
+        # Concurrent single-text embeds (queries) share one encode call. Not
+        # in service mode: the embedding service already batches across workers
+        self.query_batcher: Optional[MicroBatcher] = None
+        if microbatch_max > 1 and not embedding_service_socket:
+            self.query_batcher = MicroBatcher(
+                self._embed_many,
+                max_batch=microbatch_max,
+                max_wait_ms=microbatch_wait_ms,
             )
-        
-        # Qdrant client: embedded (file-based) or remote HTTP
-        if local_qdrant_path:
-            # Example: local_qdrant_path="./data/qdrant"
-            local_path = pathlib.Path(local_qdrant_path)
-            local_path.mkdir(parents=True, exist_ok=True)
-            self.client = QdrantClient(
-                path=str(local_path),  # embedded Qdrant
-            )
-        else:
-            # Remote Qdrant (Docker / k8s)
-            self.client = QdrantClient(
-                url=qdrant_url,
-                api_key=qdrant_api_key,  # can be None if not secured
+
+        # Bumped on every write/delete; retrieval caches key on it so they
+        # never serve results from before an ingest
+        self.generation = 0
+        self._generation_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Lazy resources
+    # ------------------------------------------------------------------
+    @property
+    def _embedder(self):
+        return self._backend.load_embedder()
+
+    @property
+    def vector_dim(self) -> int:
+        self._backend.load_embedder()
+        return self._backend.vector_dim
+
+    @property
+    def embedding_cache(self) -> Optional[EmbeddingCache]:
+        """
+        The persistent embedding cache, or None if disabled / model not loaded yet.
+        """
+        return self._backend.embedding_cache
+
+    @property
+    def client(self) -> QdrantClient:
+        client = self._backend.load_client()
+        if not self._collection_ready:
+            with self._collection_lock:
+                if not self._collection_ready:
+                    self._ensure_collection(client)
+                    self._collection_ready = True
+        return client
+
+    def load_model(self) -> None:
+        """
+        Load the embedding model (and open the embedding cache).
+        """
+        self._backend.load_embedder()
+        if self._collection_ready:
+            self.check_dim()
+
+    def connect(self) -> None:
+        """
+        Connect to Qdrant and make sure the collection exists.
+        """
+        self.client
+        if self._backend.embedder is not None:
+            self.check_dim()
+
+    def check_dim(self) -> None:
+        """
+        Validate the embedder against the served collection version (see
+        `_vector_collection`) and its dimension against the vector size.
+        Runs once both are loaded (whichever comes second).
+        """
+        self._vector_collection()
+        expected = self._collection_dim()
+        if self.vector_dim != expected:
+            raise RuntimeError(
+                f"Embedder dim is {self.vector_dim}, but Qdrant collection {self.collection_name} expects {expected}. "
+                f"Use the model the collection was built with or reindex into a new collection."
             )
 
-        # Ensure collection exists
-        self._ensure_collection()
+    def warm_up(self) -> None:
+        """
+        Load the model and connect to Qdrant up front instead of on first use.
+        Raises if either fails (e.g. Qdrant unreachable); safe to retry.
+        """
+        self.load_model()
+        self.connect()
+
+    def close(self) -> None:
+        """
+        Stop the bulk embedding processes and flush the embedding cache.
+        """
+        self._backend.close()
+
+    def readiness(self) -> Dict[str, bool]:
+        return {
+            "embedder": self._backend.embedder is not None,
+            "qdrant": self._collection_ready,
+        }
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
-    def _ensure_collection(self) -> None:
+    def _ensure_collection(self, client: QdrantClient) -> None:
         """
-        Create the collection if it does not exist.
+        Create the collection if it does not exist, plus its payload indexes.
+
+        With `hybrid`, new collections also get the BM25 sparse vector
+        (IDF computed by Qdrant). Collections created without it keep
+        working dense-only until they are reindexed.
+
+        New collections use `storage_profile`; existing ones are changed
+        with `apply_storage_profile`.
+
+        A new collection is created as version `<name>_v1_<tag>` behind the
+        alias `<name>`, so `reindex` can later swap in a rebuilt version
+        atomically. Collections created before aliases keep working under
+        their name.
         """
-        collections = self.client.get_collections()
+        collections = client.get_collections()
         existing = {c.name for c in collections.collections}
 
-        if self.collection_name not in existing:
-            self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=qmodels.VectorParams(
-                    size=self.vector_dim,
-                    distance=qmodels.Distance.COSINE,
-                ),
+        if self.collection_name not in existing and self.collection_name not in self._aliases(client):
+            self._backend.load_embedder()
+            version = self._version_name(1, self._backend.embedder_tag)
+            self._create_collection(client, version)
+            client.update_collection_aliases(
+                change_aliases_operations=[self._create_alias_op(version)]
             )
 
-    def _embed(self, text) -> list[float]:
-        # ---- Normalize input to a single string ----
+        self._served = self._resolve_served(client)
+        self._served_checked = time.monotonic()
+
+        try:
+            info = client.get_collection(self._served)
+        except Exception:
+            info = None
+
+        sparse_config = getattr(getattr(getattr(info, "config", None), "params", None), "sparse_vectors", None) or {}
+        self.sparse_enabled = self.hybrid and SPARSE_VECTOR in sparse_config
+        if self.hybrid and not self.sparse_enabled:
+            logger.warning(
+                "Collection %s has no %r sparse vector; lexical search is off until it is reindexed",
+                self.collection_name,
+                SPARSE_VECTOR,
+            )
+
+        self._ensure_payload_indexes(client, getattr(info, "payload_schema", None) or {})
+
+    def _resolve_served(self, client: QdrantClient) -> str:
+        """
+        The version this process reads and writes: the alias target, unless
+        it was built with another embedder and a newer version built with the
+        loaded one exists (a rebuild not swapped in yet), so processes
+        running the new model can be deployed before the swap.
+        """
+        served = self._aliases(client).get(self.collection_name, self.collection_name)
+        tag = self._backend.embedder_tag  # None until the model is loaded
+        if tag and version_tag(served) not in (None, tag):
+            versions = self.versions()
+            live = next((n for n, name in versions if name == served), 0)
+            built = [name for n, name in versions if n > live and version_tag(name) == tag]
+            if built:
+                logger.warning(
+                    "Alias %s serves %s, built with another embedder; this process uses %s",
+                    self.collection_name,
+                    served,
+                    built[-1],
+                )
+                return built[-1]
+        return served
+
+    def _served_collection(self) -> str:
+        """
+        Collection data operations go to. Pinned to one version between
+        alias checks (every `alias_refresh_seconds`), so a swap by another
+        process never mixes versions inside one operation.
+        """
+        if self._collection_ready and time.monotonic() - self._served_checked >= self.alias_refresh_seconds:
+            served = self._resolve_served(self._backend.load_client())
+            if served != self._served:
+                logger.info("Collection %s moved: %s -> %s", self.collection_name, self._served, served)
+                # Re-detect the sparse vector etc. on the new version
+                with self._collection_lock:
+                    self._collection_ready = False
+            else:
+                self._served_checked = time.monotonic()
+        self.client
+        return self._served
+
+    def _vector_collection(self) -> str:
+        """
+        `_served_collection`, for operations that embed queries or write
+        vectors: raises `EmbedderMismatch` if that version was built with
+        another embedder (e.g. the alias was swapped to a reindex with a new
+        model and this process still runs the old one).
+        """
+        served = self._served_collection()
+        self._backend.load_embedder()
+        tag = version_tag(served)
+        if tag is not None and tag != self._backend.embedder_tag:
+            # The version may have been resolved before the model was loaded
+            with self._collection_lock:
+                self._collection_ready = False
+            served = self._served_collection()
+            tag = version_tag(served)
+        if tag is not None and tag != self._backend.embedder_tag:
+            raise EmbedderMismatch(
+                f"Collection {served} was built with another embedder than {self.embedding_model_name} "
+                f"({self._backend.embedding_backend}). Restart with the model it was reindexed with, or reindex."
+            )
+        return served
+
+    def _call_served(self, method: str, vectors: bool = False, **kwargs):
+        """
+        `client.<method>(collection_name=<served version>, **kwargs)`, on
+        `_vector_collection` with `vectors`. If that version was deleted
+        meanwhile (a wipe or `gc_versions` in another process), the alias is
+        resolved again and the call retried once.
+        """
+        pick = self._vector_collection if vectors else self._served_collection
+        name = pick()
+        try:
+            return getattr(self.client, method)(collection_name=name, **kwargs)
+        except Exception:
+            if self._backend.load_client().collection_exists(name):
+                raise
+            with self._collection_lock:
+                self._collection_ready = False
+            return getattr(self.client, method)(collection_name=pick(), **kwargs)
+
+    def _create_collection(self, client: QdrantClient, name: str, like: Optional[str] = None) -> None:
+        """
+        Create a collection version with `storage_profile`: sized for the
+        embedder and with the BM25 sparse vector when `hybrid`, or with the
+        vector size and sparse config of the existing collection `like`
+        (without loading the model).
+        """
+        if like:
+            params = client.get_collection(like).config.params
+            dim = params.vectors.size
+            sparse_vectors_config = params.sparse_vectors
+        else:
+            dim = self.vector_dim
+            sparse_vectors_config = (
+                {SPARSE_VECTOR: qmodels.SparseVectorParams(modifier=qmodels.Modifier.IDF)}
+                if self.hybrid
+                else None
+            )
+        client.create_collection(
+            collection_name=name,
+            **self.storage_profile.collection_kwargs(dim, sparse_vectors_config=sparse_vectors_config),
+        )
+
+    def _ensure_payload_indexes(self, client: QdrantClient, schema: dict) -> None:
+        """
+        Create the missing keyword indexes in INDEXED_FIELDS (existing
+        collections get them on the first connect).
+        """
+        for field in INDEXED_FIELDS:
+            if field in schema:
+                continue
+            try:
+                client.create_payload_index(
+                    collection_name=self._served,
+                    field_name=field,
+                    field_schema=qmodels.PayloadSchemaType.KEYWORD,
+                )
+            except Exception as e:
+                logger.warning("Could not create payload index %s on %s: %s", field, self.collection_name, e)
+
+    def apply_storage_profile(self, name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Migrate the existing collection to a storage profile (default: the
+        configured one). Qdrant re-optimizes segments in the background;
+        search keeps working meanwhile.
+        """
+        profile = get_storage_profile(name) if name else self.storage_profile
+        self.client.update_collection(
+            collection_name=self.physical_collection() or self.collection_name,
+            **profile.update_kwargs(),
+        )
+        self.storage_profile = profile
+        logger.info("Collection %s: storage profile -> %s", self.collection_name, profile.name)
+        return profile.to_dict()
+
+    def _normalize_text(self, text) -> str:
+        """
+        Normalize any embeddable input to a single string.
+        """
         if isinstance(text, Mapping):
             # swagger/openapi dict etc.
-            text = json.dumps(text, ensure_ascii=False)
-        elif isinstance(text, (list, tuple)):
+            return json.dumps(text, ensure_ascii=False)
+        if isinstance(text, (list, tuple)):
             # list of strings -> join
-            text = "\n".join(map(str, text))
-        elif not isinstance(text, str):
+            return "\n".join(map(str, text))
+        if not isinstance(text, str):
             # any other type -> stringify
-            text = str(text)
+            return str(text)
+        return text
 
-        vec = self._embedder.encode(text)
+    def _embed_many(self, texts: List[Any], batch_size: Optional[int] = None) -> List[List[float]]:
+        """
+        Embed many inputs. Vectors found in the embedding cache are reused;
+        the misses go through a single batched encode call.
 
-        # sentence-transformers returns numpy array for single string,
-        # and numpy 2D array for list input. Convert to python.
-        if hasattr(vec, "tolist"):
-            vec = vec.tolist()
+        Returns one python list[float] per input, in input order.
+        """
+        if not texts:
+            return []
 
-        # If we still somehow got 2D embeddings, fail loudly with a clear message
-        if vec and isinstance(vec[0], list):
-            raise ValueError(
-                f"_embed received iterable input and produced 2D embeddings: "
-                f"shape=({len(vec)}, {len(vec[0])}). Ensure you pass a single string to ingest_text()."
+        normalized = [self._normalize_text(t) for t in texts]
+        self._backend.load_embedder()  # also opens the embedding cache
+        if self.embedding_cache is None:
+            return self._encode(normalized, batch_size)
+
+        vecs = self.embedding_cache.get_many(normalized)
+        misses = [i for i, vec in enumerate(vecs) if vec is None]
+        if misses:
+            # Duplicate texts inside one call are encoded once
+            unique = list(dict.fromkeys(normalized[i] for i in misses))
+            encoded = dict(zip(unique, self._encode(unique, batch_size)))
+            self.embedding_cache.put_many(unique, [encoded[t] for t in unique])
+            for i in misses:
+                vecs[i] = encoded[normalized[i]]
+        return vecs
+
+    def _encode(
+        self,
+        normalized: List[str],
+        batch_size: Optional[int] = None,
+        cache: bool = True,
+    ) -> List[List[float]]:
+        """
+        Run the embedding model (no cache in this process).
+
+        Inputs of at least `bulk_min_texts` go to the multi-process bulk pool
+        when one is configured; smaller ones (queries, small PDFs) stay
+        in-process to avoid the IPC overhead. `cache=False` also keeps the
+        embedding service from caching the texts.
+        """
+        pool = self._backend.bulk_pool
+        embedder = self._embedder
+        if pool is not None and len(normalized) >= self.bulk_min_texts:
+            vecs = pool.encode(normalized)
+        elif not cache and isinstance(embedder, EmbeddingServiceClient):
+            vecs = embedder.encode(normalized, cache=False)
+        else:
+            vecs = embedder.encode(
+                normalized,
+                batch_size=batch_size or self.embed_batch_size,
+                show_progress_bar=False,
             )
 
-        if len(vec) != self.vector_dim:
-            raise ValueError(f"EMBED DIM mismatch: got {len(vec)} expected {self.vector_dim}")
+        # sentence-transformers returns a 2D numpy array for list input.
+        if hasattr(vecs, "tolist"):
+            vecs = vecs.tolist()
+
+        for vec in vecs:
+            if len(vec) != self.vector_dim:
+                raise ValueError(f"EMBED DIM mismatch: got {len(vec)} expected {self.vector_dim}")
 
-        return vec
+        return vecs
 
+    def _embed(self, text) -> list[float]:
+        if self.query_batcher is not None:
+            return self.query_batcher.submit(self._normalize_text(text))
+        return self._embed_many([text])[0]
 
+    def _embed_query(self, query: str) -> list[float]:
+        return self.query_vectors.get_or_compute(query, lambda: self._embed(query))
+
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Vector of a search query (in-memory LRU first, so the vector of a
+        query just searched for is not computed again).
+        """
+        return self._embed_query(query)
+
+    def embed_texts(self, texts: List[Any], cache: bool = False) -> List[List[float]]:
+        """
+        Embed arbitrary texts, one vector per input in order.
+
+        By default the persistent embedding cache is neither read nor
+        written: throwaway texts (e.g. the sentences of retrieved chunks)
+        would otherwise evict the embeddings of stored chunks.
+        """
+        if not texts:
+            return []
+        if cache:
+            return self._embed_many(texts)
+        return self._encode([self._normalize_text(t) for t in texts], cache=False)
+
+    def _bump_generation(self) -> None:
+        with self._generation_lock:
+            self.generation += 1
+
+    def _collection_dim(self) -> int:
+        """
+        Read the vector size configured on the Qdrant collection.
+        """
+        try:
+            vcfg = self._call_served("get_collection").config.params.vectors
+            expected_dim = getattr(vcfg, "size", None)  # works for single-vector collections
+        except Exception as e:
+            raise RuntimeError(f"Failed to read Qdrant collection config for {self.collection_name}: {e}")
+
+        if expected_dim is None:
+            raise RuntimeError(
+                f"Could not detect vector size for collection {self.collection_name}. "
+                f"Vectors config was: {vcfg}"
+            )
+        return expected_dim
+
+    def _build_points(
+        self,
+        docs: List[Tuple[str, str, dict]],
+        source_id: Optional[str],
+        expected_dim: int,
+    ) -> List[qmodels.PointStruct]:
+        """
+        Embed a batch of documents and wrap them as Qdrant points.
+        `expected_dim` is the collection vector size (read once by the caller).
+        """
+        if not docs:
+            return []
+
+        vectors = self._embed_many([text for _, text, _ in docs])
+
+        if len(vectors[0]) != expected_dim:
+            raise ValueError(
+                f"Embedding dim mismatch: got {len(vectors[0])} expected {expected_dim}. "
+                f"Fix by using the same embedding model everywhere OR recreate the Qdrant collection "
+                f"with the correct size."
+            )
+
+        return [
+            qmodels.PointStruct(
+                id=self._make_point_id(doc_id),
+                vector=self._point_vector(vector, text),
+                payload=self._build_payload(doc_id, text, meta, source_id),
+            )
+            for (doc_id, text, meta), vector in zip(docs, vectors)
+        ]
+
+    def _point_vector(self, dense: List[float], text: str):
+        """
+        The dense vector (size checked against the collection), plus the
+        BM25 sparse vector when the collection has one.
+        """
+        if not self.sparse_enabled:
+            return dense
+        indices, values = sparse.document_vector(text)
+        return {"": dense, SPARSE_VECTOR: qmodels.SparseVector(indices=indices, values=values)}
+
+    def _upsert_points(
+        self,
+        points: List[qmodels.PointStruct],
+        batch_size: Optional[int] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> None:
+        """
+        Upsert points in sized batches (one HTTP round trip per batch).
+        Setting `stop` raises `PipelineCancelled` before the next batch.
+        Raises `EmbedderMismatch` instead of writing vectors into a version
+        built with another embedder.
+        """
+        step = batch_size or self.upsert_batch_size
+        for start in range(0, len(points), step):
+            if stop is not None and stop.is_set():
+                raise PipelineCancelled()
+            self._call_served("upsert", vectors=True, points=points[start:start + step])
+        self._bump_generation()
 
     def _make_point_id(self, doc_id: str) -> int:
         """
@@ -126,6 +762,71 @@ class LongTermMemory:
         h = hashlib.md5(doc_id.encode("utf-8")).hexdigest()
         # Take first 16 hex chars -> convert to int
         return int(h[:16], 16)
+
+    @staticmethod
+    def _content_hash(text: str) -> str:
+        """
+        Hash of the embedded text. Equal hash => the stored vector is still valid.
+        """
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _payload_hash(meta: dict) -> str:
+        """
+        Hash of the metadata (and payload layout version). Lets us detect
+        payload-only changes that do not need a re-embed.
+        """
+        blob = json.dumps(
+            {"v": PAYLOAD_VERSION, "meta": meta},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _build_payload(self, doc_id: str, text: str, meta: dict, source_id: Optional[str] = None) -> dict:
+        payload = {
+            "doc_id": doc_id,
+            DOC_ID_PREFIXES: doc_id_prefixes(doc_id),
+            "text": text,
+            "meta": meta,
+            "token_count": count_tokens(text),
+            "content_hash": self._content_hash(text),
+            "payload_hash": self._payload_hash(meta),
+        }
+        if source_id:
+            payload["source_id"] = source_id
+        return payload
+
+    def _source_filter(self, source_id: str) -> qmodels.Filter:
+        return qmodels.Filter(
+            must=[
+                qmodels.FieldCondition(
+                    key="source_id",
+                    match=qmodels.MatchValue(value=source_id),
+                )
+            ]
+        )
+
+    def _build_filter(self, filters: Optional[Dict[str, Any]]) -> Optional[qmodels.Filter]:
+        """
+        Turn {"type": "operation", "service": "payments"} into a Qdrant filter.
+
+        Keys are meta keys (see FILTER_KEYS) or "source_id"/"doc_id"; a list
+        value matches any of its items, None values are ignored.
+        """
+        must = []
+        for key, value in (filters or {}).items():
+            if value is None:
+                continue
+            field = key if key in _TOP_LEVEL_FIELDS else f"meta.{key}"
+            if isinstance(value, (list, tuple, set)):
+                match = qmodels.MatchAny(any=list(value))
+            else:
+                match = qmodels.MatchValue(value=value)
+            must.append(qmodels.FieldCondition(key=field, match=match))
+        return qmodels.Filter(must=must) if must else None
+
     # ------------------------------------------------------------------
     # Public API – same method signatures as your original class
     # ------------------------------------------------------------------
@@ -137,108 +838,636 @@ class LongTermMemory:
         doc_id: logical ID for your doc (e.g. "pdf:...:chunk:0").
         Stored as payload; point ID is a numeric hash.
         """
-        if meta is None:
-            meta = {}
+        self.add_documents([(doc_id, text, meta)])
 
-        vector = self._embed(text)
+    def add_documents(
+        self,
+        docs: Iterable[Tuple[str, str, Optional[dict]]],
+        batch_size: Optional[int] = None,
+        source_id: Optional[str] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> int:
+        """
+        Add or update many documents in Qdrant.
 
-        # ---- Ensure vector is plain Python list[float] ----
-        # (some embedders return numpy arrays)
-        if hasattr(vector, "tolist"):
-            vector = vector.tolist()
+        docs: iterable of (doc_id, text, meta) tuples.
+        Texts are encoded in batched calls (`embed_batch_size` per forward
+        pass), the collection dimension is checked once, and points are
+        upserted in batches of `batch_size` (defaults to `upsert_batch_size`).
+        `source_id` (e.g. "pdf:<file>") groups the points for `sync_source`.
 
-        if not isinstance(vector, list) or not vector:
-            raise ValueError(f"Embedder returned invalid vector for doc_id={doc_id}: {type(vector)}")
+        Setting `stop` raises `PipelineCancelled` between batches; documents
+        already upserted stay.
 
-        # ---- Check expected dimension from Qdrant collection ----
-        try:
-            vcfg = self.client.get_collection(self.collection_name).config.params.vectors
-            expected_dim = getattr(vcfg, "size", None)  # works for single-vector collections
-        except Exception as e:
-            raise RuntimeError(f"Failed to read Qdrant collection config for {self.collection_name}: {e}")
+        Returns the number of documents written.
+        """
+        docs = [(doc_id, text, meta or {}) for doc_id, text, meta in docs]
+        if not docs:
+            return 0
 
-        if expected_dim is None:
-            raise RuntimeError(
-                f"Could not detect vector size for collection {self.collection_name}. "
-                f"Vectors config was: {vcfg}"
-            )
+        step = batch_size or self.upsert_batch_size
+        embed_step = self._embed_step(step)
+        expected_dim = self._collection_dim()
+        for start in range(0, len(docs), embed_step):
+            if stop is not None and stop.is_set():
+                raise PipelineCancelled()
+            points = self._build_points(docs[start:start + embed_step], source_id, expected_dim)
+            self._upsert_points(points, batch_size=step, stop=stop)
+        return len(docs)
 
-        if len(vector) != expected_dim:
-            raise ValueError(
-                f"Embedding dim mismatch for doc_id={doc_id}: got {len(vector)} expected {expected_dim}. "
-                f"Fix by using the same embedding model everywhere OR recreate the Qdrant collection "
-                f"with the correct size."
+    def sibling(self, collection_name: str) -> "LongTermMemory":
+        """
+        Same embedder, Qdrant client and batch settings on another collection
+        (e.g. the code index), without loading the model a second time.
+        """
+        other = copy.copy(self)
+        other.collection_name = collection_name
+        other._collection_ready = False
+        other._collection_lock = threading.Lock()
+        other._served = None
+        other.sparse_enabled = False
+        other.generation = 0
+        return other
+
+    def iter_source_payloads(self, source_id: str, include: List[str]) -> Iterator[dict]:
+        """
+        Scroll the payloads of every point tagged with `source_id`, fetching
+        only the `include` fields (no vectors).
+        """
+        offset = None
+        while True:
+            points, offset = self._call_served(
+                "scroll",
+                scroll_filter=self._source_filter(source_id),
+                limit=self.upsert_batch_size,
+                offset=offset,
+                with_payload=qmodels.PayloadSelectorInclude(include=include),
+                with_vectors=False,
             )
+            for pt in points:
+                yield getattr(pt, "payload", None) or {}
+            if offset is None:
+                break
+
+    def load_manifest(self, source_id: str) -> Dict[str, Tuple[str, str]]:
+        """
+        Read the per-source manifest from Qdrant payloads.
+
+        Returns {doc_id: (content_hash, payload_hash)} for every point tagged
+        with `source_id`. Only the hash fields are fetched (no text, no vectors).
+        """
+        manifest: Dict[str, Tuple[str, str]] = {}
+        for payload in self.iter_source_payloads(source_id, ["doc_id", "content_hash", "payload_hash"]):
+            doc_id = payload.get("doc_id")
+            if doc_id:
+                manifest[doc_id] = (payload.get("content_hash", ""), payload.get("payload_hash", ""))
+        return manifest
+
+    def sync_source(
+        self,
+        source_id: str,
+        docs: Iterable[Tuple[str, str, Optional[dict]]],
+        batch_size: Optional[int] = None,
+        progress: Optional[Callable[[str, int], None]] = None,
+        stop: Optional[threading.Event] = None,
+        changes: Optional[Dict[str, List[str]]] = None,
+    ) -> Dict[str, int]:
+        """
+        Incrementally re-ingest every chunk of one source (a PDF, a Swagger spec, ...).
+
+        Compares each chunk against the source manifest:
+        - same text + same meta  -> skipped
+        - same text, new meta    -> payload rewritten, stored vector reused (no embed)
+        - new or changed text    -> embedded and upserted
+        - doc_ids no longer sent -> deleted in one filtered delete
+
+        `docs` may be a lazy iterator. Reading/classifying chunks, embedding and
+        upserting run as overlapping pipeline stages with bounded queues
+        (`pipeline_depth` batches in flight), so memory stays flat on large
+        documents and the CPU is not idle while Qdrant round trips are pending.
+
+        `progress(stage, n)` is called as chunks are "parsed", "embedded" and
+        "upserted". Setting `stop` aborts the run with `PipelineCancelled`;
+        stale chunks are only deleted after a complete run.
 
-        point_id = self._make_point_id(doc_id)
+        When given, `changes` is filled with the doc_ids written ("changed")
+        and deleted ("removed").
 
-        point = qmodels.PointStruct(
-            id=point_id,
-            vector=vector,  # single vector (matches your config: size=384)
-            payload={
-                "doc_id": doc_id,
-                "text": text,
-                "meta": meta,
-            },
+        Returns counts: {"added", "updated", "unchanged", "deleted", "total"}.
+        """
+        manifest = self.load_manifest(source_id)
+        step = batch_size or self.upsert_batch_size
+        embed_step = self._embed_step(step)
+        expected_dim = self._collection_dim()
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "deleted": 0, "total": 0}
+        seen: set = set()
+        report = progress or (lambda stage, n: None)
+        if changes is not None:
+            changes.update(changed=[], removed=[])
+
+        def _classify(batch: List[Tuple[str, str, dict]]) -> Tuple[list, list]:
+            to_embed, to_repayload = self._classify_batch(batch, manifest, seen, stats)
+            if changes is not None:
+                changes["changed"].extend(doc_id for doc_id, _, _ in to_embed + to_repayload)
+            report("parsed", len(batch))
+            return to_embed, to_repayload
+
+        def _classified_batches() -> Iterator[Tuple[list, list]]:
+            batch: List[Tuple[str, str, dict]] = []
+            for doc_id, text, meta in docs:
+                batch.append((doc_id, text, meta or {}))
+                if len(batch) >= embed_step:
+                    yield _classify(batch)
+                    batch = []
+            if batch:
+                yield _classify(batch)
+
+        def _embed_stage(work: Tuple[list, list]) -> Tuple[list, list]:
+            to_embed, to_repayload = work
+            points = self._build_points(to_embed, source_id, expected_dim)
+            report("embedded", len(points))
+            return points, to_repayload
+
+        def _upsert_stage(work: Tuple[list, list]) -> None:
+            points, to_repayload = work
+            if points:
+                self._upsert_points(points, batch_size=step)
+            if to_repayload:
+                self._repayload_documents(to_repayload, source_id, batch_size=step)
+            report("upserted", len(points) + len(to_repayload))
+
+        run_stages(
+            _classified_batches(),
+            [_embed_stage, _upsert_stage],
+            depth=self.pipeline_depth,
+            stop=stop,
+        )
+
+        stale = [doc_id for doc_id in manifest if doc_id not in seen]
+        self.delete_source_documents(source_id, stale)
+        stats["deleted"] = len(stale)
+        if changes is not None:
+            changes["removed"] = stale
+
+        return stats
+
+    def _embed_step(self, step: int) -> int:
+        """
+        Texts per embed call in bulk pipelines: with a bulk pool, large enough
+        to keep every worker busy.
+        """
+        pool = self._backend.bulk_pool
+        if pool is None:
+            return step
+        return max(step, self.bulk_min_texts, pool.workers * pool.chunk_size)
+
+    def delete_source_documents(self, source_id: str, doc_ids: List[str]) -> None:
+        """
+        Delete the given doc_ids of one source in a single filtered delete.
+        """
+        if not doc_ids:
+            return
+        self._call_served(
+            "delete",
+            points_selector=qmodels.FilterSelector(
+                filter=qmodels.Filter(
+                    must=[
+                        qmodels.FieldCondition(
+                            key="source_id",
+                            match=qmodels.MatchValue(value=source_id),
+                        ),
+                        qmodels.FieldCondition(
+                            key="doc_id",
+                            match=qmodels.MatchAny(any=doc_ids),
+                        ),
+                    ]
+                )
+            ),
+        )
+        self._bump_generation()
+
+    def count_source(self, source_id: str) -> int:
+        """
+        Number of points tagged with `source_id` (indexed count, no scroll).
+        """
+        return self._call_served(
+            "count",
+            count_filter=self._source_filter(source_id),
+            exact=True,
+        ).count
+
+    def update_source_meta(self, source_id: str, meta_updates: dict) -> None:
+        """
+        Merge `meta_updates` into the meta of every point of a source in one
+        filtered set-payload call (e.g. `total_chunks`, known only once a
+        streamed document has been fully read).
+        """
+        self._call_served(
+            "set_payload",
+            payload=meta_updates,
+            key="meta",
+            points=qmodels.FilterSelector(filter=self._source_filter(source_id)),
         )
+        self._bump_generation()
+
+    def _classify_batch(
+        self,
+        batch: List[Tuple[str, str, dict]],
+        manifest: Dict[str, Tuple[str, str]],
+        seen: set,
+        stats: Dict[str, int],
+    ) -> Tuple[List[Tuple[str, str, dict]], List[Tuple[str, str, dict]]]:
+        """
+        Split a batch into (to_embed, to_repayload) against the source manifest.
+        """
+        to_embed: List[Tuple[str, str, dict]] = []
+        to_repayload: List[Tuple[str, str, dict]] = []
+
+        for doc_id, text, meta in batch:
+            seen.add(doc_id)
+            stats["total"] += 1
+            previous = manifest.get(doc_id)
+            if previous is None:
+                stats["added"] += 1
+                to_embed.append((doc_id, text, meta))
+            elif previous[0] != self._content_hash(text):
+                stats["updated"] += 1
+                to_embed.append((doc_id, text, meta))
+            elif previous[1] != self._payload_hash(meta):
+                stats["updated"] += 1
+                to_repayload.append((doc_id, text, meta))
+            else:
+                stats["unchanged"] += 1
+
+        return to_embed, to_repayload
+
+    def _repayload_documents(
+        self,
+        docs: List[Tuple[str, str, dict]],
+        source_id: Optional[str],
+        batch_size: Optional[int] = None,
+    ) -> None:
+        """
+        Rewrite payloads for documents whose text (and so vector) is unchanged.
+        Existing vectors are read back in batches instead of re-embedding.
+        """
+        step = batch_size or self.upsert_batch_size
+        for start in range(0, len(docs), step):
+            batch = docs[start:start + step]
+            ids = [self._make_point_id(doc_id) for doc_id, _, _ in batch]
+            stored = self._call_served(
+                "retrieve",
+                ids=ids,
+                with_payload=False,
+                with_vectors=True,
+            )
+            vectors = {pt.id: pt.vector for pt in stored}
+
+            points = []
+            missing = []
+            for point_id, (doc_id, text, meta) in zip(ids, batch):
+                vector = vectors.get(point_id)
+                if vector is None:
+                    missing.append((doc_id, text, meta))
+                    continue
+                points.append(
+                    qmodels.PointStruct(
+                        id=point_id,
+                        vector=vector,
+                        payload=self._build_payload(doc_id, text, meta, source_id),
+                    )
+                )
+
+            if points:
+                self._call_served("upsert", points=points)
+                self._bump_generation()
+            if missing:
+                # Point vanished between manifest read and now: embed it normally
+                self.add_documents(missing, batch_size=batch_size, source_id=source_id)
 
-        self.client.upsert(
-            collection_name=self.collection_name,
-            points=[point],
+    # ------------------------------------------------------------------
+    # Versioned collections (alias `collection_name` -> `<name>_v<N>`)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _aliases(client: QdrantClient) -> Dict[str, str]:
+        return {a.alias_name: a.collection_name for a in client.get_aliases().aliases}
+
+    def _version_name(self, version: int, tag: Optional[str]) -> str:
+        return f"{self.collection_name}_v{version}_{tag}" if tag else f"{self.collection_name}_v{version}"
+
+    def _create_alias_op(self, target: str):
+        return qmodels.CreateAliasOperation(
+            create_alias=qmodels.CreateAlias(collection_name=target, alias_name=self.collection_name)
         )
 
-    def search(self, query: str, top_k: int = 5) -> List[Tuple[str, str, dict]]:
+    def versions(self) -> List[Tuple[int, str]]:
+        """
+        Existing `<name>_v<N>[_<tag>]` collections as (N, name), oldest first.
+        """
+        pattern = re.compile(rf"^{re.escape(self.collection_name)}_v(\d+)(?:_[0-9a-f]{{8}})?$")
+        found = []
+        for c in self._backend.load_client().get_collections().collections:
+            m = pattern.match(c.name)
+            if m:
+                found.append((int(m.group(1)), c.name))
+        return sorted(found)
+
+    def physical_collection(self) -> Optional[str]:
+        """
+        The collection reads and writes currently go to: the alias target,
+        `collection_name` itself for pre-alias collections, or None.
+        """
+        client = self._backend.load_client()
+        target = self._aliases(client).get(self.collection_name)
+        if target:
+            return target
+        existing = {c.name for c in client.get_collections().collections}
+        return self.collection_name if self.collection_name in existing else None
+
+    def swap_alias(self, target: str) -> Optional[str]:
+        """
+        Point `collection_name` at `target`. Removing the old alias and
+        creating the new one is a single atomic Qdrant operation.
+
+        A pre-alias collection holding the name is deleted first (reads fail
+        for that moment, and it cannot be kept for rollback).
+
+        Returns the collection served before.
+        """
+        client = self._backend.load_client()
+        previous = self._aliases(client).get(self.collection_name)
+        operations = []
+        if previous:
+            operations.append(
+                qmodels.DeleteAliasOperation(delete_alias=qmodels.DeleteAlias(alias_name=self.collection_name))
+            )
+        elif self.collection_name in {c.name for c in client.get_collections().collections}:
+            logger.warning(
+                "Collection %s predates aliases; deleting it so the alias can take its name",
+                self.collection_name,
+            )
+            client.delete_collection(self.collection_name)
+            previous = self.collection_name
+        operations.append(self._create_alias_op(target))
+        client.update_collection_aliases(change_aliases_operations=operations)
+        logger.info("Alias %s: %s -> %s", self.collection_name, previous, target)
+
+        # Re-detect the sparse vector etc. on the new collection
+        with self._collection_lock:
+            self._collection_ready = False
+        self._bump_generation()
+        return previous
+
+    def gc_versions(self, keep: int = 1) -> List[str]:
+        """
+        Delete versions older than the served one, except the newest `keep`
+        (for rollback). Newer unserved versions (a rebuild in progress) are
+        left alone.
+
+        Returns the deleted collection names.
+        """
+        live = self.physical_collection()
+        versions = self.versions()
+        live_version = next((n for n, name in versions if name == live), None)
+        if live_version is None:
+            return []
+        older = [name for n, name in versions if n < live_version]
+        doomed = older[:-keep] if keep > 0 else older
+        client = self._backend.load_client()
+        for name in doomed:
+            client.delete_collection(name)
+            logger.info("Deleted old collection version %s", name)
+        return doomed
+
+    def reindex(
+        self,
+        checkpoint_path: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        progress: Optional[Callable[[str, int], None]] = None,
+        stop: Optional[threading.Event] = None,
+        swap: bool = True,
+        keep: int = 1,
+    ) -> Dict[str, Any]:
+        """
+        Rebuild the served collection into a new version with this instance's
+        embedding model, storage profile and sparse config, then swap the
+        alias and garbage-collect old versions (`gc_versions(keep)`).
+
+        Stored payload texts are re-embedded (batched, through the bulk pool
+        when configured; unchanged model + text hits the embedding cache).
+        Reads keep going to the old collection until the swap. Scrolling,
+        embedding and upserting run as pipeline stages; after each upserted
+        batch the scroll offset is saved to `checkpoint_path`, so an
+        interrupted run (or `stop`) resumes where it left off.
+
+        Writes to the old collection during the rebuild are not copied;
+        re-running ingestion afterwards (`sync_source`) picks them up. With
+        `swap=False` the finished build stays unserved; calling `reindex`
+        again with the same checkpoint only swaps.
+
+        The new version's name carries the embedder tag, so processes still
+        running another model refuse it (`EmbedderMismatch`) after the swap,
+        and processes started with this model use it before the swap.
+
+        `progress(stage, n)` is called as points are "embedded" and "upserted".
+        Returns {"source", "target", "copied", "swapped", "deleted"}.
+        """
+        client = self._backend.load_client()
+        # Model + backend: vectors of e.g. the int8 and float32 backends must
+        # not end up in the same version
+        embedder_key = self._backend.load_embedder().cache_key
+        checkpoint = pathlib.Path(checkpoint_path) if checkpoint_path else None
+        source = self.physical_collection()
+        step = self._embed_step(batch_size or self.upsert_batch_size)
+        report = progress or (lambda stage, n: None)
+
+        existing = {c.name for c in client.get_collections().collections}
+        state = _load_checkpoint(checkpoint)
+        if (
+            state
+            and state.get("source") == source
+            and state.get("embedder", state.get("model")) == embedder_key
+            and state.get("target") in existing
+        ):
+            logger.info("Resuming reindex of %s into %s after %d points", source, state["target"], state["copied"])
+        else:
+            versions = self.versions()
+            target = self._version_name(versions[-1][0] + 1 if versions else 1, embedder_tag(embedder_key))
+            self._create_collection(client, target)
+            state = {"source": source, "target": target, "embedder": embedder_key, "offset": None, "copied": 0}
+            _save_checkpoint(checkpoint, state)
+            logger.info("Reindexing %s into %s", source, target)
+
+        writer = self.sibling(state["target"])
+        writer.client  # payload indexes + sparse detection on the new collection
+
+        def _pages() -> Iterator[Tuple[list, Any]]:
+            offset = state["offset"]
+            while source and not state.get("done"):
+                points, offset = client.scroll(
+                    collection_name=source,
+                    limit=step,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=False,
+                )
+                if points:
+                    yield points, offset
+                if offset is None:
+                    break
+
+        def _embed_stage(work: Tuple[list, Any]) -> Tuple[list, Any]:
+            points, offset = work
+            texts = [(pt.payload or {}).get("text", "") for pt in points]
+            vectors = self._embed_many(texts)
+            report("embedded", len(points))
+            rebuilt = [
+                qmodels.PointStruct(
+                    id=pt.id,
+                    vector=writer._point_vector(vector, text),
+                    # Points older than the prefix field get it on the way
+                    payload={**pt.payload, DOC_ID_PREFIXES: doc_id_prefixes(str(pt.payload.get("doc_id", "")))},
+                )
+                for pt, text, vector in zip(points, texts, vectors)
+            ]
+            return rebuilt, offset
+
+        def _upsert_stage(work: Tuple[list, Any]) -> None:
+            points, offset = work
+            writer._upsert_points(points)
+            state["offset"] = offset
+            state["copied"] += len(points)
+            _save_checkpoint(checkpoint, state)
+            report("upserted", len(points))
+
+        run_stages(_pages(), [_embed_stage, _upsert_stage], depth=self.pipeline_depth, stop=stop)
+        state["done"] = True
+        _save_checkpoint(checkpoint, state)
+
+        result = {"source": source, "target": state["target"], "copied": state["copied"], "swapped": False, "deleted": []}
+        if swap:
+            self.swap_alias(state["target"])
+            result["swapped"] = True
+            result["deleted"] = self.gc_versions(keep)
+            if checkpoint and checkpoint.exists():
+                checkpoint.unlink()
+        return result
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        hnsw_ef: Optional[int] = None,
+        exact: bool = False,
+        rescore: Optional[bool] = None,
+    ) -> List[Tuple[str, str, dict]]:
         """
         Semantic search using vector similarity.
 
+        `filters` restricts the hits on payload fields, e.g.
+        {"type": "operation", "service": "payments"} (see `_build_filter`);
+        the filtered fields are indexed, so Qdrant applies them during the
+        vector search instead of post-filtering.
+
+        `hnsw_ef` (default: the instance's), `exact` (brute force, for recall
+        checks) and `rescore` (re-rank quantized hits with the original
+        vectors; on by default for int8 profiles) tune a single query.
+
         Returns: List of (doc_id, text, meta) tuples.
         """
         if not query or not query.strip():
             return []
 
-        query_vector = self._embed(query)
+        query_vector = self._embed_query(query)
+        query_filter = self._build_filter(filters)
+        search_params = self.storage_profile.search_params(
+            hnsw_ef=hnsw_ef if hnsw_ef is not None else self.hnsw_ef,
+            exact=exact,
+            rescore=rescore,
+        )
 
-        hits = None
+        resp = self._call_served(
+            "query_points",
+            vectors=True,
+            query=query_vector,
+            query_filter=query_filter,
+            search_params=search_params,
+            limit=top_k,
+            with_payload=True,
+        )
+        return self._hit_tuples(resp.points or [])
 
-        # Preferred: new Query API (qdrant-client >= 1.10)
-        if hasattr(self.client, "query_points"):
-            resp = self.client.query_points(
-                collection_name=self.collection_name,
-                query=query_vector,          # dense vector
-                limit=top_k,
-                with_payload=True,
-            )
-            hits = resp.points or []
-
-        # Older helper API: search(...)
-        elif hasattr(self.client, "search"):
-            hits = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=query_vector,
-                limit=top_k,
-                with_payload=True,
-            )
+    def search_sparse(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[str, str, dict]]:
+        """
+        Lexical (BM25) search on the sparse vector; exact identifiers such as
+        "TransactionService" or "/accounts/{id}/debit" rank first.
 
-        # Very old helper API: search_points(...)
-        elif hasattr(self.client, "search_points"):
-            hits = self.client.search_points(
-                collection_name=self.collection_name,
-                query=query_vector,
-                limit=top_k,
-                with_payload=True,
-            )
-        else:
-            raise RuntimeError(
-                "QdrantClient has no query/search methods. "
-                "Please upgrade qdrant-client."
-            )
+        Returns [] when the collection has no sparse vector (see `hybrid`).
+        Same (doc_id, text, meta) tuples as `search`.
+        """
+        if not query or not query.strip():
+            return []
+        self.client  # also detects sparse support
+        if not self.sparse_enabled:
+            return []
 
+        indices, values = sparse.query_vector(query)
+        if not indices:
+            return []
+
+        resp = self._call_served(
+            "query_points",
+            query=qmodels.SparseVector(indices=indices, values=values),
+            using=SPARSE_VECTOR,
+            query_filter=self._build_filter(filters),
+            limit=top_k,
+            with_payload=True,
+        )
+        return self._hit_tuples(resp.points or [])
+
+    def get_vectors(self, doc_ids: List[str]) -> Dict[str, List[float]]:
+        """
+        Stored dense vectors of `doc_ids` in one round trip (missing ids are
+        left out).
+        """
+        ids = {self._make_point_id(doc_id): doc_id for doc_id in doc_ids}
+        stored = self._call_served(
+            "retrieve",
+            vectors=True,
+            ids=list(ids),
+            with_payload=False,
+            with_vectors=True,
+        )
+        out: Dict[str, List[float]] = {}
+        for pt in stored:
+            vector = pt.vector
+            if isinstance(vector, dict):
+                # Hybrid collection: unnamed dense vector next to the sparse one
+                vector = vector.get("")
+            if vector is not None and pt.id in ids:
+                out[ids[pt.id]] = vector
+        return out
+
+    @staticmethod
+    def _hit_tuples(hits) -> List[Tuple[str, str, dict]]:
+        """
+        (doc_id, text, meta) per hit; the stored `token_count` is copied
+        into meta so callers can budget without re-tokenizing.
+        """
         results: List[Tuple[str, str, dict]] = []
         for hit in hits:
             payload = getattr(hit, "payload", None) or {}
             doc_id = payload.get("doc_id", str(getattr(hit, "id", "")))
             text = payload.get("text", "")
             meta = payload.get("meta", {})
+            if "token_count" in payload:
+                meta = {**meta, "token_count": payload["token_count"]}
             results.append((doc_id, text, meta))
 
         return results
@@ -249,55 +1478,101 @@ class LongTermMemory:
         Delete documents from the Qdrant collection.
 
         If `doc_id` is provided (string), delete that single document.
-        If `doc_id` is None or empty, delete ALL RAG content in the collection by
-        scrolling through stored points and deleting them in batches.
+        If `doc_id` is None or empty, delete ALL RAG content (`delete_all`).
 
         Returns True if the delete request was issued successfully, False on error.
         """
-        from qdrant_client.http import models as qmodels
-
         try:
             if doc_id:
                 # Single-document delete (stable numeric point id)
                 point_id = self._make_point_id(doc_id)
-                self.client.delete(
-                    collection_name=self.collection_name,
+                self._call_served(
+                    "delete",
                     points_selector=qmodels.PointIdsList(points=[point_id]),
                 )
+                self._bump_generation()
                 return True
 
-            # Bulk delete: no doc_id provided -> delete everything in the collection
-            # We'll use `scroll` to enumerate point ids and delete in batches.
-            batch_size = 500
-            points_to_delete = []
-
-            offset = 0
-            while True:
-                pts, _ = self.client.scroll(
-                    collection_name=self.collection_name,
-                    limit=batch_size,
-                    with_payload=False,
-                    with_vectors=False,
-                )
-                if not pts:
-                    break
-                ids = [getattr(p, "id", None) for p in pts]
-                ids = [i for i in ids if i is not None]
-                if ids:
-                    # delete this batch
-                    self.client.delete(
-                        collection_name=self.collection_name,
-                        points_selector=qmodels.PointIdsList(points=ids),
-                    )
-                # If fewer than batch_size returned, we're done
-                if len(pts) < batch_size:
-                    break
-
+            self.delete_all()
             return True
 
         except Exception:
             return False
 
+    def delete_by_filter(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        doc_id_prefix: Optional[str] = None,
+    ) -> int:
+        """
+        Delete every point matching `filters` (same keys as `search`, e.g.
+        {"filename": "spec.pdf"} or {"source": "<swagger url>"}) and/or
+        `doc_id_prefix` in one filtered delete, without listing ids first.
+
+        `doc_id_prefix` must end at a ":" separator (e.g. "swagger::" or
+        "pdf:spec.pdf:"); it is matched on the indexed `doc_id_prefixes`
+        payload field. Points written before that field existed only match
+        after their next sync or a reindex.
+
+        Refuses to run without any condition (use `delete_all`).
+        Returns the number of points deleted.
+        """
+        if doc_id_prefix and not doc_id_prefix.endswith(":"):
+            raise ValueError(f"doc_id_prefix must end at a ':' separator, got {doc_id_prefix!r}")
+        query_filter = self._build_filter(filters)
+        if doc_id_prefix:
+            condition = qmodels.FieldCondition(key=DOC_ID_PREFIXES, match=qmodels.MatchValue(value=doc_id_prefix))
+            query_filter = qmodels.Filter(must=(query_filter.must if query_filter else []) + [condition])
+        if query_filter is None:
+            raise ValueError("delete_by_filter needs at least one filter or a doc_id prefix")
+
+        count = self._call_served(
+            "count",
+            count_filter=query_filter,
+            exact=True,
+        ).count
+        if count:
+            self._call_served(
+                "delete",
+                points_selector=qmodels.FilterSelector(filter=query_filter),
+            )
+            self._bump_generation()
+        return count
+
+    def delete_all(self) -> int:
+        """
+        Drop all content by swapping in an empty collection version (vector
+        size, sparse config and embedder tag of the current one, this
+        instance's storage profile, payload indexes) and deleting the
+        previously served version and older ones, instead of deleting points
+        batch by batch.
+
+        Raises `ReindexInProgress` while a newer, unserved version exists
+        (a `reindex` running or waiting for its swap): the wipe would be
+        overwritten by that swap, and deleting the target would break it.
+
+        Returns the number of points deleted.
+        """
+        client = self._backend.load_client()
+        current = self.physical_collection()
+        versions = self.versions()
+        live_version = next((n for n, name in versions if name == current), None)
+        pending = [name for n, name in versions if live_version is None or n > live_version]
+        if pending:
+            raise ReindexInProgress(
+                f"Collection {self.collection_name} has unserved version(s) {pending} from a reindex; "
+                f"finish it (scripts/reindex.py) or delete them before wiping"
+            )
+
+        count = client.count(collection_name=current, exact=True).count if current else 0
+        empty = self._version_name(versions[-1][0] + 1 if versions else 1, version_tag(current))
+        self._create_collection(client, empty, like=current)
+        self.swap_alias(empty)
+        for _, name in versions:  # all <= the previous alias target
+            client.delete_collection(name)
+            logger.info("Deleted old collection version %s", name)
+        self.client  # payload indexes on the new version
+        return count
 
     def list_documents(self, limit: int = 100) -> List[Dict[str, Any]]:
         """
@@ -308,8 +1583,8 @@ class LongTermMemory:
         - doc_id: logical string ID (payload["doc_id"])
         - meta: metadata dict from payload["meta"]
         """
-        points, _ = self.client.scroll(
-            collection_name=self.collection_name,
+        points, _ = self._call_served(
+            "scroll",
             limit=limit,
             with_payload=True,
             with_vectors=False,
@@ -0,0 +1,141 @@
+# memory/micro_batcher.py
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+from ..utils.logging import logger
+
+
+class _Pending:
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent encode requests into one batched encode call.
+
+    The first request opens a window of `max_wait_ms`; everything submitted
+    before it closes (or until `max_batch` texts are collected) is encoded
+    together and the vectors are fanned back out in order. A lone request
+    waits at most `max_wait_ms` extra.
+
+    `encode_fn(texts) -> vectors` must preserve order. The worker thread is
+    started on first use.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], Sequence[Any]],
+        max_batch: int = 32,
+        max_wait_ms: float = 5.0,
+        name: str = "embed-batcher",
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.name = name
+
+        self._queue: Deque[_Pending] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+        self.largest_batch = 0
+        self.queue_wait_seconds = 0.0
+
+    def submit(self, text: str) -> Any:
+        return self.submit_many([text])[0]
+
+    def submit_many(self, texts: List[str]) -> Sequence[Any]:
+        """
+        Encode `texts` as part of the next batch; blocks until done.
+        """
+        pending = _Pending(list(texts))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._queue.append(pending)
+            self._cond.notify()
+        return pending.future.result()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _collect(self) -> List[_Pending]:
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return []
+
+            deadline = self._queue[0].enqueued_at + self.max_wait_ms / 1000.0
+            while sum(len(p.texts) for p in self._queue) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or self._closed:
+                    break
+                self._cond.wait(remaining)
+
+            batch: List[_Pending] = []
+            n_texts = 0
+            while self._queue and (not batch or n_texts + len(self._queue[0].texts) <= self.max_batch):
+                p = self._queue.popleft()
+                batch.append(p)
+                n_texts += len(p.texts)
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if not batch:
+                return
+
+            started = time.perf_counter()
+            texts = [t for p in batch for t in p.texts]
+            try:
+                vectors = self.encode_fn(texts)
+            except Exception as e:
+                logger.warning("%s: batch of %d failed: %s", self.name, len(texts), e)
+                for p in batch:
+                    p.future.set_exception(e)
+                continue
+
+            start = 0
+            for p in batch:
+                p.future.set_result(vectors[start:start + len(p.texts)])
+                start += len(p.texts)
+
+            with self._stats_lock:
+                self.requests += len(batch)
+                self.batches += 1
+                self.texts += len(texts)
+                self.largest_batch = max(self.largest_batch, len(texts))
+                self.queue_wait_seconds += sum(started - p.enqueued_at for p in batch)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait_ms,
+                "requests": self.requests,
+                "batches": self.batches,
+                "texts": self.texts,
+                "avg_batch": round(self.texts / self.batches, 2) if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "avg_queue_wait_ms": round(self.queue_wait_seconds * 1000 / self.requests, 2) if self.requests else 0.0,
+            }
@@ -0,0 +1,68 @@
+# memory/sparse.py
+"""
+Lexical (BM25-style) sparse vectors for hybrid search.
+
+Documents get BM25 term-frequency weights; Qdrant applies IDF at query time
+(`Modifier.IDF` on the sparse vector config), so no corpus statistics have to
+be kept here. Terms are hashed to uint32 indices.
+
+The tokenizer keeps exact identifiers next to their parts, so both
+"TransactionService" and "transaction service" match, and API paths such as
+"/accounts/{id}/debit" are one term as well as "accounts", "id", "debit".
+"""
+import re
+import zlib
+from collections import Counter
+from typing import List, Tuple
+
+# BM25 parameters; chunks are token-capped, so a fixed average length is close enough
+K1 = 1.2
+B = 0.75
+AVG_DOC_LEN = 200
+
+_TOKEN = re.compile(r"/[\w{}./-]+|[A-Za-z_][A-Za-z0-9_]*|\d+")
+_WORD_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+_PATH_SEP = re.compile(r"[/{}.\-_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    terms: List[str] = []
+    for tok in _TOKEN.findall(text or ""):
+        low = tok.lower()
+        terms.append(low)
+        if tok.startswith("/"):
+            parts = [p for p in _PATH_SEP.split(low) if p]
+        else:
+            parts = [p.lower() for p in _WORD_PART.findall(tok)]
+        if len(parts) > 1 or (parts and parts[0] != low):
+            terms.extend(parts)
+    return terms
+
+
+def _term_index(term: str) -> int:
+    return zlib.crc32(term.encode("utf-8")) & 0xFFFFFFFF
+
+
+def _to_sparse(weights: dict) -> Tuple[List[int], List[float]]:
+    merged: dict = {}
+    for term, weight in weights.items():
+        idx = _term_index(term)
+        merged[idx] = merged.get(idx, 0.0) + weight  # hash collisions add up
+    indices = sorted(merged)
+    return indices, [merged[i] for i in indices]
+
+
+def document_vector(text: str) -> Tuple[List[int], List[float]]:
+    """
+    BM25 term-frequency part for a stored chunk: (indices, values).
+    """
+    terms = tokenize(text)
+    norm = K1 * (1 - B + B * len(terms) / AVG_DOC_LEN)
+    return _to_sparse({term: tf * (K1 + 1) / (tf + norm) for term, tf in Counter(terms).items()})
+
+
+def query_vector(text: str) -> Tuple[List[int], List[float]]:
+    """
+    Query side: every distinct term weighs 1 (IDF is applied by Qdrant).
+    """
+    return _to_sparse({term: 1.0 for term in set(tokenize(text))})
@@ -0,0 +1,143 @@
+# memory/storage_profiles.py
+from typing import Any, Dict, Optional
+
+from qdrant_client.http import models as qmodels
+
+
+class StorageProfile:
+    """
+    How a collection stores vectors, payload and the HNSW graph.
+
+    Applied at collection creation (`collection_kwargs`) or to an existing
+    collection (`update_kwargs`, see `LongTermMemory.apply_storage_profile`).
+    Quantized profiles search the int8 copy and rescore the top hits with
+    the original vectors by default.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        int8: bool = False,
+        on_disk_vectors: bool = False,
+        on_disk_payload: bool = False,
+        hnsw_m: int = 16,
+        hnsw_ef_construct: int = 100,
+        hnsw_on_disk: bool = False,
+        oversampling: float = 2.0,
+    ):
+        self.name = name
+        self.int8 = int8
+        self.on_disk_vectors = on_disk_vectors
+        self.on_disk_payload = on_disk_payload
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct
+        self.hnsw_on_disk = hnsw_on_disk
+        self.oversampling = oversampling
+
+    def hnsw_config(self) -> qmodels.HnswConfigDiff:
+        return qmodels.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct, on_disk=self.hnsw_on_disk)
+
+    def quantization_config(self):
+        if not self.int8:
+            return None
+        return qmodels.ScalarQuantization(
+            scalar=qmodels.ScalarQuantizationConfig(
+                type=qmodels.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True,  # the int8 copy stays in RAM even with on-disk vectors
+            )
+        )
+
+    def collection_kwargs(self, dim: int, sparse_vectors_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Keyword arguments for `QdrantClient.create_collection`.
+        """
+        return {
+            "vectors_config": qmodels.VectorParams(
+                size=dim,
+                distance=qmodels.Distance.COSINE,
+                on_disk=self.on_disk_vectors,
+            ),
+            "sparse_vectors_config": sparse_vectors_config,
+            "hnsw_config": self.hnsw_config(),
+            "quantization_config": self.quantization_config(),
+            "on_disk_payload": self.on_disk_payload,
+        }
+
+    def update_kwargs(self) -> Dict[str, Any]:
+        """
+        Keyword arguments for `QdrantClient.update_collection`; Qdrant
+        rebuilds the affected segments in the background.
+        """
+        return {
+            "vectors_config": {"": qmodels.VectorParamsDiff(on_disk=self.on_disk_vectors)},
+            "hnsw_config": self.hnsw_config(),
+            "quantization_config": self.quantization_config() or qmodels.Disabled.DISABLED,
+            "collection_params": qmodels.CollectionParamsDiff(on_disk_payload=self.on_disk_payload),
+        }
+
+    def search_params(
+        self,
+        hnsw_ef: Optional[int] = None,
+        exact: bool = False,
+        rescore: Optional[bool] = None,
+    ) -> Optional[qmodels.SearchParams]:
+        """
+        Per-query search params; None when everything is left at Qdrant's defaults.
+        """
+        quantization = None
+        if exact and self.int8:
+            # Ground truth: brute force over the original vectors only
+            quantization = qmodels.QuantizationSearchParams(ignore=True)
+        elif self.int8 or rescore is not None:
+            rescore = True if rescore is None else rescore
+            quantization = qmodels.QuantizationSearchParams(
+                rescore=rescore,
+                oversampling=self.oversampling if rescore else None,
+            )
+        if hnsw_ef is None and not exact and quantization is None:
+            return None
+        return qmodels.SearchParams(hnsw_ef=hnsw_ef, exact=exact, quantization=quantization)
+
+    def estimate_ram_bytes(self, n_points: int, dim: int) -> int:
+        """
+        Rough resident memory of the vectors and graph (payload excluded).
+        """
+        ram = 0
+        if not self.on_disk_vectors:
+            ram += n_points * dim * 4
+        if self.int8:
+            ram += n_points * dim
+        if not self.hnsw_on_disk:
+            ram += n_points * self.hnsw_m * 2 * 4  # layer 0 keeps up to 2*m u32 links per point
+        return ram
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "int8": self.int8,
+            "on_disk_vectors": self.on_disk_vectors,
+            "on_disk_payload": self.on_disk_payload,
+            "hnsw_m": self.hnsw_m,
+            "hnsw_ef_construct": self.hnsw_ef_construct,
+            "hnsw_on_disk": self.hnsw_on_disk,
+        }
+
+
+STORAGE_PROFILES: Dict[str, StorageProfile] = {
+    # float32 vectors, payload and graph in RAM
+    "memory": StorageProfile("memory"),
+    # int8 copy in RAM for search, float32 kept in RAM for rescoring
+    "int8": StorageProfile("int8", int8=True),
+    # int8 copy in RAM, float32 vectors and payload on disk (rescoring reads disk)
+    "int8-disk": StorageProfile("int8-disk", int8=True, on_disk_vectors=True, on_disk_payload=True),
+    # everything on disk; smallest footprint, slowest queries
+    "disk": StorageProfile("disk", on_disk_vectors=True, on_disk_payload=True, hnsw_on_disk=True),
+}
+
+
+def get_storage_profile(name: str) -> StorageProfile:
+    try:
+        return STORAGE_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown storage profile {name!r}; expected one of {sorted(STORAGE_PROFILES)}")
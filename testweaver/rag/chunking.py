@@ -0,0 +1,127 @@
+# rag/chunking.py
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from ..utils.tokens import TokenCounter, get_token_counter
+
+# Sentence end followed by whitespace and something that can start a sentence
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[A-Z0-9•\-])|\n+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split a paragraph into sentences (regex heuristic, no NLP model).
+    """
+    return [s.strip() for s in _SENTENCE_BOUNDARY.split(text) if s and s.strip()]
+
+
+def chunk_by_tokens(
+    paragraphs: Iterable[str],
+    max_tokens: int = 300,
+    overlap_tokens: int = 50,
+    counter: Optional[TokenCounter] = None,
+) -> Iterator[Tuple[str, int]]:
+    """
+    Token-budgeted chunker.
+
+    - packs whole sentences until `max_tokens` would be exceeded
+    - overlap is the trailing sentences of the previous chunk that fit in
+      `overlap_tokens` (never half a sentence)
+    - a single sentence longer than `max_tokens` is hard-split on token boundaries
+    - paragraph breaks are kept as blank lines inside a chunk
+
+    Yields (chunk_text, token_count).
+    """
+    counter = counter or get_token_counter()
+    # Each unit: (sentence, tokens, starts_new_paragraph)
+    current: List[Tuple[str, int, bool]] = []
+    current_tokens = 0
+
+    def _render(units: List[Tuple[str, int, bool]]) -> str:
+        out = ""
+        for i, (sent, _, new_para) in enumerate(units):
+            if i == 0:
+                out = sent
+            else:
+                out += ("\n\n" if new_para else " ") + sent
+        return out
+
+    def _emit(units: List[Tuple[str, int, bool]]) -> Tuple[str, int]:
+        text = _render(units)
+        return text, counter.count(text)
+
+    def _overlap(units: List[Tuple[str, int, bool]]) -> List[Tuple[str, int, bool]]:
+        kept: List[Tuple[str, int, bool]] = []
+        total = 0
+        for unit in reversed(units):
+            if total + unit[1] > overlap_tokens:
+                break
+            kept.insert(0, unit)
+            total += unit[1]
+        return kept
+
+    for para in paragraphs:
+        new_para = True
+        for sent in split_sentences(para):
+            n = counter.count(sent)
+
+            if n > max_tokens:
+                if current:
+                    yield _emit(current)
+                    current, current_tokens = [], 0
+                for piece in counter.split(sent, max_tokens):
+                    if piece.strip():
+                        yield piece.strip(), counter.count(piece.strip())
+                new_para = False
+                continue
+
+            if current and current_tokens + n > max_tokens:
+                yield _emit(current)
+                current = _overlap(current) if overlap_tokens > 0 else []
+                current_tokens = sum(u[1] for u in current)
+                # Overlap + sentence must still fit the budget
+                while current and current_tokens + n > max_tokens:
+                    current_tokens -= current.pop(0)[1]
+
+            current.append((sent, n, new_para))
+            current_tokens += n
+            new_para = False
+
+    if current:
+        yield _emit(current)
+
+
+def split_lines_by_tokens(
+    text: str,
+    max_tokens: int,
+    header_lines: int = 0,
+    counter: Optional[TokenCounter] = None,
+) -> List[str]:
+    """
+    Split a line-oriented chunk (e.g. an OpenAPI operation) into parts of at
+    most `max_tokens`, repeating the first `header_lines` lines in every part
+    so each part still identifies its operation/schema.
+    """
+    counter = counter or get_token_counter()
+    if counter.count(text) <= max_tokens:
+        return [text]
+
+    lines = text.split("\n")
+    header = lines[:header_lines]
+    body = lines[header_lines:]
+    header_tokens = counter.count("\n".join(header)) if header else 0
+    budget = max(1, max_tokens - header_tokens)
+
+    parts: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for line in body:
+        n = counter.count(line) + 1  # + newline
+        if current and current_tokens + n > budget:
+            parts.append("\n".join(header + current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += n
+    if current or not parts:
+        parts.append("\n".join(header + current))
+    return parts
@@ -0,0 +1,155 @@
+# rag/code_index.py
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from ..mcp.git_client import MCPGitClient
+from ..memory.long_term import LongTermMemory
+from ..utils.logging import logger
+from ..utils.pipeline import run_stages
+from .loaders.java_loader import git_blob_sha, java_doc_id, java_to_rag_chunks
+
+
+class CodeIndexer:
+    """
+    Incremental indexer of a repo's Java sources into a code collection.
+
+    Every chunk carries `meta.file_path` and `meta.blob_sha`, so the stored
+    points double as the index manifest. A run:
+    1. lists `base_path` with blob SHAs (one /list call)
+    2. skips files whose SHA matches the stored one
+    3. fetches changed files in batches of `fetch_batch_size`
+       (`fetch_workers` concurrent requests at most), chunks them by class and
+       method, embeds and upserts them while the next batch is being fetched
+    4. deletes chunks of removed files / methods in filtered deletes
+
+    The manifest spans the whole repo, so indexing another `base_path` of
+    the same repo leaves files outside it alone.
+    """
+
+    def __init__(
+        self,
+        git: MCPGitClient,
+        store: LongTermMemory,
+        base_path: str = "src/main/java",
+        fetch_batch_size: int = 32,
+        fetch_workers: int = 8,
+        max_tokens: Optional[int] = None,
+    ):
+        self.git = git
+        self.store = store
+        self.repo = git.repo
+        self.base_path = base_path
+        self.fetch_batch_size = fetch_batch_size
+        self.fetch_workers = fetch_workers
+        self.max_tokens = max_tokens
+        self.source_id = f"code:{self.repo}"
+
+    def load_manifest(self) -> Dict[str, Tuple[str, Set[str]]]:
+        """
+        {file_path: (blob_sha, {doc_id, ...})} for everything indexed so far.
+        """
+        manifest: Dict[str, Tuple[str, Set[str]]] = {}
+        for payload in self.store.iter_source_payloads(self.source_id, ["doc_id", "meta"]):
+            meta = payload.get("meta") or {}
+            path = meta.get("file_path")
+            if not path:
+                continue
+            _, doc_ids = manifest.setdefault(path, (meta.get("blob_sha", ""), set()))
+            doc_ids.add(payload.get("doc_id"))
+        return manifest
+
+    def _under_base(self, path: str) -> bool:
+        base = self.base_path.strip("/")
+        return not base or base == "." or path == base or path.startswith(base + "/")
+
+    def index(
+        self,
+        force: bool = False,
+        progress: Optional[Callable[[str, int], None]] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> Dict[str, int]:
+        """
+        Bring the code collection in line with the repo.
+        `force=True` re-indexes every file regardless of its SHA.
+
+        Setting `stop` raises `PipelineCancelled` between fetch batches and
+        between upsert batches; removed files are only cleaned up after a
+        complete run.
+
+        Returns counts: {"files", "changed", "unchanged", "removed", "chunks"}.
+        """
+        report = progress or (lambda stage, n: None)
+        listing = self.git.list_files_with_sha(self.base_path)
+        manifest = self.load_manifest()
+        stats = {"files": len(listing), "changed": 0, "unchanged": 0, "removed": 0, "chunks": 0}
+
+        to_fetch: List[Tuple[str, Optional[str]]] = []
+        for entry in listing:
+            known = manifest.get(entry["path"])
+            if not force and known and entry["sha"] and known[0] == entry["sha"]:
+                stats["unchanged"] += 1
+            else:
+                to_fetch.append((entry["path"], entry["sha"]))
+
+        def _path_batches() -> Iterator[List[Tuple[str, Optional[str]]]]:
+            for start in range(0, len(to_fetch), self.fetch_batch_size):
+                yield to_fetch[start:start + self.fetch_batch_size]
+
+        def _fetch_stage(batch: List[Tuple[str, Optional[str]]]) -> List[Tuple[str, list]]:
+            contents = self.git.get_files([path for path, _ in batch], max_workers=self.fetch_workers)
+            out = []
+            for path, sha in batch:
+                source = contents.get(path)
+                if source is None:
+                    logger.warning("Code index: %s listed but not returned by git-mcp, skipped", path)
+                    continue
+                sha = sha or git_blob_sha(source)
+                known = manifest.get(path)
+                if not force and known and known[0] == sha:
+                    # Server gave no SHA up front; content turned out unchanged
+                    stats["unchanged"] += 1
+                    continue
+                chunks = java_to_rag_chunks(
+                    source,
+                    path,
+                    repo=self.repo,
+                    blob_sha=sha,
+                    max_tokens=self.max_tokens,
+                )
+                out.append((path, [(java_doc_id(ch["meta"]), ch["text"], ch["meta"]) for ch in chunks]))
+            report("parsed", sum(len(docs) for _, docs in out))
+            return out
+
+        def _upsert_stage(files: List[Tuple[str, list]]) -> None:
+            docs = [doc for _, file_docs in files for doc in file_docs]
+            written = self.store.add_documents(docs, source_id=self.source_id, stop=stop)
+            report("embedded", written)
+
+            # Chunks of methods/classes that disappeared from a changed file
+            fresh = {doc_id for doc_id, _, _ in docs}
+            stale = [
+                doc_id
+                for path, _ in files
+                for doc_id in manifest.get(path, ("", set()))[1]
+                if doc_id not in fresh
+            ]
+            self.store.delete_source_documents(self.source_id, stale)
+            report("upserted", written)
+
+            stats["changed"] += len(files)
+            stats["chunks"] += written
+
+        run_stages(_path_batches(), [_fetch_stage, _upsert_stage], depth=2, stop=stop)
+
+        # Only files under base_path can have been removed: the manifest
+        # covers every path indexed from this repo
+        listed = {entry["path"] for entry in listing}
+        removed = [path for path in manifest if self._under_base(path) and path not in listed]
+        self.store.delete_source_documents(
+            self.source_id,
+            [doc_id for path in removed for doc_id in manifest[path][1]],
+        )
+        stats["removed"] = len(removed)
+
+        logger.debug("Code index: repo=%s base_path=%s stats=%s", self.repo, self.base_path, stats)
+        return stats
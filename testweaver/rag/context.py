@@ -0,0 +1,211 @@
+# rag/context.py
+from typing import Any, Callable, Collection, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..utils.tokens import count_tokens
+from .chunking import split_sentences
+
+SEPARATOR = "\n\n---\n\n"
+
+# Overlap between neighbouring chunks is trimmed when at least this long
+# (PDF chunks overlap by ~200 chars; shorter matches are likely coincidence)
+MIN_OVERLAP_CHARS = 40
+MAX_OVERLAP_CHARS = 600
+
+# Marks where sentences were dropped inside a compressed chunk
+ELISION = " … "
+
+
+def format_block(hit: Dict[str, Any], text: Optional[str] = None) -> str:
+    """
+    "[SOURCE ... | DOC ...]" header + chunk text, as shown to the LLM.
+    """
+    meta = hit.get("meta") or {}
+    # Try to show something human-friendly in the prefix
+    source = (
+        meta.get("source")
+        or meta.get("file_path")
+        or meta.get("type")
+        or "unknown"
+    )
+    return f"[SOURCE {source} | DOC {hit['doc_id']}]\n{hit['text'] if text is None else text}"
+
+
+def hit_tokens(hit: Dict[str, Any]) -> int:
+    """
+    Token count of a hit's text: the `token_count` stored at ingestion
+    (returned in meta by the search) when present, else counted.
+    """
+    stored = (hit.get("meta") or {}).get("token_count")
+    return stored if isinstance(stored, int) else count_tokens(hit["text"] or "")
+
+
+def _normalized(vecs) -> np.ndarray:
+    arr = np.asarray(vecs, dtype=np.float32)
+    return arr / np.maximum(np.linalg.norm(arr, axis=-1, keepdims=True), 1e-12)
+
+
+def mmr_order(query_vec: Sequence[float], doc_vecs: Sequence[Sequence[float]], lambda_mult: float = 0.7) -> List[int]:
+    """
+    Maximal marginal relevance: order docs by
+    lambda * sim(query, doc) - (1 - lambda) * max sim(doc, already picked).
+    """
+    if len(doc_vecs) == 0:
+        return []
+    docs = _normalized(doc_vecs)
+    query = _normalized(query_vec)
+
+    relevance = docs @ query
+    similarity = docs @ docs.T
+
+    order = [int(np.argmax(relevance))]
+    remaining = [i for i in range(len(docs)) if i != order[0]]
+    while remaining:
+        redundancy = similarity[np.ix_(remaining, order)].max(axis=1)
+        scores = lambda_mult * relevance[remaining] - (1 - lambda_mult) * redundancy
+        best = remaining[int(np.argmax(scores))]
+        order.append(best)
+        remaining.remove(best)
+    return order
+
+
+def _overlap(head: str, tail: str) -> int:
+    """
+    Length of the longest suffix of `head` that is a prefix of `tail`.
+    """
+    for n in range(min(len(head), len(tail), MAX_OVERLAP_CHARS), MIN_OVERLAP_CHARS - 1, -1):
+        if head.endswith(tail[:n]):
+            return n
+    return 0
+
+
+def trim_overlap(text: str, kept: List[str]) -> str:
+    """
+    Drop the spans of `text` already present at the edges of kept chunks.
+    """
+    for other in kept:
+        n = _overlap(other, text)  # `other` precedes `text` in the source
+        if n:
+            text = text[n:]
+        n = _overlap(text, other)  # `text` precedes `other`
+        if n:
+            text = text[:-n]
+    return text.strip()
+
+
+def _select_sentences(sentences: List[str], scores: np.ndarray, max_tokens: int) -> str:
+    """
+    Best-scoring sentences within `max_tokens` (the best one always), joined
+    in their original order with ELISION where sentences were dropped.
+    """
+    keep: List[int] = []
+    used = 0
+    for i in np.argsort(-scores):
+        cost = count_tokens(sentences[i])
+        if keep and used + cost > max_tokens:
+            break  # don't backfill with lower-scoring short sentences
+        keep.append(int(i))
+        used += cost
+
+    out = ""
+    prev = None
+    for i in sorted(keep):
+        if prev is not None:
+            out += " " if i == prev + 1 else ELISION
+        out += sentences[i]
+        prev = i
+    return out
+
+
+def compress_hits(
+    hits: List[Dict[str, Any]],
+    query_vec: Sequence[float],
+    embed_many: Callable[[List[str]], Sequence[Sequence[float]]],
+    max_tokens: int,
+    types: Collection[str] = ("pdf",),
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Query-focused extractive compression: chunks of the given meta `types`
+    longer than `max_tokens` keep only their sentences most similar to the
+    query, up to `max_tokens`. All sentences are embedded in one batch;
+    sentences already seen in an earlier chunk (chunk overlap) are dropped.
+    Code and structured chunks (other types) are left untouched.
+
+    Returns (hits, stats) with stats {"compressed", "tokens_before", "tokens_after"}.
+    """
+    plan: List[Tuple[int, List[str]]] = []
+    seen: set = set()
+    for i, hit in enumerate(hits):
+        if (hit.get("meta") or {}).get("type") not in types or hit_tokens(hit) <= max_tokens:
+            continue
+        sentences = [sent for sent in split_sentences(hit["text"] or "") if sent not in seen]
+        seen.update(sentences)
+        if sentences:
+            plan.append((i, sentences))
+
+    stats = {"compressed": len(plan), "tokens_before": 0, "tokens_after": 0}
+    if not plan:
+        return hits, stats
+
+    flat = [sent for _, sentences in plan for sent in sentences]
+    scores = _normalized(embed_many(flat)) @ _normalized(query_vec)
+
+    out = list(hits)
+    start = 0
+    for i, sentences in plan:
+        text = _select_sentences(sentences, scores[start:start + len(sentences)], max_tokens)
+        start += len(sentences)
+        tokens = count_tokens(text)
+        stats["tokens_before"] += hit_tokens(hits[i])
+        stats["tokens_after"] += tokens
+        # Keep the stored count in step with the new text for `pack_context`
+        out[i] = {**hits[i], "text": text, "meta": {**(hits[i].get("meta") or {}), "token_count": tokens}}
+    return out, stats
+
+
+def pack_context(
+    hits: List[Dict[str, Any]],
+    token_budget: Optional[int],
+    query_vec: Optional[Sequence[float]] = None,
+    doc_vecs: Optional[List[Optional[Sequence[float]]]] = None,
+    lambda_mult: float = 0.7,
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Build the prompt context from `hits` within `token_budget` tokens
+    (None: no limit).
+
+    Hits are taken in MMR order when every hit has a vector (retrieval order
+    otherwise), overlapping spans with already packed chunks are removed,
+    and chunks that no longer fit are skipped. Untrimmed chunks are costed
+    with their stored `token_count` (see `hit_tokens`); only headers and
+    trimmed or uncounted chunks are tokenized.
+
+    Returns (context, stats) with stats {"chunks", "skipped", "tokens"}.
+    """
+    order = list(range(len(hits)))
+    if query_vec is not None and doc_vecs and all(v is not None for v in doc_vecs):
+        order = mmr_order(query_vec, doc_vecs, lambda_mult)
+
+    sep_tokens = count_tokens(SEPARATOR)
+    blocks: List[str] = []
+    kept: List[str] = []
+    used = 0
+    skipped = 0
+    for i in order:
+        original = hits[i]["text"] or ""
+        text = trim_overlap(original, kept)
+        if not text:
+            skipped += 1
+            continue
+        block = format_block(hits[i], text)
+        text_tokens = hit_tokens(hits[i]) if text == original else count_tokens(text)
+        cost = count_tokens(format_block(hits[i], "")) + text_tokens + (sep_tokens if blocks else 0)
+        if token_budget is not None and used + cost > token_budget:
+            skipped += 1
+            continue
+        blocks.append(block)
+        kept.append(text)
+        used += cost
+
+    return SEPARATOR.join(blocks), {"chunks": len(blocks), "skipped": skipped, "tokens": used}
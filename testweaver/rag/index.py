@@ -1,83 +1,390 @@
 # rag/index.py
-from typing import List
+import threading
+from typing import Any, List, Iterable, Tuple, Optional, Dict
 from ..memory.long_term import LongTermMemory
+from .context import SEPARATOR, compress_hits, format_block, pack_context
+from .rerank import CrossEncoderReranker
 from ..utils.logging import logger  # use your shared logger
+from ..utils.lru import LRUCache
+from ..utils.timing import LegTimings
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[Tuple[str, str, dict]]],
+    k: int = 60,
+) -> List[Tuple[str, str, dict]]:
+    """
+    Merge ranked hit lists: score(doc) = sum over lists of 1 / (k + rank).
+    Hits are identified by doc_id; ties keep first-seen order.
+    """
+    scores: Dict[str, float] = {}
+    hits: Dict[str, Tuple[str, str, dict]] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            doc_id = hit[0]
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+            hits.setdefault(doc_id, hit)
+    return [hits[doc_id] for doc_id in sorted(hits, key=lambda d: -scores[d])]
+
+
+class RetrievalResult:
+    """
+    Hits retrieved once for a request, shared by the prompt context and
+    the `rag_hits` returned to the UI.
+
+    hits: [{"doc_id", "score", "meta", "text", "collection"}, ...]
+    """
+
+    def __init__(self, query: str, top_k: int, hits: List[Dict[str, Any]]):
+        self.query = query
+        self.top_k = top_k
+        self.hits = hits
+        self._context: Optional[str] = None
+
+    @property
+    def context(self) -> str:
+        """
+        "[SOURCE ... | DOC ...]" blocks joined by separators (built once).
+        """
+        if self._context is not None:
+            return self._context
+
+        context_chunks: List[str] = []
+        for hit in self.hits:
+            text = hit["text"]
+            preview = (text[:200] + "...") if len(text) > 200 else text
+
+            logger.debug(
+                "RAG chunk used | doc_id=%s | meta=%s | preview=%r",
+                hit["doc_id"],
+                hit["meta"],
+                preview,
+            )
+            context_chunks.append(format_block(hit))
+
+        self._context = SEPARATOR.join(context_chunks)
+        logger.debug(
+            "RAG: built context with %d chunks (%d chars) for query %r",
+            len(context_chunks),
+            len(self._context),
+            self.query,
+        )
+        return self._context
+
+    def ui_hits(self, preview_chars: int = 400) -> List[Dict[str, Any]]:
+        """
+        Hits shaped for the UI (`text_preview` instead of the full text).
+        """
+        return [
+            {
+                "doc_id": hit["doc_id"],
+                "score": hit["score"],
+                "meta": hit["meta"],
+                "text_preview": (hit["text"] or "")[:preview_chars],
+            }
+            for hit in self.hits
+        ]
+
 
 class RAGIndex:
-    def __init__(self, store: LongTermMemory):
+    def __init__(
+        self,
+        store: LongTermMemory,
+        code_store: Optional[LongTermMemory] = None,
+        code_top_k: int = 3,
+        result_cache_size: int = 512,
+        result_cache_ttl: Optional[float] = 30.0,
+        hybrid: bool = True,
+        rrf_k: int = 60,
+        fusion_candidates: int = 20,
+        reranker: Optional[CrossEncoderReranker] = None,
+        rerank_candidates: int = 20,
+        mmr_lambda: float = 0.7,
+        compress_max_tokens: int = 0,
+        compress_types: Tuple[str, ...] = ("pdf",),
+    ):
         self.store = store
+        # Optional Java code collection (see rag/code_index.py)
+        self.code_store = code_store
+        self.code_top_k = code_top_k
+        # Search results keyed by (collection, generation, query, top_k, filters).
+        # Writes through this process bump the store generation; writes by other
+        # workers, scripts/reindex.py or other replicas are only picked up once
+        # entries expire after `result_cache_ttl` seconds (None: never)
+        self.results = LRUCache(maxsize=result_cache_size, ttl=result_cache_ttl)
+        # Hybrid search: dense + BM25 legs (each `fusion_candidates` deep)
+        # merged with reciprocal rank fusion
+        self.hybrid = hybrid
+        self.rrf_k = rrf_k
+        self.fusion_candidates = fusion_candidates
+        self.legs = LegTimings()
+        # Optional cross-encoder pass over `rerank_candidates` primary hits
+        self.reranker = reranker
+        self.rerank_candidates = rerank_candidates
+        # Relevance vs. diversity trade-off of budgeted context packing
+        self.mmr_lambda = mmr_lambda
+        # Extractive compression of prose chunks to `compress_max_tokens` each (0: off)
+        self.compress_max_tokens = compress_max_tokens
+        self.compress_types = compress_types
+
+    @staticmethod
+    def _filter_key(filters: Optional[Dict[str, Any]]) -> tuple:
+        """
+        Hashable, order-independent form of a filters dict (cache key part).
+        """
+        return tuple(sorted(
+            (k, tuple(sorted(v, key=str)) if isinstance(v, (list, tuple, set)) else v)
+            for k, v in (filters or {}).items()
+            if v is not None
+        ))
+
+    def _search_store(
+        self,
+        store: LongTermMemory,
+        query: str,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[str, str, dict]]:
+        key = (store.collection_name, store.generation, query, top_k, self._filter_key(filters))
+        return self.results.get_or_compute(key, lambda: self._hybrid_search(store, query, top_k, filters))
+
+    def _hybrid_search(
+        self,
+        store: LongTermMemory,
+        query: str,
+        top_k: int,
+        filters: Optional[Dict[str, Any]],
+    ) -> List[Tuple[str, str, dict]]:
+        """
+        Dense search, fused with BM25 search (RRF) when the collection has
+        sparse vectors; plain `top_k` dense search otherwise (no
+        over-fetching for a single list). Latency of each leg is recorded
+        in `legs`.
+        """
+        if self.hybrid:
+            store.client  # detects sparse support on first use
+        if not (self.hybrid and store.sparse_enabled):
+            with self.legs.time("dense"):
+                return store.search(query, top_k=top_k, filters=filters)
+
+        limit = max(top_k, self.fusion_candidates)
+        with self.legs.time("dense"):
+            dense = store.search(query, top_k=limit, filters=filters)
+
+        with self.legs.time("sparse"):
+            lexical = store.search_sparse(query, top_k=limit, filters=filters)
+        if not lexical:
+            return dense[:top_k]
+
+        with self.legs.time("fusion"):
+            fused = reciprocal_rank_fusion([dense, lexical], k=self.rrf_k)[:top_k]
+        logger.debug(
+            "RAG hybrid: %d dense + %d sparse -> %d fused hit(s) for query %r",
+            len(dense),
+            len(lexical),
+            len(fused),
+            query,
+        )
+        return fused
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Hit rates and latency saved by the query-embedding and result caches,
+        query micro-batching counters and per-leg search latency.
+        """
+        batcher = self.store.query_batcher
+        return {
+            "query_embedding": self.store.query_vectors.stats(),
+            "query_batcher": batcher.stats() if batcher is not None else None,
+            "retrieval": self.results.stats(),
+            "search_legs": self.legs.stats(),
+            "rerank": self.reranker.stats() if self.reranker is not None else None,
+        }
 
     def ingest_text(self, doc_id: str, text: str, meta: dict):
         logger.debug("RAG ingest: doc_id=%s meta=%s", doc_id, meta)
         self.store.add_document(doc_id, text, meta)
 
-    def retrieve_context(self, query: str, top_k: int = 5) -> str:
+    def ingest_many(
+        self,
+        docs: Iterable[Tuple[str, str, dict]],
+        batch_size: Optional[int] = None,
+        source_id: Optional[str] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> int:
+        """
+        Bulk ingest (doc_id, text, meta) tuples with batched embed calls
+        and batched upserts. Setting `stop` aborts between batches with
+        `PipelineCancelled`. Returns the number of chunks written.
+        """
+        docs = list(docs)
+        logger.debug("RAG bulk ingest: %d doc(s) source=%s", len(docs), source_id)
+        return self.store.add_documents(docs, batch_size=batch_size, source_id=source_id, stop=stop)
+
+    def sync_source(self, source_id: str, docs: Iterable[Tuple[str, str, dict]], **kwargs) -> Dict[str, int]:
+        """
+        Incremental re-ingestion of one source: only new/changed chunks are
+        embedded, identical ones are skipped and stale ones are deleted.
+        Extra kwargs (progress, stop) are forwarded to the store.
+        """
+        stats = self.store.sync_source(source_id, docs, **kwargs)
+        logger.debug("RAG sync: source=%s stats=%s", source_id, stats)
+        return stats
+
+    def retrieve(self, query: str, top_k: int = 5, filters: Optional[Dict[str, Any]] = None) -> RetrievalResult:
         """
         1. Search using the user query
         2. If no hits, fall back to a generic accounting-ish query
-        3. Log how many hits we got and what chunks we’re using
-        4. Return a concatenated context string
+        3. With a reranker: score `rerank_candidates` hits with the
+           cross-encoder and keep the best `top_k` (retrieval order if the
+           latency budget runs out)
+        4. Add the top code chunks when a code collection is configured
+        5. Log how many hits we got
+
+        `filters` (e.g. {"type": "operation", "service": "payments"}) apply
+        to the document search only: code chunks carry none of those meta
+        fields, so filtering them would always return no code hits.
+
+        The returned result serves both the prompt context and the UI hits,
+        so one request never searches twice.
         """
-        logger.debug("RAG: primary search for query %r (top_k=%d)", query, top_k)
-        results = self.store.search(query, top_k=top_k)
+        search_k = max(top_k, self.rerank_candidates) if self.reranker is not None else top_k
+        logger.debug("RAG: primary search for query %r (top_k=%d, filters=%s)", query, top_k, filters)
+        searched_query = query
+        results = self._search_store(self.store, query, search_k, filters)
 
         if not results:
             logger.debug(
                 "RAG: no hits for query %r, falling back to generic query", query
             )
-            fallback_query = "account transaction balance error"
-            results = self.store.search(fallback_query, top_k=top_k)
+            searched_query = "account transaction balance error"
+            results = self._search_store(self.store, searched_query, search_k, filters)
+
+        primary = self.store.collection_name
+        scored: List[Tuple[Tuple[str, str, dict], Optional[float]]] = [(hit, None) for hit in results[:top_k]]
+        if self.reranker is not None and results:
+            with self.legs.time("rerank"):
+                reranked = self.reranker.rerank(searched_query, list(results), top_k)
+            if reranked is not None:
+                scored = reranked
+        collections = [primary] * len(scored)
+
+        if self.code_store is not None and self.code_top_k > 0:
+            code_results = self._search_store(self.code_store, query, self.code_top_k)
+            logger.debug("RAG: %d code hit(s) for query %r", len(code_results), query)
+            scored += [(hit, None) for hit in code_results]
+            collections += [self.code_store.collection_name] * len(code_results)
+        results = [hit for hit, _ in scored]
 
         if not results:
             logger.debug("RAG: still no hits after fallback for query %r", query)
-            return ""
+        else:
+            logger.debug(
+                "RAG: %d hit(s) for query %r (top_k=%d)",
+                len(results),
+                query,
+                top_k,
+            )
 
-        logger.debug(
-            "RAG: %d hit(s) for query %r (top_k=%d)",
-            len(results),
+        return RetrievalResult(
             query,
             top_k,
+            [
+                {"doc_id": doc_id, "score": score, "meta": meta or {}, "text": text, "collection": collection}
+                for ((doc_id, text, meta), score), collection in zip(scored, collections)
+            ],
         )
 
-        context_chunks: List[str] = []
-        for doc_id, text, meta in results:
-            preview = (text[:200] + "...") if len(text) > 200 else text
+    def build_context(self, result: RetrievalResult, token_budget: Optional[int] = None) -> str:
+        """
+        Prompt context for `result`: the plain concatenation unless a token
+        budget or compression asks for `pack_context`.
+        """
+        if token_budget is None and self.compress_max_tokens <= 0:
+            return result.context
+        return self.pack_context(result, token_budget)
 
-            logger.debug(
-                "RAG chunk used | doc_id=%s | meta=%s | preview=%r",
-                doc_id,
-                meta,
-                preview,
-            )
+    def pack_context(self, result: RetrievalResult, token_budget: Optional[int]) -> str:
+        """
+        Context for `result` that fits in `token_budget` tokens (None: no
+        limit): MMR order over the stored vectors of the hits (no
+        re-embedding), prose chunks compressed to their query-relevant
+        sentences when `compress_max_tokens` is set, overlapping spans
+        between chunks removed, chunks that don't fit skipped.
+        """
+        if not result.hits or (token_budget is not None and token_budget <= 0):
+            return ""
 
-            # Try to show something human-friendly in the prefix
-            source = (
-                meta.get("source")
-                or meta.get("file_path")
-                or meta.get("type")
-                or "unknown"
-            )
+        with self.legs.time("context"):
+            stores = {s.collection_name: s for s in (self.store, self.code_store) if s is not None}
+            vectors: Dict[Tuple[str, str], Any] = {}
+            try:
+                for name, store in stores.items():
+                    doc_ids = [h["doc_id"] for h in result.hits if h.get("collection") == name]
+                    if doc_ids:
+                        vectors.update(((name, d), v) for d, v in store.get_vectors(doc_ids).items())
+                query_vec = self.store.embed_query(result.query)  # LRU hit: embedded by the search
+            except Exception as e:
+                logger.warning("RAG: vectors unavailable for MMR (%s); packing in retrieval order", e)
+                vectors, query_vec = {}, None
 
-            context_chunks.append(f"[SOURCE {source} | DOC {doc_id}]\n{text}")
+            hits = result.hits
+            if self.compress_max_tokens > 0 and query_vec is not None:
+                with self.legs.time("compress"):
+                    hits, cstats = compress_hits(
+                        hits,
+                        query_vec,
+                        self.store.embed_texts,  # sentences stay out of the persistent cache
+                        self.compress_max_tokens,
+                        self.compress_types,
+                    )
+                logger.debug(
+                    "RAG: compressed %d chunk(s) from %d to %d token(s)",
+                    cstats["compressed"],
+                    cstats["tokens_before"],
+                    cstats["tokens_after"],
+                )
+
+            context, stats = pack_context(
+                hits,
+                token_budget,
+                query_vec=query_vec,
+                doc_vecs=[vectors.get((h.get("collection"), h["doc_id"])) for h in result.hits],
+                lambda_mult=self.mmr_lambda,
+            )
 
-        context = "\n\n---\n\n".join(context_chunks)
         logger.debug(
-            "RAG: built context with %d chunks (%d chars) for query %r",
-            len(context_chunks),
-            len(context),
-            query,
+            "RAG: packed %d/%d chunk(s), %d token(s) of %s budget for query %r",
+            stats["chunks"],
+            len(result.hits),
+            stats["tokens"],
+            token_budget,
+            result.query,
         )
         return context
 
-    def search(self, query: str, top_k: int = 5):
+    def retrieve_context(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        token_budget: Optional[int] = None,
+    ) -> str:
+        """
+        Context string for `query` (see `retrieve`); with `token_budget` or
+        compression enabled, assembled by `pack_context`.
+        """
+        return self.build_context(self.retrieve(query, top_k=top_k, filters=filters), token_budget)
+
+    def search(self, query: str, top_k: int = 5, filters: Optional[Dict[str, Any]] = None):
         """Return list of dict-like search hits for the UI layer.
 
         Delegates to LongTermMemory.search which returns tuples (doc_id, text, meta).
-        This method converts them into a more descriptive dict so `get_rag_hits`
-        can normalize easily.
+        This method converts them into the dicts `/rag/search` returns
+        (same shape as `RetrievalResult.hits`).
         """
-        logger.debug("RAGIndex.search called for query=%r top_k=%d", query, top_k)
-        results = self.store.search(query, top_k=top_k)
+        logger.debug("RAGIndex.search called for query=%r top_k=%d filters=%s", query, top_k, filters)
+        results = self._search_store(self.store, query, top_k, filters)
         out = []
         for doc_id, text, meta in results:
             out.append({
@@ -94,4 +401,9 @@ class RAGIndex:
     def delete(self, doc_id: str) -> bool:
         """Delete a document from the store by id."""
         logger.debug("RAG delete requested for doc_id=%s", doc_id)
-        return self.store.delete_document(doc_id)
\ No newline at end of file
+        return self.store.delete_document(doc_id)
+
+    def delete_by_filter(self, filters: Optional[Dict[str, Any]] = None, doc_id_prefix: Optional[str] = None) -> int:
+        """Delete every document matching `filters` / `doc_id_prefix`; returns the count."""
+        logger.debug("RAG filtered delete requested: filters=%s doc_id_prefix=%s", filters, doc_id_prefix)
+        return self.store.delete_by_filter(filters, doc_id_prefix=doc_id_prefix)
\ No newline at end of file
@@ -0,0 +1,250 @@
+# rag/jobs.py
+import json
+import os
+import pathlib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from ..utils.logging import logger
+from ..utils.pipeline import PipelineCancelled
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_UNFINISHED = (QUEUED, RUNNING)
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by `IngestJobQueue.submit` when too many jobs are pending."""
+
+
+class IngestJob:
+    """
+    One background ingestion job (a PDF or a Swagger spec).
+
+    `progress` counts chunks per pipeline stage: parsed, embedded, upserted.
+    Handlers should pass `job.report` / `job.cancel_event` down to
+    `RAGIndex.sync_source(progress=..., stop=...)` (or the `stop` argument
+    of `ingest_many` / `CodeIndexer.index`), so cancelling actually stops
+    the work.
+    """
+
+    def __init__(self, kind: str, params: Dict[str, Any], job_id: Optional[str] = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.progress: Dict[str, int] = {"parsed": 0, "embedded": 0, "upserted": 0}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.resumed = False
+        self.cancel_event = threading.Event()
+        self.on_progress: Optional[Callable[[], None]] = None
+        self._lock = threading.Lock()
+
+    def report(self, stage: str, n: int) -> None:
+        with self._lock:
+            self.progress[stage] = self.progress.get(stage, 0) + n
+            self.updated_at = time.time()
+        if self.on_progress:
+            self.on_progress()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "params": self.params,
+                "status": self.status,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "updated_at": self.updated_at,
+                "resumed": self.resumed,
+            }
+
+
+class IngestJobQueue:
+    """
+    In-process ingestion job queue.
+
+    - `max_workers` jobs run concurrently; at most `max_pending` wait in line
+    - unfinished jobs are written to `checkpoint_path`; `resume()` re-submits
+      them after a restart. Because ingestion goes through the content-hash
+      sync, chunks upserted before the crash are skipped on the second run.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, Callable[[IngestJob], Dict[str, Any]]],
+        max_workers: int = 2,
+        max_pending: int = 100,
+        max_finished: int = 200,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_interval: float = 2.0,
+    ):
+        self.handlers = handlers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.checkpoint_path = pathlib.Path(checkpoint_path) if checkpoint_path else None
+        self.checkpoint_interval = checkpoint_interval
+
+        self._jobs: Dict[str, IngestJob] = {}
+        self._lock = threading.Lock()
+        self._last_checkpoint = 0.0
+        self._shutting_down = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest-job")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def submit(self, kind: str, params: Dict[str, Any], job_id: Optional[str] = None) -> IngestJob:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown ingest job kind: {kind}")
+        if self._shutting_down:
+            raise JobQueueFull("Ingest job queue is shutting down")
+
+        job = IngestJob(kind, params, job_id=job_id)
+        job.on_progress = self._checkpoint  # throttled while the job reports progress
+        with self._lock:
+            pending = sum(1 for j in self._jobs.values() if j.status in _UNFINISHED)
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} ingest jobs pending (max {self.max_pending})")
+            self._jobs[job.id] = job
+
+        self._checkpoint(force=True)
+        self._executor.submit(self._run, job)
+        logger.debug("Ingest job queued: id=%s kind=%s", job.id, kind)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[IngestJob]:
+        return sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Request cancellation. Queued jobs never start; running jobs stop at
+        the next pipeline step. Returns False for unknown/finished jobs.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.status not in _UNFINISHED:
+            return False
+        job.cancel_event.set()
+        if job.status == QUEUED:
+            self._finish(job, CANCELLED)
+        return True
+
+    def resume(self) -> List[IngestJob]:
+        """
+        Re-submit jobs that were queued or running when the process stopped.
+        """
+        if not self.checkpoint_path or not self.checkpoint_path.exists():
+            return []
+        try:
+            saved = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable ingest checkpoint %s: %s", self.checkpoint_path, e)
+            return []
+
+        resumed: List[IngestJob] = []
+        for entry in saved.get("jobs", []):
+            if entry.get("status") not in _UNFINISHED or entry.get("kind") not in self.handlers:
+                continue
+            if entry.get("job_id") in self._jobs:
+                continue
+            job = self.submit(entry["kind"], entry.get("params") or {}, job_id=entry.get("job_id"))
+            job.resumed = True
+            resumed.append(job)
+
+        if resumed:
+            logger.info("Resumed %d ingest job(s) from %s", len(resumed), self.checkpoint_path)
+        return resumed
+
+    def shutdown(self) -> None:
+        """
+        Stop accepting work and interrupt running jobs. Unfinished jobs stay
+        in the checkpoint and are picked up again by `resume()` on the next start.
+        """
+        self._shutting_down = True
+        self._checkpoint(force=True)
+        for job in list(self._jobs.values()):
+            if job.status in _UNFINISHED:
+                job.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _run(self, job: IngestJob) -> None:
+        if job.cancel_event.is_set() or self._shutting_down:
+            return
+
+        with job._lock:
+            job.status = RUNNING
+            job.updated_at = time.time()
+        self._checkpoint(force=True)
+
+        try:
+            result = self.handlers[job.kind](job)
+        except PipelineCancelled:
+            if self._shutting_down:
+                # Interrupted by shutdown, not by the user: keep it resumable
+                logger.info("Ingest job %s interrupted by shutdown; left in checkpoint", job.id)
+                return
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            logger.exception("Ingest job %s failed", job.id)
+            self._finish(job, FAILED, error=f"{type(e).__name__}: {e}")
+        else:
+            self._finish(job, COMPLETED, result=result)
+
+    def _finish(self, job: IngestJob, status: str, result=None, error: Optional[str] = None) -> None:
+        with job._lock:
+            job.status = status
+            job.result = result
+            job.error = error
+            job.updated_at = time.time()
+        self._prune_finished()
+        self._checkpoint(force=True)
+        logger.debug("Ingest job finished: id=%s status=%s", job.id, status)
+
+    def _prune_finished(self) -> None:
+        """
+        Keep only the `max_finished` most recent finished jobs in memory.
+        """
+        with self._lock:
+            finished = [j for j in self._jobs.values() if j.status not in _UNFINISHED]
+            finished.sort(key=lambda j: j.updated_at)
+            for job in finished[:-self.max_finished or None]:
+                del self._jobs[job.id]
+
+    def _checkpoint(self, force: bool = False) -> None:
+        """
+        Persist unfinished jobs (atomic write). Progress-driven writes are
+        throttled to one per `checkpoint_interval` seconds.
+        """
+        if not self.checkpoint_path:
+            return
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_checkpoint < self.checkpoint_interval:
+                return
+            self._last_checkpoint = now
+            jobs = [j.to_dict() for j in self._jobs.values() if j.status in _UNFINISHED]
+
+            self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.checkpoint_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({"jobs": jobs}, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, self.checkpoint_path)
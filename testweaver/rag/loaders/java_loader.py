@@ -0,0 +1,247 @@
+# rag/loaders/java_loader.py
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..chunking import split_lines_by_tokens
+
+_TYPE_DECL = re.compile(r"\b(class|interface|enum|record)\s+([A-Za-z_]\w*)")
+_PACKAGE = re.compile(r"^\s*package\s+([\w.]+)\s*;", re.MULTILINE)
+_METHOD_NAME = re.compile(r"([A-Za-z_]\w*)\s*\($")
+_ANNOTATION = re.compile(r"@[A-Za-z_][\w.]*(\s*\([^()]*\))?")
+_CONTROL_KEYWORDS = {"if", "for", "while", "switch", "catch", "synchronized", "try", "else", "do", "return", "new"}
+
+# Leading lines of a method chunk, repeated when a long method is split
+_METHOD_HEADER_LINES = 5
+
+
+def git_blob_sha(content: str) -> str:
+    """
+    SHA-1 git would assign to this file content (`git hash-object`).
+    """
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _mask_java(src: str) -> str:
+    """
+    Replace comments, string/char literals and text blocks with spaces
+    (same length), so braces and keywords can be matched positionally.
+    """
+    out = list(src)
+    i, n = 0, len(src)
+    while i < n:
+        c = src[i]
+        nxt = src[i + 1] if i + 1 < n else ""
+        if c == "/" and nxt == "/":
+            end = src.find("\n", i)
+            end = n if end == -1 else end
+        elif c == "/" and nxt == "*":
+            end = src.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+        elif src.startswith('"""', i):
+            end = src.find('"""', i + 3)
+            end = n if end == -1 else end + 3
+        elif c in ('"', "'"):
+            end = i + 1
+            while end < n and src[end] != c and src[end] != "\n":
+                end += 2 if src[end] == "\\" else 1
+            end = min(n, end + 1)
+        else:
+            i += 1
+            continue
+        for k in range(i, end):
+            if out[k] != "\n":
+                out[k] = " "
+        i = end
+    return "".join(out)
+
+
+def _match_brace(masked: str, open_idx: int) -> int:
+    depth = 0
+    for i in range(open_idx, len(masked)):
+        if masked[i] == "{":
+            depth += 1
+        elif masked[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(masked) - 1
+
+
+def _members(masked: str, start: int, end: int) -> List[Tuple[str, int, int, int]]:
+    """
+    Top-level members of a type body (masked[start:end] excludes the braces).
+
+    Returns (kind, member_start, body_open, member_end) where kind is
+    "block" (method/ctor/nested type/initializer) or "field".
+    """
+    members = []
+    member_start = start
+    i = start
+    while i < end:
+        c = masked[i]
+        if c == "{":
+            close = _match_brace(masked, i)
+            members.append(("block", member_start, i, close + 1))
+            i = close + 1
+            member_start = i
+            continue
+        if c == ";":
+            members.append(("field", member_start, -1, i + 1))
+            member_start = i + 1
+        i += 1
+    return members
+
+
+def _first_line(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _parse_types(src: str, masked: str, start: int, end: int, outer: str = "") -> List[Dict[str, Any]]:
+    """
+    Find type declarations in masked[start:end] and collect their fields,
+    methods and nested types.
+    """
+    types: List[Dict[str, Any]] = []
+    for kind, m_start, body_open, m_end in _members(masked, start, end):
+        if kind != "block":
+            continue
+        header = masked[m_start:body_open]
+        decl = _TYPE_DECL.search(header)
+        if not decl:
+            continue
+
+        name = f"{outer}.{decl.group(2)}" if outer else decl.group(2)
+        body_close = m_end - 1
+        info = {
+            "kind": decl.group(1),
+            "name": name,
+            "declaration": _first_line(src[m_start + decl.start():body_open]),
+            "fields": [],
+            "methods": [],
+        }
+
+        nested: List[Dict[str, Any]] = []
+        for mkind, s, b_open, e in _members(masked, body_open + 1, body_close):
+            # skip leading whitespace/comments (masked), so javadoc and trailing
+            # comments of the previous member stay out of signatures
+            decl_start = s + (len(masked[s:e]) - len(masked[s:e].lstrip()))
+            member_header = _ANNOTATION.sub(" ", masked[s:b_open] if mkind == "block" else masked[s:e])
+            if mkind == "block" and _TYPE_DECL.search(member_header):
+                nested.extend(_parse_types(src, masked, s, e, outer=name))
+                continue
+
+            paren = member_header.find("(")
+            is_method = paren != -1 and "=" not in member_header[:paren]
+            m = _METHOD_NAME.search(member_header[:paren + 1].rstrip()) if is_method else None
+            if m and m.group(1) in _CONTROL_KEYWORDS:
+                m = None
+
+            if mkind == "field":
+                line = _first_line(src[decl_start:e])
+                if m:
+                    # abstract / interface method: signature only
+                    info["methods"].append({"name": m.group(1), "signature": line.rstrip(";"), "source": None})
+                elif line and line != ";":
+                    info["fields"].append(line)
+            elif m:
+                info["methods"].append({
+                    "name": m.group(1),
+                    "signature": _first_line(src[decl_start:b_open]),
+                    "source": src[s:e].strip("\n"),
+                })
+            # other blocks: initializers, lambda/array field initializers
+
+        types.append(info)
+        types.extend(nested)
+    return types
+
+
+def java_to_rag_chunks(
+    source: str,
+    file_path: str,
+    *,
+    repo: str = "",
+    blob_sha: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Chunk one Java file for code retrieval:
+    - one "code_class" chunk per type: declaration, fields and method signatures
+      (enough for DTOs, entities and repository interfaces)
+    - one "code_method" chunk per method/constructor body
+    Returns: [{"text": str, "meta": dict}, ...]
+    """
+    masked = _mask_java(source)
+    pkg_match = _PACKAGE.search(masked)
+    package = source[pkg_match.start(1):pkg_match.end(1)] if pkg_match else ""
+    blob_sha = blob_sha or git_blob_sha(source)
+
+    base_meta = {
+        "language": "java",
+        "repo": repo,
+        "file_path": file_path,
+        "package": package,
+        "blob_sha": blob_sha,
+    }
+
+    chunks: List[Dict[str, Any]] = []
+    for t in _parse_types(source, masked, 0, len(masked)):
+        qualified = f"{package}.{t['name']}" if package else t["name"]
+        text_lines = [
+            "Java Type",
+            f"path: {file_path}",
+            f"class: {qualified} ({t['kind']})",
+            f"declaration: {t['declaration']}",
+        ]
+        if t["fields"]:
+            text_lines.append("fields:")
+            text_lines.extend(f"- {f}" for f in t["fields"])
+        if t["methods"]:
+            text_lines.append("methods:")
+            text_lines.extend(f"- {m['signature']}" for m in t["methods"])
+        text = "\n".join(text_lines)
+        for part_idx, part in enumerate(split_lines_by_tokens(text, max_tokens, header_lines=4) if max_tokens else [text]):
+            meta = {**base_meta, "type": "code_class", "class_name": qualified, "kind": t["kind"]}
+            if part_idx:
+                meta["part"] = part_idx
+            chunks.append({"text": part, "meta": meta})
+
+        seen: Dict[str, int] = {}
+        for m in t["methods"]:
+            if m["source"] is None:
+                continue
+            # overloads get a numeric suffix so doc_ids stay unique
+            occurrence = seen.get(m["name"], 0)
+            seen[m["name"]] = occurrence + 1
+            method_key = m["name"] if occurrence == 0 else f"{m['name']}#{occurrence}"
+
+            text = "\n".join([
+                "Java Method",
+                f"path: {file_path}",
+                f"class: {qualified}",
+                f"method: {m['name']}",
+                f"signature: {m['signature']}",
+                m["source"],
+            ])
+            parts = split_lines_by_tokens(text, max_tokens, header_lines=_METHOD_HEADER_LINES) if max_tokens else [text]
+            for part_idx, part in enumerate(parts):
+                meta = {**base_meta, "type": "code_method", "class_name": qualified, "method": method_key}
+                if part_idx:
+                    meta["part"] = part_idx
+                chunks.append({"text": part, "meta": meta})
+
+    return chunks
+
+
+def java_doc_id(meta: Dict[str, Any]) -> str:
+    """
+    Logical doc_id of a chunk produced by `java_to_rag_chunks`.
+    """
+    doc_id = f"code::{meta['repo']}::{meta['file_path']}::{meta['class_name']}"
+    if meta["type"] == "code_method":
+        doc_id += f"::{meta['method']}"
+    if "part" in meta:
+        doc_id += f"::part::{meta['part']}"
+    return doc_id
@@ -1,7 +1,19 @@
 # rag/loaders/pdf_loader.py
-from typing import List
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Iterable, Iterator, Optional, Tuple
 from pypdf import PdfReader  # pip install pypdf
 
+from ..chunking import chunk_by_tokens
+
+# Below this many pages per worker, process start-up costs more than it saves
+_MIN_PAGES_PER_WORKER = 8
+
 
 def load_pdf_as_text(pdf_path: str) -> str:
     """
@@ -44,43 +56,114 @@ def _normalize_whitespace(text: str) -> str:
     return "\n".join(merged_lines)
 
 
-def load_pdf_as_chunks(
-    pdf_path: str,
-    max_chars: int = 1200,
-    overlap_chars: int = 200,
-) -> List[str]:
+def _file_sha256(path: str, block_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _extract_page_range(task: Tuple[str, int, int]) -> List[str]:
     """
-    Load a PDF and return a list of text chunks suitable for RAG.
+    Worker entrypoint (must be top-level to be picklable):
+    extract pages [start, end) of one PDF.
+    """
+    pdf_path, start, end = task
+    reader = PdfReader(pdf_path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
 
-    Strategy:
-    - Extract text from all pages
-    - Normalize whitespace
-    - Split into paragraphs on blank lines
-    - Build overlapping windows of ~max_chars characters
+
+def _extract_pages(pdf_path: str, workers: int) -> Iterator[str]:
     """
+    Yield page texts in order. With workers > 1, page ranges are spread over
+    a process pool; results are still yielded in page order as they complete.
 
-    # 1. Extract full text
+    The pool uses the spawn context: forking the API process (model, Qdrant
+    client and job-worker threads) can deadlock the children.
+    """
     reader = PdfReader(pdf_path)
-    pages: List[str] = []
-    for page in reader.pages:
-        pages.append(page.extract_text() or "")
-    full_text = "\n\n".join(pages)
+    n_pages = len(reader.pages)
 
-    # 2. Normalize whitespace / paragraphs
-    normalized = _normalize_whitespace(full_text)
+    if workers <= 1 or n_pages < workers * _MIN_PAGES_PER_WORKER:
+        for page in reader.pages:
+            yield page.extract_text() or ""
+        return
 
-    # 3. Split into paragraphs
-    paragraphs = normalized.split("\n\n")
+    # Several ranges per worker so one slow range does not stall the pool
+    span = max(_MIN_PAGES_PER_WORKER, math.ceil(n_pages / (workers * 4)))
+    tasks = [(pdf_path, start, min(start + span, n_pages)) for start in range(0, n_pages, span)]
 
-    chunks: List[str] = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for texts in pool.map(_extract_page_range, tasks):
+            yield from texts
+
+
+def iter_pdf_pages(
+    pdf_path: str,
+    workers: int = 1,
+    cache_dir: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Lazily yield the extracted text of each page.
+
+    - workers > 1: extract page ranges in a process pool
+    - cache_dir: page texts are cached by file content hash, so re-chunking
+      the same PDF (e.g. with other max_chars/overlap_chars) never re-parses it
+    """
+    cache_path = None
+    if cache_dir:
+        cache_path = pathlib.Path(cache_dir) / f"{_file_sha256(pdf_path)}.json"
+        if cache_path.exists():
+            try:
+                pages = json.loads(cache_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                pages = None  # corrupt/partial cache entry -> re-parse
+            if isinstance(pages, list):
+                yield from pages
+                return
+
+    extracted: List[str] = []
+    for text in _extract_pages(pdf_path, workers):
+        if cache_path is not None:
+            extracted.append(text)
+        yield text
+
+    # Only reached when the whole document was read
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(extracted, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+
+
+def iter_pdf_paragraphs(pages: Iterable[str]) -> Iterator[str]:
+    """
+    Normalize page texts one page at a time and yield non-empty paragraphs.
+
+    Pages are always paragraph boundaries, so this yields the same paragraphs
+    as normalizing the joined full text.
+    """
+    for page_text in pages:
+        for para in _normalize_whitespace(page_text).split("\n\n"):
+            para = para.strip()
+            if para:
+                yield para
+
+
+def chunk_paragraphs(
+    paragraphs: Iterable[str],
+    max_chars: int = 1200,
+    overlap_chars: int = 200,
+) -> Iterator[str]:
+    """
+    Build overlapping windows of ~max_chars characters from a paragraph stream.
+    Chunks are emitted as soon as they are complete.
+    """
     current_chunk: List[str] = []
     current_len = 0
 
     for para in paragraphs:
-        para = para.strip()
-        if not para:
-            continue  # skip empty paragraphs
-
         para_len = len(para)
 
         # If single paragraph itself is very large, split it hard
@@ -91,7 +174,7 @@ def load_pdf_as_chunks(
                 end = min(start + max_chars, para_len)
                 sub = para[start:end]
                 if sub.strip():
-                    chunks.append(sub.strip())
+                    yield sub.strip()
                 start = end
             # do not add this para to current_chunk further
             continue
@@ -99,7 +182,7 @@ def load_pdf_as_chunks(
         # If adding this paragraph would exceed max_chars → finalize current chunk
         if current_len + para_len + 1 > max_chars and current_chunk:
             chunk_text = "\n\n".join(current_chunk)
-            chunks.append(chunk_text)
+            yield chunk_text
             # Start a new chunk with overlap from previous
             if overlap_chars > 0:
                 overlap_text = chunk_text[-overlap_chars:]
@@ -115,7 +198,64 @@ def load_pdf_as_chunks(
 
     # Last chunk
     if current_chunk:
-        chunk_text = "\n\n".join(current_chunk)
-        chunks.append(chunk_text)
+        yield "\n\n".join(current_chunk)
+
+
+def iter_pdf_chunks(
+    pdf_path: str,
+    max_chars: int = 1200,
+    overlap_chars: int = 200,
+    workers: int = 1,
+    cache_dir: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: int = 0,
+) -> Iterator[str]:
+    """
+    Streaming version of `load_pdf_as_chunks`: pages are extracted lazily and
+    chunks are yielded as soon as they are complete, so embedding can start
+    before the whole document is parsed.
+
+    With `max_tokens` set, chunks are packed by tokenizer count on sentence
+    boundaries (`overlap_tokens` of trailing sentences carried over) instead
+    of by `max_chars`/`overlap_chars`.
+    """
+    pages = iter_pdf_pages(pdf_path, workers=workers, cache_dir=cache_dir)
+    paragraphs = iter_pdf_paragraphs(pages)
+    if max_tokens:
+        for text, _ in chunk_by_tokens(paragraphs, max_tokens=max_tokens, overlap_tokens=overlap_tokens):
+            yield text
+        return
+    yield from chunk_paragraphs(paragraphs, max_chars=max_chars, overlap_chars=overlap_chars)
 
-    return chunks
+
+def load_pdf_as_chunks(
+    pdf_path: str,
+    max_chars: int = 1200,
+    overlap_chars: int = 200,
+    workers: int = 1,
+    cache_dir: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: int = 0,
+) -> List[str]:
+    """
+    Load a PDF and return a list of text chunks suitable for RAG.
+
+    Strategy:
+    - Extract text page by page
+    - Normalize whitespace
+    - Split into paragraphs on blank lines
+    - Build overlapping windows of ~max_chars characters
+
+    Use `iter_pdf_chunks` to consume chunks incrementally.
+    """
+    return list(
+        iter_pdf_chunks(
+            pdf_path,
+            max_chars=max_chars,
+            overlap_chars=overlap_chars,
+            workers=workers,
+            cache_dir=cache_dir,
+            max_tokens=max_tokens,
+            overlap_tokens=overlap_tokens,
+        )
+    )
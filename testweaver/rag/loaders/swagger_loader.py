@@ -1,34 +1,314 @@
 # rag/loaders/swagger_loader.py
+import hashlib
+import json
+import os
+import pathlib
+import threading
+from collections import OrderedDict
 import httpx
-from typing import Any, Dict, List, Optional
+import yaml
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..chunking import split_lines_by_tokens
+
+# libyaml-backed loader when available (much faster on large specs)
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def parse_openapi_document(body: str, content_type: str = "") -> Dict[str, Any]:
+    """
+    Parse a Swagger/OpenAPI document given as JSON or YAML text.
+    """
+    if "yaml" in content_type or not body.lstrip().startswith("{"):
+        doc = yaml.load(body, Loader=_YamlLoader)
+    else:
+        doc = json.loads(body)
+    if not isinstance(doc, dict):
+        raise ValueError(f"OpenAPI document must be a mapping, got {type(doc).__name__}")
+    return doc
+
 
 def fetch_swagger_json(url: str) -> Dict[str, Any]:
     resp = httpx.get(url, timeout=10)
     resp.raise_for_status()
-    return resp.json()
+    return parse_openapi_document(resp.text, resp.headers.get("content-type", ""))
+
+
+def fetch_swagger_spec(
+    url: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Optional[str]]]:
+    """
+    Conditional GET of a Swagger/OpenAPI spec (JSON or YAML).
+
+    Returns (spec, validators). `spec` is None when the server answered
+    304 Not Modified. `validators` holds the ETag / Last-Modified to send next time.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    resp = httpx.get(url, headers=headers, timeout=10)
+    if resp.status_code == 304:
+        return None, {"etag": etag, "last_modified": last_modified}
+    resp.raise_for_status()
+
+    validators = {
+        "etag": resp.headers.get("etag"),
+        "last_modified": resp.headers.get("last-modified"),
+    }
+    return parse_openapi_document(resp.text, resp.headers.get("content-type", "")), validators
+
+
+# Bump when swagger_doc_id changes: older fetch states are dropped, so the
+# next ingest re-syncs each spec (and deletes the chunks under the old ids)
+DOC_ID_LAYOUT = 2
+
+
+def swagger_doc_id(meta: Dict[str, Any]) -> str:
+    """
+    Logical doc_id of an operation/schema chunk produced by `openapi_to_rag_chunks`:
+    `swagger::<url hash>::op::<METHOD>::<path>` or `swagger::<url hash>::schema::<name>`.
+
+    The short hash of the spec URL (`meta["source"]`) keeps operations and
+    schemas shared by several specs (GET /health, Error) in separate points.
+    """
+    url_hash = hashlib.sha256(meta.get("source", "").encode("utf-8")).hexdigest()[:12]
+    if meta["type"] == "operation":
+        doc_id = f"swagger::{url_hash}::op::{meta['method']}::{meta['path']}"
+    else:
+        doc_id = f"swagger::{url_hash}::schema::{meta['schema_name']}"
+    if "part" in meta:
+        doc_id += f"::part::{meta['part']}"
+    return doc_id
+
+
+class SwaggerStateStore:
+    """
+    Per-URL fetch state kept in a small JSON file:
+    {"<url>": {"etag", "last_modified", "chunks", "doc_ids"}}
+
+    `chunks` is the number of points the last sync left in Qdrant; the
+    validators are only trusted while Qdrant still holds that many.
+    States written with another `DOC_ID_LAYOUT` ("doc_ids") read as empty.
+    """
+
+    def __init__(self, path: str):
+        self.path = pathlib.Path(path)
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Dict[str, Any]:
+        with self._lock:
+            state = self._load().get(url) or {}
+            return dict(state) if state.get("doc_ids") == DOC_ID_LAYOUT else {}
+
+    def put(self, url: str, state: Dict[str, Any]) -> None:
+        with self._lock:
+            data = self._load()
+            data[url] = {**state, "doc_ids": DOC_ID_LAYOUT}
+            self._save(data)
+
+    def delete(self, url: str) -> None:
+        with self._lock:
+            data = self._load()
+            if data.pop(url, None) is not None:
+                self._save(data)
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._load():
+                self._save({})
+
+    def _save(self, data: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def _load(self) -> Dict[str, Any]:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
 
 def _dedup(seq: List[str]) -> List[str]:
-    seen = set()
-    out = []
-    for x in seq:
-        if x not in seen:
-            out.append(x)
-            seen.add(x)
-    return out
+    return list(dict.fromkeys(seq))
 
 def _collect_refs(obj: Any) -> List[str]:
-    """Recursively collect all $ref values."""
-    refs: List[str] = []
-    if isinstance(obj, dict):
-        ref = obj.get("$ref")
-        if isinstance(ref, str):
-            refs.append(ref)
-        for v in obj.values():
-            refs.extend(_collect_refs(v))
-    elif isinstance(obj, list):
-        for it in obj:
-            refs.extend(_collect_refs(it))
-    return _dedup(refs)
+    """Collect all $ref values in one pass (document order, no duplicates)."""
+    refs: Dict[str, None] = {}
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                refs.setdefault(ref)
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return list(refs)
+
+
+_SCHEMA_REF_PREFIX = "#/components/schemas/"
+
+
+class SchemaRefGraph:
+    """
+    $ref graph over `components.schemas`, built in a single pass.
+
+    - direct refs of every schema are collected once
+    - strongly connected components (ref cycles) are found once (Tarjan)
+    - the transitive closure of each component is computed lazily and memoized,
+      so resolving an operation's refs is a few set unions
+    """
+
+    def __init__(self, openapi: Dict[str, Any]):
+        schemas = ((openapi.get("components") or {}).get("schemas")) or {}
+        if not isinstance(schemas, dict):
+            schemas = {}
+
+        self.direct: Dict[str, List[str]] = {
+            _SCHEMA_REF_PREFIX + name: _collect_refs(sdef) for name, sdef in schemas.items()
+        }
+        self._component: Dict[str, int] = {}
+        self._members: List[List[str]] = []
+        self._closure: Dict[int, frozenset] = {}
+        self._build_components()
+
+    def _build_components(self) -> None:
+        """Iterative Tarjan SCC over the schema ref graph."""
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: set = set()
+        stack: List[str] = []
+        counter = 0
+
+        for root in self.direct:
+            if root in index:
+                continue
+            work = [(root, iter(self.direct[root]))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in self.direct:
+                        continue  # external / non-schema ref: leaf
+                    if child not in index:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.direct[child])))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index[child])
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    comp_id = len(self._members)
+                    members: List[str] = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        self._component[member] = comp_id
+                        members.append(member)
+                        if member == node:
+                            break
+                    self._members.append(members)
+
+    def _successors(self, comp_id: int) -> set:
+        out = set()
+        for member in self._members[comp_id]:
+            for child in self.direct[member]:
+                child_comp = self._component.get(child)
+                if child_comp is not None and child_comp != comp_id:
+                    out.add(child_comp)
+        return out
+
+    def _component_closure(self, comp_id: int) -> frozenset:
+        """
+        All refs reachable from a component, memoized. The component graph
+        is a DAG, so an explicit post-order stack terminates without recursion.
+        """
+        stack = [comp_id]
+        while stack:
+            cid = stack[-1]
+            if cid in self._closure:
+                stack.pop()
+                continue
+            successors = self._successors(cid)
+            pending = [c for c in successors if c not in self._closure]
+            if pending:
+                stack.extend(pending)
+                continue
+
+            reach: set = set()
+            for member in self._members[cid]:
+                reach.add(member)
+                reach.update(self.direct[member])
+            for c in successors:
+                reach |= self._closure[c]
+            self._closure[cid] = frozenset(reach)
+            stack.pop()
+
+        return self._closure[comp_id]
+
+    def closure(self, ref: str) -> frozenset:
+        """Refs reachable from `ref` (including itself)."""
+        comp_id = self._component.get(ref)
+        if comp_id is None:
+            return frozenset([ref])
+        return self._component_closure(comp_id)
+
+    def resolve(self, refs: List[str]) -> List[str]:
+        """Transitive closure of `refs`, sorted for stable payloads."""
+        out: set = set()
+        for ref in refs:
+            out |= self.closure(ref)
+        return sorted(out)
+
+
+# Small per-spec cache: the same parsed spec is chunked / resolved repeatedly
+_REF_GRAPH_CACHE: "OrderedDict[int, Tuple[Dict[str, Any], SchemaRefGraph]]" = OrderedDict()
+_REF_GRAPH_CACHE_SIZE = 8
+_REF_GRAPH_LOCK = threading.Lock()
+
+
+def get_ref_graph(openapi: Dict[str, Any]) -> SchemaRefGraph:
+    """
+    Return the (cached) ref graph for a parsed spec. The cache holds the
+    spec itself, so an id() can never be reused while its entry is alive.
+    """
+    key = id(openapi)
+    with _REF_GRAPH_LOCK:
+        entry = _REF_GRAPH_CACHE.get(key)
+        if entry is not None and entry[0] is openapi:
+            _REF_GRAPH_CACHE.move_to_end(key)
+            return entry[1]
+
+    graph = SchemaRefGraph(openapi)
+    with _REF_GRAPH_LOCK:
+        _REF_GRAPH_CACHE[key] = (openapi, graph)
+        while len(_REF_GRAPH_CACHE) > _REF_GRAPH_CACHE_SIZE:
+            _REF_GRAPH_CACHE.popitem(last=False)
+    return graph
 
 def _short_schema_signature(schema: Dict[str, Any]) -> str:
     """
@@ -76,20 +356,47 @@ def _short_schema_signature(schema: Dict[str, Any]) -> str:
 
     return "; ".join(parts)
 
+# Leading lines that identify a chunk; repeated in every part of a split chunk
+_OPERATION_HEADER_LINES = 7   # OpenAPI Operation, service, method, path, operationId, tags, summary
+_SCHEMA_HEADER_LINES = 6      # OpenAPI Schema, service, name, ref, required, properties:
+
+
+def _append_chunk(
+    chunks: List[Dict[str, Any]],
+    text_lines: List[str],
+    header_lines: int,
+    max_tokens: Optional[int],
+    meta: Dict[str, Any],
+) -> None:
+    text = "\n".join(text_lines)
+    parts = split_lines_by_tokens(text, max_tokens, header_lines=header_lines) if max_tokens else [text]
+    if len(parts) == 1:
+        chunks.append({"text": text, "meta": meta})
+        return
+    for i, part in enumerate(parts):
+        chunks.append({"text": part, "meta": {**meta, "part": i, "parts": len(parts)}})
+
+
 def openapi_to_rag_chunks(
     openapi: Dict[str, Any],
     *,
     source_url: str = "",
     service_name: str = "svc-accounting",
-    include_schemas: bool = True
+    include_schemas: bool = True,
+    max_tokens: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
     """
     Best chunking for Swagger/OpenAPI RAG:
     - One chunk per operation (method+path)
     - One chunk per schema
+    - `resolved_schema_refs` in meta: transitive schema refs from the
+      cached `SchemaRefGraph` of this spec
+    - with `max_tokens`, oversized chunks are split into parts (header lines
+      repeated, meta gets `part`/`parts`)
     Returns: [{"text": str, "meta": dict}, ...]
     """
     chunks: List[Dict[str, Any]] = []
+    ref_graph = get_ref_graph(openapi)
 
     # -------------------------
     # A) Operation chunks
@@ -180,19 +487,17 @@ def openapi_to_rag_chunks(
             if resp_lines:
                 text_lines.extend(resp_lines)
 
-            chunks.append({
-                "text": "\n".join(text_lines),
-                "meta": {
-                    "type": "operation",
-                    "service": service_name,
-                    "source": source_url,
-                    "method": method_up,
-                    "path": path,
-                    "operationId": operation_id,
-                    "tags": tags,
-                    "request_schema_refs": req_refs,
-                    "response_schema_refs": resp_refs,
-                }
+            _append_chunk(chunks, text_lines, _OPERATION_HEADER_LINES, max_tokens, {
+                "type": "operation",
+                "service": service_name,
+                "source": source_url,
+                "method": method_up,
+                "path": path,
+                "operationId": operation_id,
+                "tags": tags,
+                "request_schema_refs": req_refs,
+                "response_schema_refs": resp_refs,
+                "resolved_schema_refs": ref_graph.resolve(req_refs + resp_refs),
             })
 
     # -------------------------
@@ -224,8 +529,8 @@ def openapi_to_rag_chunks(
                             else:
                                 prop_lines.append(f"- {pname}: {pt}{'('+pf+')' if pf else ''}".strip(": "))
 
-                refs = _collect_refs(sdef)
-                ref_path = f"#/components/schemas/{name}"
+                ref_path = f"{_SCHEMA_REF_PREFIX}{name}"
+                refs = ref_graph.direct.get(ref_path) or _collect_refs(sdef)
 
                 text_lines = [
                     "OpenAPI Schema",
@@ -237,16 +542,14 @@ def openapi_to_rag_chunks(
                     *prop_lines
                 ]
 
-                chunks.append({
-                    "text": "\n".join(text_lines),
-                    "meta": {
-                        "type": "schema",
-                        "service": service_name,
-                        "source": source_url,
-                        "schema_name": name,
-                        "ref": ref_path,
-                        "schema_refs": refs,
-                    }
+                _append_chunk(chunks, text_lines, _SCHEMA_HEADER_LINES, max_tokens, {
+                    "type": "schema",
+                    "service": service_name,
+                    "source": source_url,
+                    "schema_name": name,
+                    "ref": ref_path,
+                    "schema_refs": refs,
+                    "resolved_schema_refs": sorted(ref_graph.closure(ref_path) - {ref_path}),
                 })
 
     return chunks
@@ -0,0 +1,98 @@
+# rag/rerank.py
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.logging import logger
+from ..utils.lru import LRUCache
+
+Hit = Tuple[str, str, dict]
+
+
+class CrossEncoderReranker:
+    """
+    Re-scores retrieved candidates with a small local cross-encoder.
+
+    Scores are cached per (query, doc_id, text) so repeated queries skip the
+    model. Candidates are scored in batches of `batch_size`; when scoring
+    exceeds `budget_ms` with batches still left (checked between batches),
+    `rerank` returns None and the caller keeps the original order (batches
+    already scored stay cached, so a repeated query can still be reranked
+    in budget). A fully scored rerank is always used.
+    The model is loaded on first use or by `load()` (warm-up).
+    """
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        batch_size: int = 32,
+        budget_ms: float = 250.0,
+        cache_size: int = 10_000,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.budget_ms = budget_ms
+        self.scores = LRUCache(maxsize=cache_size)
+        self._model = None
+        self._lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self.reranked = 0
+        self.fallbacks = 0
+
+    def load(self):
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is None:
+                # Imported here: torch + sentence-transformers take seconds to import
+                from sentence_transformers import CrossEncoder
+
+                logger.info("Loading reranker: %s", self.model_name)
+                self._model = CrossEncoder(self.model_name)
+            return self._model
+
+    def rerank(self, query: str, hits: List[Hit], top_k: int) -> Optional[List[Tuple[Hit, float]]]:
+        """
+        Best `top_k` hits with their scores, or None if the budget ran out.
+        """
+        model = self.load()  # not counted against the budget
+        started = time.perf_counter()
+
+        keys = [(query, doc_id, hash(text)) for doc_id, text, _ in hits]
+        scores: List[Optional[float]] = [self.scores.get(key) for key in keys]
+        misses = [i for i, score in enumerate(scores) if score is None]
+
+        for start in range(0, len(misses), self.batch_size):
+            batch = misses[start:start + self.batch_size]
+            t0 = time.perf_counter()
+            predicted = model.predict([(query, hits[i][1]) for i in batch], show_progress_bar=False)
+            cost = (time.perf_counter() - t0) / len(batch)
+            for i, score in zip(batch, predicted):
+                scores[i] = float(score)
+                self.scores.put(keys[i], scores[i], cost)
+
+            # Checked before starting another batch: once every candidate is
+            # scored, using the scores costs nothing more
+            remaining = start + self.batch_size < len(misses)
+            if remaining and (time.perf_counter() - started) * 1000 > self.budget_ms:
+                logger.debug("Rerank over budget (%.0f ms) for query %r; keeping retrieval order", self.budget_ms, query)
+                with self._stats_lock:
+                    self.fallbacks += 1
+                return None
+
+        with self._stats_lock:
+            self.reranked += 1
+        ranked = sorted(zip(hits, scores), key=lambda pair: -pair[1])
+        return ranked[:top_k]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            out = {
+                "model": self.model_name,
+                "budget_ms": self.budget_ms,
+                "reranked": self.reranked,
+                "fallbacks": self.fallbacks,
+            }
+        out["score_cache"] = self.scores.stats()
+        return out
@@ -0,0 +1,21 @@
+import sys
+
+from testweaver.memory.long_term import LongTermMemory
+from testweaver.memory.storage_profiles import STORAGE_PROFILES
+from testweaver.utils import config as settings
+
+PROFILE = sys.argv[1] if len(sys.argv) > 1 else settings.QDRANT_STORAGE_PROFILE
+COLLECTIONS = sys.argv[2:] or ["testweaver_memory", settings.CODE_COLLECTION]
+
+
+if __name__ == "__main__":
+    if PROFILE not in STORAGE_PROFILES:
+        sys.exit(f"Unknown profile {PROFILE!r}; expected one of {sorted(STORAGE_PROFILES)}")
+
+    memory = LongTermMemory(storage_profile=PROFILE)
+    for name in COLLECTIONS:
+        store = memory.sibling(name)
+        print(f"{name}: {store.apply_storage_profile()}")
+    print("Qdrant re-optimizes the segments in the background; watch the collection status until it is green.")
+
+# poetry run python -m testweaver.scripts.apply_storage_profile int8-disk [collection ...]
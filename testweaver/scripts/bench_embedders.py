@@ -0,0 +1,70 @@
+import sys
+import time
+
+import numpy as np
+
+from testweaver.memory.embedders import EMBEDDER_BACKENDS, create_embedder
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+CORPUS_FILE = sys.argv[1] if len(sys.argv) > 1 else None  # one passage per line
+TOP_K = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+N_QUERIES = 200
+
+
+def load_corpus() -> list:
+    if CORPUS_FILE:
+        with open(CORPUS_FILE, encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    # Synthetic passages shaped like our spec chunks
+    return [
+        f"The {svc} service rejects a {op} of {n} units when the account {cond}; "
+        f"the API returns {code} and no {entity} is written."
+        for n, (svc, op, cond, code, entity) in enumerate(
+            (s, o, c, k, e)
+            for s in ("transaction", "payment", "ledger", "account", "transfer")
+            for o in ("debit", "credit", "refund", "reversal")
+            for c in ("is frozen", "has insufficient balance", "is closed", "exceeds the daily limit")
+            for k in ("400", "409", "422")
+            for e in ("journal entry", "audit record", "balance snapshot")
+        )
+    ]
+
+
+def encode(embedder, texts: list) -> tuple:
+    embedder.encode(texts[:16], batch_size=64)  # warm up
+    t0 = time.perf_counter()
+    vecs = np.asarray(embedder.encode(texts, batch_size=64), dtype=np.float32)
+    elapsed = time.perf_counter() - t0
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True), elapsed
+
+
+def top_k(queries: np.ndarray, docs: np.ndarray) -> np.ndarray:
+    return np.argsort(-(queries @ docs.T), axis=1)[:, :TOP_K]
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    # Queries: the first half of a sample of passages
+    queries = [" ".join(p.split()[: max(3, len(p.split()) // 2)]) for p in corpus[:: max(1, len(corpus) // N_QUERIES)]]
+    print(f"{len(corpus)} passages, {len(queries)} queries, recall@{TOP_K} vs float model")
+
+    baseline = None
+    for backend in EMBEDDER_BACKENDS:
+        embedder = create_embedder(backend, MODEL)
+        docs, elapsed = encode(embedder, corpus)
+        q, _ = encode(embedder, queries)
+        hits = top_k(q, docs)
+
+        if baseline is None:
+            baseline = (docs, hits)
+            recall, cosine = 1.0, 1.0
+        else:
+            recall = np.mean([len(set(a) & set(b)) / TOP_K for a, b in zip(hits, baseline[1])])
+            cosine = float(np.mean(np.sum(docs * baseline[0], axis=1)))
+
+        print(
+            f"{backend:<24} {len(corpus) / elapsed:9.1f} texts/s  "
+            f"recall@{TOP_K} {recall:.4f}  mean cos to float {cosine:.4f}"
+        )
+
+# poetry run python -m testweaver.scripts.bench_embedders [corpus.txt] [top_k]
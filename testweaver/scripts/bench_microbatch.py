@@ -0,0 +1,42 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sentence_transformers import SentenceTransformer
+
+from testweaver.memory.micro_batcher import MicroBatcher
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+N_QUERIES = int(sys.argv[2]) if len(sys.argv) > 2 else 512
+WAIT_MS = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+
+
+def run(label: str, embed_one, queries) -> None:
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        list(pool.map(embed_one, queries))
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<34} {len(queries) / elapsed:9.1f} queries/s  ({elapsed * 1000:8.1f} ms)")
+
+
+if __name__ == "__main__":
+    model = SentenceTransformer(MODEL)
+    # Distinct queries so no cache could help; similar length to real ones
+    queries = [f"TransactionService debit case {i} insufficient balance error" for i in range(N_QUERIES)]
+    model.encode(queries[:8], show_progress_bar=False)  # warm up
+
+    print(f"{CONCURRENCY} concurrent callers, {N_QUERIES} queries")
+    run("one encode per query", lambda q: model.encode([q], show_progress_bar=False)[0], queries)
+
+    for max_batch in (8, 32, 64):
+        batcher = MicroBatcher(
+            lambda texts: model.encode(texts, batch_size=len(texts), show_progress_bar=False),
+            max_batch=max_batch,
+            max_wait_ms=WAIT_MS,
+        )
+        run(f"micro-batched (max {max_batch}, {WAIT_MS:g} ms)", batcher.submit, queries)
+        print(f"{'':<34} {batcher.stats()}")
+        batcher.close()
+
+# poetry run python -m testweaver.scripts.bench_microbatch [concurrency] [n_queries] [wait_ms]
@@ -0,0 +1,70 @@
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+TIMEOUT = float(sys.argv[1]) if len(sys.argv) > 1 else 300.0
+IMPORT_SNIPPET = (
+    "import time; t0 = time.perf_counter(); "
+    "import testweaver.api.http_api; "
+    "print(time.perf_counter() - t0)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_import() -> float:
+    """Cold import of the API module in a fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "TESTWEAVER_LOG_LEVEL": "WARNING"},
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def wait_for(url: str, t0: float, deadline: float) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return time.perf_counter() - t0
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    return float("nan")
+
+
+if __name__ == "__main__":
+    print(f"{'import testweaver.api.http_api':<36} {time_import() * 1000:9.1f} ms")
+
+    port = free_port()
+    t0 = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "testweaver.api.http_api:app", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={**os.environ, "TESTWEAVER_LOG_LEVEL": "WARNING"},
+    )
+    try:
+        deadline = t0 + TIMEOUT
+        live = wait_for(f"http://127.0.0.1:{port}/healthz", t0, deadline)
+        print(f"{'process start -> /healthz 200':<36} {live * 1000:9.1f} ms")
+        ready = wait_for(f"http://127.0.0.1:{port}/readyz", t0, deadline)
+        print(f"{'process start -> /readyz 200':<36} {ready * 1000:9.1f} ms")
+        if not math.isnan(ready):
+            print(httpx.get(f"http://127.0.0.1:{port}/readyz").json()["warmup"])
+    finally:
+        server.terminate()
+        server.wait()
+
+# poetry run python -m testweaver.scripts.bench_startup [timeout_seconds]
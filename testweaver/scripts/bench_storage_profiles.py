@@ -0,0 +1,134 @@
+import argparse
+import shutil
+import tempfile
+import time
+from typing import Optional
+
+import httpx
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+
+from testweaver.memory.storage_profiles import STORAGE_PROFILES
+
+# Embedded (local) Qdrant keeps vectors in numpy and searches brute force:
+# HNSW, quantization and on-disk settings are accepted but have no effect
+# there. Pass --url to measure the profiles on a real Qdrant server.
+
+
+def synthetic_corpus(n: int, dim: int, clusters: int = 1000, seed: int = 7) -> np.ndarray:
+    """
+    Clustered unit vectors (topics + noise), closer to real chunk embeddings
+    than uniform noise.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vecs = centers[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def server_resident_mb(url: Optional[str]) -> Optional[float]:
+    """
+    Resident memory of the Qdrant server process (`memory_resident_bytes`
+    on /metrics), or None in embedded mode / when unavailable.
+    """
+    if not url:
+        return None
+    try:
+        resp = httpx.get(f"{url.rstrip('/')}/metrics", timeout=10)
+        resp.raise_for_status()
+    except httpx.HTTPError:
+        return None
+    for line in resp.text.splitlines():
+        if line.startswith("memory_resident_bytes"):
+            return float(line.split()[-1]) / 2**20
+    return None
+
+
+def fmt_mb(value: Optional[float], width: int) -> str:
+    return f"{value:{width}.0f}" if value is not None else f"{'-':>{width}}"
+
+
+def load(client: QdrantClient, name: str, profile, vecs: np.ndarray, batch: int) -> float:
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(collection_name=name, **profile.collection_kwargs(vecs.shape[1]))
+    t0 = time.perf_counter()
+    for start in range(0, len(vecs), batch):
+        part = vecs[start:start + batch]
+        client.upsert(
+            collection_name=name,
+            points=qmodels.Batch(ids=list(range(start, start + len(part))), vectors=part.tolist()),
+            wait=False,
+        )
+    # Wait for indexing/quantization to finish before timing queries
+    while client.get_collection(name).status != qmodels.CollectionStatus.GREEN:
+        time.sleep(1)
+    return time.perf_counter() - t0
+
+
+def ids(client: QdrantClient, name: str, query: np.ndarray, k: int, params) -> list:
+    resp = client.query_points(collection_name=name, query=query.tolist(), limit=k, search_params=params)
+    return [p.id for p in resp.points]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory / latency / recall@k per storage profile")
+    parser.add_argument("--n", type=int, default=1_000_000, help="synthetic chunks")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--hnsw-ef", type=int, default=None)
+    parser.add_argument("--batch", type=int, default=2048)
+    parser.add_argument("--url", default=None, help="Qdrant server URL (default: embedded mode)")
+    parser.add_argument("--profiles", default=",".join(STORAGE_PROFILES))
+    args = parser.parse_args()
+
+    vecs = synthetic_corpus(args.n, args.dim)
+    queries = synthetic_corpus(args.queries, args.dim, seed=11)
+
+    tmpdir = None
+    if args.url:
+        client = QdrantClient(url=args.url, timeout=600)
+    else:
+        tmpdir = tempfile.mkdtemp(prefix="tw-bench-qdrant-")
+        client = QdrantClient(path=tmpdir)
+        print("embedded mode: HNSW/quantization/on-disk settings are not applied (use --url for server numbers)")
+
+    print(f"{args.n} x {args.dim} vectors, {args.queries} queries, recall@{args.k} vs exact search")
+    # Server memory comes from Qdrant's /metrics (whole process, so the
+    # delta across one profile's load is the useful number); the client's own
+    # RSS would only measure this script and the numpy corpus
+    print(f"{'profile':<10} {'est. RAM MB':>11} {'server MB':>10} {'+load MB':>9} {'load s':>8} {'p50 ms':>8} {'p95 ms':>8} {'recall':>7}")
+    try:
+        for name in args.profiles.split(","):
+            profile = STORAGE_PROFILES[name]
+            collection = f"bench_{name.replace('-', '_')}"
+            before_mb = server_resident_mb(args.url)
+            load_s = load(client, collection, profile, vecs, args.batch)
+            after_mb = server_resident_mb(args.url)
+            delta_mb = after_mb - before_mb if after_mb is not None and before_mb is not None else None
+
+            params = profile.search_params(hnsw_ef=args.hnsw_ef)
+            exact = profile.search_params(exact=True)
+            latencies, recalls = [], []
+            for q in queries:
+                t0 = time.perf_counter()
+                got = ids(client, collection, q, args.k, params)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                truth = ids(client, collection, q, args.k, exact)
+                recalls.append(len(set(got) & set(truth)) / args.k)
+
+            print(
+                f"{name:<10} {profile.estimate_ram_bytes(args.n, args.dim) / 2**20:11.0f} "
+                f"{fmt_mb(after_mb, 10)} {fmt_mb(delta_mb, 9)} "
+                f"{load_s:8.1f} {np.percentile(latencies, 50):8.2f} {np.percentile(latencies, 95):8.2f} "
+                f"{np.mean(recalls):7.4f}"
+            )
+            client.delete_collection(collection)
+    finally:
+        if tmpdir:
+            client.close()
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+# poetry run python -m testweaver.scripts.bench_storage_profiles --n 1000000 [--url http://localhost:6333]
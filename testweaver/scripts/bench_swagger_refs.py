@@ -0,0 +1,88 @@
+import random
+import sys
+import time
+
+from testweaver.rag.loaders.swagger_loader import SchemaRefGraph, openapi_to_rag_chunks
+
+N_SCHEMAS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+N_PATHS = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+PREFIX = "#/components/schemas/"
+
+
+def synthetic_spec(n_schemas: int, n_paths: int, seed: int = 7) -> dict:
+    """
+    Deeply nested components: every schema references a few "deeper" ones,
+    with occasional back-references to create ref cycles.
+    """
+    rnd = random.Random(seed)
+    schemas = {}
+    for i in range(n_schemas):
+        props = {"id": {"type": "string", "format": "uuid"}, "amount": {"type": "number"}}
+        for k in range(3):
+            j = min(n_schemas - 1, i + rnd.randint(1, 20))
+            if j != i:
+                props[f"child{k}"] = {"$ref": f"{PREFIX}S{j}"}
+        props["items"] = {"type": "array", "items": {"$ref": f"{PREFIX}S{min(n_schemas - 1, i + 1)}"}}
+        if rnd.random() < 0.02 and i > 10:
+            props["parent"] = {"$ref": f"{PREFIX}S{i - rnd.randint(1, 10)}"}
+        schemas[f"S{i}"] = {"type": "object", "required": ["id"], "properties": props}
+
+    paths = {}
+    for p in range(n_paths):
+        req = f"{PREFIX}S{rnd.randrange(n_schemas)}"
+        resp = f"{PREFIX}S{rnd.randrange(n_schemas)}"
+        paths[f"/resource{p}/{{id}}"] = {
+            "post": {
+                "operationId": f"op{p}",
+                "requestBody": {"content": {"application/json": {"schema": {"$ref": req}}}},
+                "responses": {"200": {"content": {"application/json": {"schema": {"$ref": resp}}}}},
+            }
+        }
+    return {"openapi": "3.0.0", "paths": paths, "components": {"schemas": schemas}}
+
+
+def naive_closure(spec: dict, refs: list) -> set:
+    """Baseline: per-operation DFS without memoization."""
+    schemas = spec["components"]["schemas"]
+    seen, stack = set(), list(refs)
+    while stack:
+        ref = stack.pop()
+        if ref in seen:
+            continue
+        seen.add(ref)
+        sdef = schemas.get(ref[len(PREFIX):]) if ref.startswith(PREFIX) else None
+        if sdef:
+            for pdef in sdef.get("properties", {}).values():
+                for r in (pdef.get("$ref"), (pdef.get("items") or {}).get("$ref")):
+                    if r:
+                        stack.append(r)
+    return seen
+
+
+def timed(label: str, fn):
+    t0 = time.perf_counter()
+    out = fn()
+    print(f"{label:<42} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+    return out
+
+
+if __name__ == "__main__":
+    spec = synthetic_spec(N_SCHEMAS, N_PATHS)
+    print(f"Synthetic spec: {N_SCHEMAS} schemas, {N_PATHS} operations")
+
+    graph = timed("build SchemaRefGraph", lambda: SchemaRefGraph(spec))
+    op_refs = [
+        [op["requestBody"]["content"]["application/json"]["schema"]["$ref"],
+         op["responses"]["200"]["content"]["application/json"]["schema"]["$ref"]]
+        for methods in spec["paths"].values() for op in methods.values()
+    ]
+    resolved = timed("resolve all operations (memoized)", lambda: [graph.resolve(r) for r in op_refs])
+    naive = timed("resolve all operations (naive DFS)", lambda: [naive_closure(spec, r) for r in op_refs])
+    assert [set(r) for r in resolved] == naive, "memoized closure differs from naive DFS"
+
+    chunks = timed("openapi_to_rag_chunks (full spec)", lambda: openapi_to_rag_chunks(spec))
+    timed("openapi_to_rag_chunks (cached ref graph)", lambda: openapi_to_rag_chunks(spec))
+    avg = sum(len(r) for r in resolved) / max(1, len(resolved))
+    print(f"chunks={len(chunks)} avg resolved refs/operation={avg:.1f}")
+
+# poetry run python -m testweaver.scripts.bench_swagger_refs [n_schemas] [n_paths]
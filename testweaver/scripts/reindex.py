@@ -0,0 +1,59 @@
+import argparse
+import os
+import sys
+
+from testweaver.memory.long_term import LongTermMemory
+from testweaver.utils import config as settings
+
+
+def _progress(name: str):
+    counts = {"embedded": 0, "upserted": 0}
+
+    def report(stage: str, n: int) -> None:
+        counts[stage] = counts.get(stage, 0) + n
+        sys.stdout.write(f"\r{name}: embedded {counts['embedded']}  upserted {counts['upserted']}")
+        sys.stdout.flush()
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild collections into new versions and swap their aliases")
+    parser.add_argument("collections", nargs="*", default=["testweaver_memory", settings.CODE_COLLECTION])
+    parser.add_argument("--model", default=settings.EMBED_MODEL)
+    parser.add_argument("--backend", default=settings.EMBED_BACKEND)
+    parser.add_argument("--profile", default=settings.QDRANT_STORAGE_PROFILE)
+    parser.add_argument("--batch-size", type=int, default=None, help="points per scroll page (default: upsert batch)")
+    parser.add_argument("--keep", type=int, default=1, help="old versions kept for rollback")
+    parser.add_argument("--no-swap", action="store_true", help="build only; run again without it to swap")
+    parser.add_argument("--checkpoint-dir", default=os.path.join(settings.DOC_STORE_PATH, "reindex"))
+    args = parser.parse_args()
+
+    memory = LongTermMemory(
+        embedding_model_name=args.model,
+        embedding_backend=args.backend,
+        storage_profile=args.profile,
+        hybrid=settings.HYBRID_SEARCH,
+        embed_batch_size=settings.EMBED_BATCH_SIZE,
+        upsert_batch_size=settings.UPSERT_BATCH_SIZE,
+        pipeline_depth=settings.INGEST_PIPELINE_DEPTH,
+        embedding_cache_dir=settings.EMBED_CACHE_DIR,
+        embedding_cache_size=settings.EMBED_CACHE_MAX_ENTRIES,
+        bulk_workers=settings.EMBED_BULK_WORKERS,
+        bulk_min_texts=settings.EMBED_BULK_MIN_TEXTS,
+        bulk_chunk_size=settings.EMBED_BULK_CHUNK_SIZE,
+    )
+    try:
+        for name in args.collections:
+            result = memory.sibling(name).reindex(
+                checkpoint_path=os.path.join(args.checkpoint_dir, f"{name}.json"),
+                batch_size=args.batch_size,
+                progress=_progress(name),
+                swap=not args.no_swap,
+                keep=args.keep,
+            )
+            print(f"\n{name}: {result}")
+    finally:
+        memory.close()
+
+# poetry run python -m testweaver.scripts.reindex [--model NAME] [--no-swap] [collection ...]
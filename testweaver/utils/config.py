@@ -1,3 +1,119 @@
 import os
 
-DOC_STORE_PATH = os.getenv("DOC_STORE_PATH", "./doc_store")
\ No newline at end of file
+DOC_STORE_PATH = os.getenv("DOC_STORE_PATH", "./doc_store")
+
+# Bulk ingestion: texts per SentenceTransformer forward pass / points per Qdrant upsert
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "256"))
+
+# Streaming ingestion: upload read size and max batches queued between pipeline stages
+UPLOAD_BLOCK_SIZE = int(os.getenv("UPLOAD_BLOCK_SIZE", str(1024 * 1024)))
+INGEST_PIPELINE_DEPTH = int(os.getenv("INGEST_PIPELINE_DEPTH", "4"))
+
+# PDF parsing: process-pool workers for page extraction ("auto" = all cores)
+# and the directory caching extracted page text by file content hash
+_pdf_workers = os.getenv("PDF_EXTRACT_WORKERS", "1")
+PDF_EXTRACT_WORKERS = (os.cpu_count() or 1) if _pdf_workers == "auto" else int(_pdf_workers)
+PDF_TEXT_CACHE_DIR = os.getenv("PDF_TEXT_CACHE_DIR", os.path.join(DOC_STORE_PATH, ".text_cache"))
+
+# Background ingestion jobs: concurrent jobs, queue bound, and the checkpoint
+# file used to resume unfinished jobs after a restart
+INGEST_JOB_WORKERS = int(os.getenv("INGEST_JOB_WORKERS", "2"))
+INGEST_JOB_MAX_PENDING = int(os.getenv("INGEST_JOB_MAX_PENDING", "100"))
+INGEST_JOB_CHECKPOINT = os.getenv("INGEST_JOB_CHECKPOINT", os.path.join(DOC_STORE_PATH, "ingest_jobs.json"))
+
+# Swagger polling: ETag/Last-Modified and chunk count of the last sync per URL
+SWAGGER_STATE_PATH = os.getenv("SWAGGER_STATE_PATH", os.path.join(DOC_STORE_PATH, "swagger_state.json"))
+
+# Token-aware chunking (tiktoken). CHUNK_MAX_TOKENS=0 falls back to the
+# character-based PDF chunker (1200 chars / 200 overlap)
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "300"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
+
+# Java code index: separate Qdrant collection, files per git-mcp batch fetch,
+# concurrent /file requests when the server has no batch endpoint, and how
+# many code chunks are added to the agent's RAG context
+CODE_COLLECTION = os.getenv("CODE_COLLECTION", "testweaver_code")
+CODE_FETCH_BATCH_SIZE = int(os.getenv("CODE_FETCH_BATCH_SIZE", "32"))
+CODE_FETCH_WORKERS = int(os.getenv("CODE_FETCH_WORKERS", "8"))
+CODE_TOP_K = int(os.getenv("CODE_TOP_K", "3"))
+
+# Embedding backend: "sentence-transformers" (float32) or "int8" (dynamically
+# quantized Linear layers, CPU). Compare with scripts/bench_embedders.py
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "sentence-transformers")
+
+# Embedding model. Existing collections must be rebuilt after changing it
+# (scripts/reindex.py builds a new version and swaps the collection alias)
+EMBED_MODEL = os.getenv("EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+# Persistent embedding cache (mmap'd vectors keyed by model + text hash).
+# EMBED_CACHE_MAX_ENTRIES=0 disables it
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", os.path.join(DOC_STORE_PATH, ".embed_cache"))
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "100000"))
+
+# Query micro-batching: concurrent single-text embeds wait up to
+# EMBED_MICROBATCH_WAIT_MS for company, max EMBED_MICROBATCH_MAX texts per
+# encode (<= 1 disables). The embedding service uses the same window (its
+# clients do not batch locally)
+EMBED_MICROBATCH_MAX = int(os.getenv("EMBED_MICROBATCH_MAX", "32"))
+EMBED_MICROBATCH_WAIT_MS = float(os.getenv("EMBED_MICROBATCH_WAIT_MS", "5"))
+
+# Bulk ingestion: encodes of at least EMBED_BULK_MIN_TEXTS texts are split into
+# EMBED_BULK_CHUNK_SIZE work items across EMBED_BULK_WORKERS processes
+# (0/1 disables, "auto" = one per CPU core)
+_bulk_workers = os.getenv("EMBED_BULK_WORKERS", "0")
+EMBED_BULK_WORKERS = (os.cpu_count() or 1) if _bulk_workers == "auto" else int(_bulk_workers)
+EMBED_BULK_MIN_TEXTS = int(os.getenv("EMBED_BULK_MIN_TEXTS", "1024"))
+EMBED_BULK_CHUNK_SIZE = int(os.getenv("EMBED_BULK_CHUNK_SIZE", "128"))
+
+# Shared embedding process (python -m testweaver.memory.embedding_service).
+# When set, API workers load no model and send encode requests over this socket
+EMBEDDING_SERVICE_SOCKET = os.getenv("EMBEDDING_SERVICE_SOCKET") or None
+
+# Qdrant storage profile for new collections: memory | int8 | int8-disk | disk
+# (existing ones: scripts/apply_storage_profile.py). QDRANT_HNSW_EF sets the
+# default search breadth (0: Qdrant's default)
+QDRANT_STORAGE_PROFILE = os.getenv("QDRANT_STORAGE_PROFILE", "memory")
+QDRANT_HNSW_EF = int(os.getenv("QDRANT_HNSW_EF", "0")) or None
+
+# Hybrid retrieval: BM25 sparse vectors next to the dense ones (new collections),
+# fused with reciprocal rank fusion; each leg fetches HYBRID_CANDIDATES hits
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "true").lower() in ("1", "true", "yes")
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Optional cross-encoder rerank of RERANK_CANDIDATES primary hits; falls back
+# to retrieval order when scoring takes longer than RERANK_BUDGET_MS.
+# Scores are cached per (query, doc) in RERANK_CACHE_SIZE entries
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() in ("1", "true", "yes")
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "250"))
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "10000"))
+
+# Prompt token budget (local model window minus room for the answer). RAG
+# context gets what is left after the prompts and the SUT source, packed in
+# MMR order (CONTEXT_MMR_LAMBDA: 1 = pure relevance); 0 disables packing
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6144"))
+CONTEXT_MMR_LAMBDA = float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7"))
+
+# Extractive compression: chunks of CONTEXT_COMPRESS_TYPES keep only their
+# query-relevant sentences, at most CONTEXT_COMPRESS_MAX_TOKENS each (0 disables)
+CONTEXT_COMPRESS_MAX_TOKENS = int(os.getenv("CONTEXT_COMPRESS_MAX_TOKENS", "0"))
+CONTEXT_COMPRESS_TYPES = tuple(
+    t.strip() for t in os.getenv("CONTEXT_COMPRESS_TYPES", "pdf").split(",") if t.strip()
+)
+
+# Retrieval caches: query vectors (in-memory LRU) and search results keyed
+# by collection generation (invalidated by ingests/deletes in this process).
+# Results expire after RETRIEVAL_CACHE_TTL_SECONDS, the longest another
+# worker's or replica's writes can go unseen (0: no expiry, single worker only)
+QUERY_EMBED_CACHE_SIZE = int(os.getenv("QUERY_EMBED_CACHE_SIZE", "1024"))
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "512"))
+RETRIEVAL_CACHE_TTL_SECONDS = float(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", "30")) or None
+
+# Startup: load the embedding model and connect to Qdrant in the background
+# right after boot (/readyz reports progress); failed steps retry every N seconds
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
@@ -0,0 +1,103 @@
+# utils/lru.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU with hit/miss counters.
+
+    `get_or_compute` remembers how long each value took to compute, so the
+    stats can report the latency saved by hits. Concurrent misses on the
+    same key may compute twice; the last result wins.
+
+    With `ttl` (seconds), entries older than that count as misses.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (value, compute cost, expiry on the monotonic clock or None)
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[Any, float, Optional[float]]]:
+        """
+        Live entry for `key` (expired ones are dropped). Call with the lock held.
+        """
+        entry = self._data.get(key)
+        if entry is not None and entry[2] is not None and time.monotonic() >= entry[2]:
+            del self._data[key]
+            return None
+        return entry
+
+    def _store(self, key: Hashable, value: Any, cost: float) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        self._data[key] = (value, cost, expires)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if self.maxsize <= 0:
+            return compute()
+
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += entry[1]
+                return entry[0]
+            self.misses += 1
+
+        t0 = time.perf_counter()
+        value = compute()
+        cost = time.perf_counter() - t0
+
+        with self._lock:
+            self._store(key, value, cost)
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Plain lookup (counts a hit or miss); pair with `put` when values are
+        computed in batches.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry[1]
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, cost: float = 0.0) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._store(key, value, cost)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "saved_ms": round(self.saved_seconds * 1000, 1),
+            }
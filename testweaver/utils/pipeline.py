@@ -0,0 +1,96 @@
+# utils/pipeline.py
+import queue
+import threading
+from typing import Any, Callable, Iterable, List, Optional
+
+_DONE = object()
+
+
+class PipelineCancelled(Exception):
+    """Raised by `run_stages` when the pipeline was stopped from outside."""
+
+
+def run_stages(
+    source: Iterable[Any],
+    stages: List[Callable[[Any], Any]],
+    depth: int = 4,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    """
+    Run a bounded producer/consumer pipeline.
+
+    - `source` is iterated in its own thread (e.g. lazy PDF parsing)
+    - each stage runs in its own thread and passes its return value on
+    - queues between stages hold at most `depth` items, so a slow stage
+      applies back-pressure instead of buffering the whole document
+
+    The first exception raised anywhere stops every stage and is re-raised
+    in the calling thread. Setting `stop` from outside aborts the pipeline
+    and raises `PipelineCancelled`.
+    """
+    stop = stop or threading.Event()
+    errors: List[BaseException] = []
+    queues = [queue.Queue(maxsize=depth) for _ in stages]
+
+    def _put(q: queue.Queue, item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(q: queue.Queue) -> Any:
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(exc: BaseException) -> None:
+        errors.append(exc)
+        stop.set()
+
+    def _produce() -> None:
+        try:
+            for item in source:
+                if not _put(queues[0], item):
+                    return
+        except BaseException as e:
+            _fail(e)
+        finally:
+            _put(queues[0], _DONE)
+
+    def _consume(idx: int) -> None:
+        fn = stages[idx]
+        out = queues[idx + 1] if idx + 1 < len(queues) else None
+        try:
+            while True:
+                item = _get(queues[idx])
+                if item is _DONE:
+                    break
+                result = fn(item)
+                if out is not None and not _put(out, result):
+                    return
+        except BaseException as e:
+            _fail(e)
+        finally:
+            if out is not None:
+                _put(out, _DONE)
+
+    threads = [threading.Thread(target=_produce, name="pipeline-source", daemon=True)]
+    threads += [
+        threading.Thread(target=_consume, args=(i,), name=f"pipeline-stage-{i}", daemon=True)
+        for i in range(len(stages))
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if errors:
+        raise errors[0]
+    if stop.is_set():
+        raise PipelineCancelled()
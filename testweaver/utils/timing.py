@@ -0,0 +1,44 @@
+# utils/timing.py
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+
+class LegTimings:
+    """
+    Thread-safe latency counters per named leg (e.g. "dense", "sparse",
+    "fusion" of a hybrid search).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._legs: Dict[str, Dict[str, float]] = {}
+
+    def record(self, leg: str, seconds: float) -> None:
+        with self._lock:
+            s = self._legs.setdefault(leg, {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0})
+            s["count"] += 1
+            s["total"] += seconds
+            s["max"] = max(s["max"], seconds)
+            s["last"] = seconds
+
+    @contextmanager
+    def time(self, leg: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(leg, time.perf_counter() - t0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                leg: {
+                    "count": int(s["count"]),
+                    "avg_ms": round(s["total"] * 1000 / s["count"], 2),
+                    "max_ms": round(s["max"] * 1000, 2),
+                    "last_ms": round(s["last"] * 1000, 2),
+                }
+                for leg, s in self._legs.items()
+            }
@@ -0,0 +1,58 @@
+# utils/tokens.py
+import math
+import os
+from functools import lru_cache
+from typing import List
+
+from .logging import logger
+
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+
+
+class TokenCounter:
+    """
+    Thin wrapper over a tiktoken encoding.
+
+    If tiktoken (or its BPE file) is unavailable, falls back to a
+    ~4 chars/token estimate so ingestion keeps working offline.
+    """
+
+    def __init__(self, encoding_name: str = TOKENIZER_ENCODING):
+        self.encoding_name = encoding_name
+        try:
+            import tiktoken
+
+            self._enc = tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            logger.warning("tiktoken encoding %r unavailable (%s); using ~4 chars/token estimate", encoding_name, e)
+            self._enc = None
+
+    @property
+    def exact(self) -> bool:
+        return self._enc is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._enc is None:
+            return math.ceil(len(text) / 4)
+        return len(self._enc.encode(text, disallowed_special=()))
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        """
+        Hard-split text into pieces of at most `max_tokens` tokens.
+        """
+        if self._enc is None:
+            step = max_tokens * 4
+            return [text[i:i + step] for i in range(0, len(text), step)]
+        ids = self._enc.encode(text, disallowed_special=())
+        return [self._enc.decode(ids[i:i + max_tokens]) for i in range(0, len(ids), max_tokens)]
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(encoding_name: str = TOKENIZER_ENCODING) -> TokenCounter:
+    return TokenCounter(encoding_name)
+
+
+def count_tokens(text: str) -> int:
+    return get_token_counter().count(text)
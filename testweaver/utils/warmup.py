@@ -0,0 +1,83 @@
+# utils/warmup.py
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .logging import logger
+
+# Warm-up states
+PENDING = "pending"
+WARMING = "warming"
+READY = "ready"
+RETRYING = "retrying"
+
+
+class WarmUp:
+    """
+    Runs named initialization steps (model load, Qdrant connect, ...) in a
+    background thread so the API can answer /healthz immediately.
+
+    A failing step is retried every `retry_interval` seconds (e.g. Qdrant
+    still starting); steps that already succeeded are not re-run.
+    """
+
+    def __init__(self, steps: Dict[str, Callable[[], None]], retry_interval: float = 5.0):
+        self.steps = steps
+        self.retry_interval = retry_interval
+        self.status = PENDING
+        self.started_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        self.attempts = 0
+        self.error: Optional[str] = None
+        self._done: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == READY
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.attempts += 1
+            self.status = WARMING if self.attempts == 1 else RETRYING
+            try:
+                for name, step in self.steps.items():
+                    if name in self._done:
+                        continue
+                    t0 = time.perf_counter()
+                    step()
+                    self._done[name] = time.perf_counter() - t0
+                    logger.info("Warm-up: %s ready in %.2fs", name, self._done[name])
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                logger.warning("Warm-up attempt %d failed (%s); retrying in %.1fs", self.attempts, self.error, self.retry_interval)
+                self._stop.wait(self.retry_interval)
+                continue
+
+            self.error = None
+            self.ready_at = time.time()
+            self.status = READY
+            return
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+            "steps": {
+                name: {"ready": name in self._done, "seconds": round(self._done[name], 3) if name in self._done else None}
+                for name in self.steps
+            },
+            "warmup_seconds": round(self.ready_at - self.started_at, 3) if self.ready_at and self.started_at else None,
+        }